@@ -0,0 +1,141 @@
+# backend/applog.py
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# json (one object per line) or text.
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Each WARNING message template gets this many records per window; the
+# rest are counted and reported on the next one let through.
+LOG_SAMPLE_BURST = int(os.getenv("LOG_SAMPLE_BURST", "5"))
+LOG_SAMPLE_WINDOW = float(os.getenv("LOG_SAMPLE_WINDOW", "60"))
+
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class Lazy:
+    """Log argument computed only if the record is actually written:
+    logger.warning("claims=%s", Lazy(decode, token))."""
+
+    __slots__ = ("fn", "args")
+
+    def __init__(self, fn, *args):
+        self.fn = fn
+        self.args = args
+
+    def __str__(self):
+        return str(self.fn(*self.args))
+
+    __repr__ = __str__
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith("_"):
+                out[key] = value
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Rate-limits repeats of the same message template.
+
+    Keyed on (logger, unformatted msg), so the check costs a dict lookup
+    and never formats anything. Only WARNING is sampled: INFO carries
+    audit lines (billing events) and ERROR and above are always wanted.
+    """
+
+    def __init__(self, burst: int = LOG_SAMPLE_BURST, window: float = LOG_SAMPLE_WINDOW):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self._seen: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.WARNING or self.burst <= 0:
+            return True
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is None or now - entry[0] >= self.window:
+                suppressed = entry[2] if entry is not None else 0
+                self._seen[key] = [now, 1, 0]
+                if len(self._seen) > 4096:
+                    self._prune(now)
+            elif entry[1] < self.burst:
+                entry[1] += 1
+                suppressed = 0
+            else:
+                entry[2] += 1
+                return False
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+    def _prune(self, now: float):
+        for key in [k for k, e in self._seen.items() if now - e[0] >= self.window and not e[2]]:
+            del self._seen[key]
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the listener thread without formatting or blocking.
+
+    The stock QueueHandler formats in the caller (to make records
+    picklable); in-process that is wasted work on the request path, so
+    records go on as they are. A full queue drops the record and counts it.
+    """
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def setup_logging(stream=None) -> AsyncQueueHandler | None:
+    """Route the root logger through a queue to a writer thread (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return None
+    output = logging.StreamHandler(stream or sys.stderr)
+    if LOG_FORMAT == "json":
+        output.setFormatter(JSONFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    handler = AsyncQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    handler.addFilter(SamplingFilter())
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+    _listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return handler
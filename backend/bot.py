@@ -1,30 +1,438 @@
-import time
+# backend/bot.py
+import asyncio
+import json
+import os
+import sys
 import threading
-from collections import defaultdict
+import time
+from pathlib import Path
+
+from .loghub import log_hub
+from .signals import SIGNAL_DB
+from .telemetry import TELEMETRY_PREFIX, telemetry_store
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BOTS_DIR = Path(os.getenv("BOTS_DIR", REPO_ROOT / "bots"))
+BOT_STATE_FILE = Path(os.getenv("BOT_STATE_FILE", "./bot_state.json"))
+RESTART_BACKOFF_BASE = float(os.getenv("BOT_RESTART_BACKOFF_BASE", "1"))
+RESTART_BACKOFF_MAX = float(os.getenv("BOT_RESTART_BACKOFF_MAX", "60"))
+# A run that lasts this long resets the backoff back to the base delay.
+RESTART_STABLE_AFTER = float(os.getenv("BOT_RESTART_STABLE_AFTER", "30"))
+STOP_TIMEOUT = float(os.getenv("BOT_STOP_TIMEOUT", "5"))
+# Telemetry reports move `version` (ending long-polls and ETags) at most
+# this often; dashboard watchers still get every report.
+TELEMETRY_STATUS_INTERVAL = float(os.getenv("BOT_TELEMETRY_STATUS_INTERVAL", "60"))
+# Held (flock) by the one API process that runs the bots.
+BOT_SUPERVISOR_LOCK = Path(os.getenv("BOT_SUPERVISOR_LOCK", "./bot_supervisor.lock"))
+
+
+def _child_env() -> dict:
+    # Bot scripts import the shared bots.runtime package from the repo root.
+    env = dict(os.environ)
+    paths = [str(REPO_ROOT)] + [p for p in env.get("PYTHONPATH", "").split(os.pathsep) if p]
+    env["PYTHONPATH"] = os.pathsep.join(paths)
+    # Bots run from their own directory; point them at the API's journal.
+    env.setdefault("SIGNAL_DB", str(SIGNAL_DB.resolve()))
+    # Config snapshots are pushed down the child's stdin.
+    env["BOT_CONFIG_STDIN"] = "1"
+    # ...and report runtime telemetry on stdout, which _pump picks off.
+    env["BOT_TELEMETRY"] = "1"
+    return env
+
+
+class BotProcess:
+    """In-memory row of the supervisor table for one bot."""
+
+    def __init__(self, name: str, script: Path):
+        self.name = name
+        self.script = script
+        self.desired = "stopped"
+        self.status = "stopped"
+        self.pid: int | None = None
+        self.started_at: float | None = None
+        self.restarts = 0
+        self.exit_code: int | None = None
+        self.next_restart_at: float | None = None
+        self.proc: asyncio.subprocess.Process | None = None
+        self.task: asyncio.Task | None = None
+        self.wake: asyncio.Event | None = None
+        self.config: dict | None = None
+
+    def snapshot(self) -> dict:
+        # started_at rather than a computed uptime keeps the snapshot stable
+        # between state changes, so it can be cached per registry version.
+        return {
+            "name": self.name,
+            "status": self.status,
+            "desired": self.desired,
+            "pid": self.pid,
+            "started_at": self.started_at if self.status == "running" else None,
+            "restarts": self.restarts,
+            "exit_code": self.exit_code,
+            "next_restart_at": self.next_restart_at,
+            "telemetry": telemetry_store.summary(self.name),
+        }
+
+
+class Supervisor:
+    """Runs bots/<name>/main.py as child processes and restarts them on crash.
+
+    start/stop/status are called from request threads and only touch the
+    in-memory table; process work is handed to the event loop passed to
+    attach(). Every state change bumps `version`, which long-pollers and
+    ETags key off.
+
+    Per-user bot config reaches a running child as JSON lines on its stdin:
+    the current snapshot (from `config_source`) right after every spawn,
+    then whatever push_config() sends. The child applies them between
+    ticks, so a config change never needs a restart.
+
+    The table lives in one process, so the API must run as a single
+    worker (uvicorn without --workers, gunicorn -w 1); startup refuses
+    WEB_CONCURRENCY above 1. If several are started anyway, only the one
+    that wins claim_supervision() attaches; the others answer bot
+    endpoints with 503.
+    """
+
+    def __init__(self, bots_dir: Path = BOTS_DIR, state_file: Path = BOT_STATE_FILE):
+        self.bots_dir = bots_dir
+        self.state_file = state_file
+        self._bots: dict[str, BotProcess] = {}
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._closing = False
+        self._watchers: set[asyncio.Queue] = set()
+        # Seeded from the clock so versions (and ETags) keep increasing
+        # across API restarts instead of starting over at 0.
+        self.version = int(time.time() * 1000)
+        self._version_event: asyncio.Event | None = None
+        self._cache_version = -1
+        self._telemetry_bumped = 0.0
+        self._cache: list[dict] = []
+        # name -> config snapshot dict; set by the API (blocking, DB-backed).
+        self.config_source = None
+        self._bots = self._discover()
+        self._restore(self._load_state())
+
+    def _discover(self) -> dict[str, BotProcess]:
+        return {
+            script.parent.name: BotProcess(script.parent.name, script)
+            for script in sorted(self.bots_dir.glob("*/main.py"))
+        }
+
+    def _restore(self, state: dict):
+        for name, desired in state.items():
+            if name in self._bots:
+                self._bots[name].desired = desired
+
+    def names(self) -> list[str]:
+        return list(self._bots)
+
+    def _get(self, name: str) -> BotProcess:
+        bot = self._bots.get(name)
+        if bot is None:
+            raise KeyError(name)
+        return bot
+
+    def _load_state(self) -> dict:
+        try:
+            return json.loads(self.state_file.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        data = {b.name: b.desired for b in self._bots.values()}
+        try:
+            self.state_file.write_text(json.dumps(data))
+        except OSError:
+            pass
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        """Bind to the running loop and bring back bots that were running."""
+        self._loop = loop
+        for bot in self._bots.values():
+            if bot.desired == "running":
+                self._ensure_task(bot)
+
+    def start(self, name: str) -> dict:
+        bot = self._get(name)
+        with self._lock:
+            bot.desired = "running"
+            if bot.status == "stopped":
+                bot.status = "starting"
+            self.version += 1
+            self._save_state()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._ensure_task, bot)
+            self._loop.call_soon_threadsafe(self._notify, bot)
+        return {"ok": True, "bot": name, "status": bot.status}
+
+    def stop(self, name: str) -> dict:
+        bot = self._get(name)
+        with self._lock:
+            bot.desired = "stopped"
+            if bot.proc is not None:
+                bot.status = "stopping"
+            else:
+                bot.status = "stopped"
+            self.version += 1
+            self._save_state()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._signal_stop, bot)
+            self._loop.call_soon_threadsafe(self._notify, bot)
+        return {"ok": True, "bot": name, "status": bot.status}
+
+    def push_config(self, name: str, snapshot: dict):
+        """Hand a new config snapshot to the bot, live if it is running."""
+        bot = self._get(name)
+        bot.config = snapshot
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._send_config, bot, snapshot)
+
+    @staticmethod
+    def _send(bot: BotProcess, msg: dict) -> bool:
+        """Write one JSON line to the child's stdin (loop only)."""
+        proc = bot.proc
+        if proc is None or proc.stdin is None or proc.stdin.is_closing():
+            return False
+        proc.stdin.write(json.dumps(msg, separators=(",", ":")).encode() + b"\n")
+        return True
 
-_status = defaultdict(lambda: "stopped")
-_lock = threading.Lock()
+    async def _on_spawn(self, bot: BotProcess):
+        """Runs once the child is up: hand it the current config."""
+        if self.config_source is not None:
+            try:
+                bot.config = await asyncio.to_thread(self.config_source, bot.name)
+            except Exception as exc:
+                self._log(bot, f"[supervisor] config load failed: {exc}")
+        if bot.config is not None:
+            self._send(bot, bot.config)
+
+    def _on_exit(self, bot: BotProcess):
+        """Runs after the child is gone, before any restart."""
+
+    def status(self, name: str) -> dict:
+        return self._get(name).snapshot()
+
+    def status_all(self) -> tuple[int, list[dict]]:
+        """(version, snapshots); rebuilt only when the version moved."""
+        with self._lock:
+            if self._cache_version != self.version:
+                self._cache = [b.snapshot() for b in self._bots.values()]
+                self._cache_version = self.version
+            return self.version, self._cache
+
+    async def wait_for_version(self, since: int, timeout: float) -> int:
+        """Wait (on the loop) until version > since or the timeout passes."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self.version <= since:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            if self._version_event is None:
+                self._version_event = asyncio.Event()
+            try:
+                await asyncio.wait_for(self._version_event.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        return self.version
+
+    def _changed(self, bot: BotProcess):
+        with self._lock:
+            self.version += 1
+        self._notify(bot)
+
+    def watch(self, maxsize: int = 64) -> asyncio.Queue:
+        """Queue of status snapshots pushed on every state change (loop only)."""
+        q: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._watchers.add(q)
+        return q
+
+    def unwatch(self, q: asyncio.Queue):
+        self._watchers.discard(q)
+
+    def _notify(self, bot: BotProcess):
+        self._wake()
+        if self._watchers:
+            self._publish(bot.snapshot())
+
+    def _wake(self):
+        if self._version_event is not None:
+            self._version_event.set()
+            self._version_event = None
+
+    def _publish(self, snap: dict):
+        for q in self._watchers:
+            try:
+                q.put_nowait(snap)
+            except asyncio.QueueFull:
+                # Snapshots are absolute, so a lagging watcher only misses
+                # intermediate states.
+                q.get_nowait()
+                q.put_nowait(snap)
+
+    def _ensure_task(self, bot: BotProcess):
+        if bot.task is None or bot.task.done():
+            bot.wake = asyncio.Event()
+            bot.task = asyncio.ensure_future(self._run(bot))
+        else:
+            bot.wake.set()
+
+    def _signal_stop(self, bot: BotProcess):
+        if bot.wake is not None:
+            bot.wake.set()
+        proc = bot.proc
+        if proc is not None and proc.returncode is None:
+            proc.terminate()
+            self._loop.call_later(STOP_TIMEOUT, self._kill_if_alive, proc)
+
+    @staticmethod
+    def _kill_if_alive(proc: asyncio.subprocess.Process):
+        if proc.returncode is None:
+            proc.kill()
+
+    async def _pump(self, bot: BotProcess, stream: asyncio.StreamReader):
+        while True:
+            line = await stream.readline()
+            if not line:
+                return
+            text = line.decode("utf-8", "replace").rstrip("\n")
+            if text.startswith(TELEMETRY_PREFIX):
+                try:
+                    keys = telemetry_store.ingest(json.loads(text[len(TELEMETRY_PREFIX):]))
+                except (ValueError, TypeError, AttributeError):
+                    self._log(bot, text)
+                else:
+                    self._telemetry_changed(bot, keys)
+                continue
+            self._log(bot, text)
+
+    def _telemetry_changed(self, bot: BotProcess, keys: list[str]):
+        if self._watchers:
+            self._publish(bot.snapshot())
+        self._bump_for_telemetry()
+
+    def _bump_for_telemetry(self):
+        """Fold telemetry into `version` on a slow cadence (loop only)."""
+        now = time.monotonic()
+        if now - self._telemetry_bumped < TELEMETRY_STATUS_INTERVAL:
+            return
+        self._telemetry_bumped = now
+        with self._lock:
+            self.version += 1
+        self._wake()
+
+    @staticmethod
+    def _log(bot: BotProcess, line: str):
+        log_hub.publish(bot.name, line)
+
+    async def _run(self, bot: BotProcess):
+        delay = RESTART_BACKOFF_BASE
+        while bot.desired == "running" and not self._closing:
+            bot.wake.clear()
+            bot.status = "starting"
+            bot.next_restart_at = None
+            self._changed(bot)
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    sys.executable, "-u", str(bot.script),
+                    cwd=str(bot.script.parent),
+                    env=_child_env(),
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT,
+                )
+            except OSError as exc:
+                self._log(bot, f"[supervisor] spawn failed: {exc}")
+                code = None
+                ran_for = 0.0
+            else:
+                bot.proc = proc
+                bot.pid = proc.pid
+                bot.started_at = time.time()
+                bot.exit_code = None
+                bot.status = "running"
+                self._changed(bot)
+                if bot.desired != "running":
+                    self._signal_stop(bot)
+                pump = asyncio.ensure_future(self._pump(bot, proc.stdout))
+                await self._on_spawn(bot)
+                code = await proc.wait()
+                await pump
+                ran_for = time.time() - bot.started_at
+                bot.proc = None
+                bot.pid = None
+                self._on_exit(bot)
+            bot.exit_code = code
+            if bot.desired != "running" or self._closing:
+                break
+            if ran_for >= RESTART_STABLE_AFTER:
+                delay = RESTART_BACKOFF_BASE
+            bot.restarts += 1
+            bot.status = "backoff"
+            bot.next_restart_at = time.time() + delay
+            self._changed(bot)
+            bot.wake.clear()
+            try:
+                await asyncio.wait_for(bot.wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, RESTART_BACKOFF_MAX)
+        bot.status = "stopped"
+        bot.next_restart_at = None
+        self._changed(bot)
+
+    async def shutdown(self):
+        """Stop every child without touching the persisted desired state."""
+        self._closing = True
+        tasks = []
+        for bot in self._bots.values():
+            self._signal_stop(bot)
+            if bot.task is not None:
+                tasks.append(bot.task)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+_supervision_fd: int | None = None
+
+
+def claim_supervision(path: Path = BOT_SUPERVISOR_LOCK) -> bool:
+    """True in exactly one process per lock file.
+
+    Every API worker imports this module and would otherwise spawn its own
+    copy of each bot (and worker pool) from the same state file. The lock
+    goes away with the process, so a replacement worker can take over.
+    """
+    global _supervision_fd
+    if _supervision_fd is not None:
+        return True
+    try:
+        import fcntl
+    except ImportError:  # no flock (Windows): assume a single process
+        return True
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+    _supervision_fd = fd
+    return True
+
+
+supervisor = Supervisor()
 
 
 def start_bot(name: str):
-    with _lock:
-        _status[name] = "running"
-    return {"ok": True, "bot": name, "status": "running"}
+    return supervisor.start(name)
 
 
 def stop_bot(name: str):
-    with _lock:
-        _status[name] = "stopped"
-    return {"ok": True, "bot": name, "status": "stopped"}
+    return supervisor.stop(name)
 
 
 def bot_status(name: str):
-    return {"name": name, "status": _status[name]}
-
+    return supervisor.status(name)
 
-def stream_logs(name: str):
-    i = 0
-    while True:
-        yield f"[{name}] status={_status[name]} tick={i}\n"
-        time.sleep(1)
-        i += 1
@@ -0,0 +1,138 @@
+# backend/botconfig.py
+import json
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+CONFIG_DDL = """
+CREATE TABLE IF NOT EXISTS bot_configs (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  user_id INTEGER NOT NULL,
+  bot TEXT NOT NULL,
+  version INTEGER NOT NULL,
+  config TEXT NOT NULL,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE (user_id, bot, version),
+  FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+)
+"""
+
+
+class BotConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    enabled: bool = True
+    symbols: list[str] = Field(default_factory=lambda: ["BTCUSDT", "ETHUSDT"], min_length=1, max_length=50)
+    telegram_chat_id: str | None = Field(default=None, pattern=r"^-?\d{1,20}$")
+
+    @model_validator(mode="before")
+    @classmethod
+    def _upper_symbols(cls, data):
+        if isinstance(data, dict) and isinstance(data.get("symbols"), list):
+            data = {**data, "symbols": [str(s).strip().upper() for s in data["symbols"]]}
+        return data
+
+    @model_validator(mode="after")
+    def _check_symbols(self):
+        for s in self.symbols:
+            if not (2 <= len(s) <= 20 and s.isalnum()):
+                raise ValueError(f"invalid symbol: {s}")
+        if len(set(self.symbols)) != len(self.symbols):
+            raise ValueError("duplicate symbols")
+        return self
+
+
+class TrendRiderConfig(BotConfig):
+    fast: int = Field(9, ge=2, le=200)
+    slow: int = Field(21, ge=3, le=400)
+
+    @model_validator(mode="after")
+    def _fast_below_slow(self):
+        if self.fast >= self.slow:
+            raise ValueError("fast must be below slow")
+        return self
+
+
+class ReversalConfig(BotConfig):
+    rsi_period: int = Field(14, ge=2, le=100)
+    oversold: float = Field(30.0, ge=1, le=50)
+    overbought: float = Field(70.0, ge=50, le=99)
+    bb_period: int = Field(20, ge=2, le=200)
+    bb_k: float = Field(2.0, gt=0, le=5)
+
+
+class ScalperConfig(BotConfig):
+    spike: float = Field(3.0, gt=1, le=50)
+    period: int = Field(20, ge=2, le=500)
+    cooldown: int = Field(10, ge=0, le=1000)
+
+
+BOT_CONFIG_SCHEMAS: dict[str, type[BotConfig]] = {
+    "trend_rider": TrendRiderConfig,
+    "reversal": ReversalConfig,
+    "scalper": ScalperConfig,
+}
+
+
+def ensure_config_table(conn) -> None:
+    conn.execute(text(CONFIG_DDL))
+
+
+def validate_config(bot: str, config: dict) -> dict:
+    """Full config with defaults filled in; KeyError for unknown bots,
+    pydantic.ValidationError for bad values."""
+    return BOT_CONFIG_SCHEMAS[bot].model_validate(config).model_dump()
+
+
+def latest_config(db: Session, user_id: int, bot: str) -> dict:
+    row = db.execute(text("""
+        SELECT version, config, created_at FROM bot_configs
+        WHERE user_id = :uid AND bot = :bot ORDER BY version DESC LIMIT 1
+    """), {"uid": user_id, "bot": bot}).fetchone()
+    if row is None:
+        return {"bot": bot, "version": 0, "config": BOT_CONFIG_SCHEMAS[bot]().model_dump(), "created_at": None}
+    return {"bot": bot, "version": row.version, "config": json.loads(row.config), "created_at": row.created_at}
+
+
+def save_config(db: Session, user_id: int, bot: str, config: dict,
+                expected_version: int | None = None) -> dict | None:
+    """Append a new version; None if expected_version is no longer current."""
+    full = validate_config(bot, config)
+    current = db.execute(text("""
+        SELECT COALESCE(MAX(version), 0) FROM bot_configs WHERE user_id = :uid AND bot = :bot
+    """), {"uid": user_id, "bot": bot}).scalar()
+    if expected_version is not None and expected_version != current:
+        return None
+    db.execute(text("""
+        INSERT INTO bot_configs (user_id, bot, version, config, created_at)
+        VALUES (:uid, :bot, :v, :cfg, CURRENT_TIMESTAMP)
+    """), {"uid": user_id, "bot": bot, "v": current + 1, "cfg": json.dumps(full)})
+    return {"bot": bot, "version": current + 1, "config": full}
+
+
+def config_history(db: Session, user_id: int, bot: str, limit: int = 20) -> list[dict]:
+    rows = db.execute(text("""
+        SELECT version, config, created_at FROM bot_configs
+        WHERE user_id = :uid AND bot = :bot ORDER BY version DESC LIMIT :n
+    """), {"uid": user_id, "bot": bot, "n": limit}).fetchall()
+    return [{"version": r.version, "config": json.loads(r.config), "created_at": r.created_at} for r in rows]
+
+
+def bot_snapshot(db: Session, bot: str) -> dict:
+    """What a bot worker runs: the latest enabled config of every active
+    user. `version` is the newest row id, so it only ever grows."""
+    rows = db.execute(text("""
+        SELECT c.id, c.user_id, c.config FROM bot_configs c
+        JOIN users u ON u.id = c.user_id AND u.is_active = 1
+        WHERE c.bot = :bot AND c.version = (
+            SELECT MAX(version) FROM bot_configs WHERE user_id = c.user_id AND bot = c.bot)
+    """), {"bot": bot}).fetchall()
+    version = db.execute(text("SELECT COALESCE(MAX(id), 0) FROM bot_configs WHERE bot = :bot"),
+                         {"bot": bot}).scalar()
+    users = {}
+    for r in rows:
+        cfg = json.loads(r.config)
+        if cfg.get("enabled", True):
+            users[str(r.user_id)] = cfg
+    return {"type": "config", "bot": bot, "version": version, "users": users}
@@ -0,0 +1,14 @@
+# conftest.py
+import os
+import tempfile
+
+# backend.main creates and migrates its tables on import, and the bot
+# supervisor, worker pool, log store and signal journal keep their state in
+# the working directory; point all of it at a throwaway directory instead.
+_tmp = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/test.db"
+os.environ["BOT_STATE_FILE"] = f"{_tmp}/bot_state.json"
+os.environ["BOT_POOL_STATE_FILE"] = f"{_tmp}/bot_pool.json"
+os.environ["BOT_SUPERVISOR_LOCK"] = f"{_tmp}/bot_supervisor.lock"
+os.environ["LOG_DIR"] = f"{_tmp}/bot_logs"
+os.environ["SIGNAL_DB"] = f"{_tmp}/signals.db"
@@ -0,0 +1,139 @@
+# backend/dashboard.py
+import asyncio
+import json
+import os
+from typing import Callable
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from .bot import supervisor
+from .workers import worker_pool
+from .loghub import log_hub, LOG_BATCH_WINDOW_MS
+
+DASHBOARD_AUTH_TIMEOUT = float(os.getenv("DASHBOARD_AUTH_TIMEOUT", "10"))
+
+
+class DashboardSession:
+    """One multiplexed socket per dashboard: any number of bot logs plus
+    status pushes, replacing per-bot /ws/logs sockets and /bot/status polls.
+
+    Client -> server:
+      {"type": "auth", "token": "..."}                        first message
+      {"type": "subscribe", "bots": [...], "since": {bot: seq}, "backfill": N}
+      {"type": "unsubscribe", "bots": [...]}
+    Server -> client:
+      {"type": "status", "bots": [...]}                       after auth
+      {"type": "status", "bot": {...}}                        on every change
+
+      {"type": "logs", "bot": name, "lines": [{"seq", "line"}, ...]}
+      {"type": "error", "detail": "...", "bot": name?}
+
+    With the worker pool on, status and logs are the user's own instances:
+    subscribing to a bot follows that user's "<bot>:<user>" channel.
+    """
+
+    def __init__(self, websocket: WebSocket, window: float = LOG_BATCH_WINDOW_MS / 1000):
+        self.ws = websocket
+        self.window = window
+        self.user_id = None
+        self._send_lock = asyncio.Lock()
+        self._streams: dict[str, asyncio.Task] = {}
+
+    async def send(self, msg: dict):
+        async with self._send_lock:
+            await self.ws.send_text(json.dumps(msg))
+
+    async def authenticate(self, check: Callable[[str], object]):
+        """Wait for the auth message and run `check(token)` off the loop.
+
+        `check` raises to reject the token; its return value is the user.
+        """
+        msg = await asyncio.wait_for(self.ws.receive_json(), DASHBOARD_AUTH_TIMEOUT)
+        if not isinstance(msg, dict) or msg.get("type") != "auth":
+            raise PermissionError("auth_required")
+        return await asyncio.to_thread(check, str(msg.get("token") or ""))
+
+    def channel(self, bot: str) -> str | None:
+        """Log channel a subscription to `bot` follows, None if unknown."""
+        if worker_pool.size and self.user_id is not None:
+            return f"{bot}:{self.user_id}" if bot in worker_pool.bots else None
+        return bot if bot in supervisor.names() else None
+
+    async def run(self, user_id=None):
+        self.user_id = user_id
+        registry = worker_pool if worker_pool.size and user_id is not None else supervisor
+        watch = registry.watch(64 if registry is supervisor else 1024)
+        pusher = asyncio.ensure_future(self._push_status(watch, None if registry is supervisor else str(user_id)))
+        try:
+            if registry is supervisor:
+                bots = [supervisor.status(n) for n in supervisor.names()]
+            else:
+                bots = worker_pool.instances_for(user_id)
+            await self.send({"type": "status", "bots": bots})
+            while True:
+                try:
+                    msg = json.loads(await self.ws.receive_text())
+                except ValueError:
+                    await self.send({"type": "error", "detail": "invalid json"})
+                    continue
+                kind = msg.get("type") if isinstance(msg, dict) else None
+                if kind == "subscribe":
+                    await self._subscribe(msg)
+                elif kind == "unsubscribe":
+                    for bot in msg.get("bots") or []:
+                        task = self._streams.pop(bot, None)
+                        if task is not None:
+                            task.cancel()
+                else:
+                    await self.send({"type": "error", "detail": "unknown message"})
+        except WebSocketDisconnect:
+            pass
+        finally:
+            registry.unwatch(watch)
+            pusher.cancel()
+            for task in self._streams.values():
+                task.cancel()
+            await asyncio.gather(pusher, *self._streams.values(), return_exceptions=True)
+
+    async def _subscribe(self, msg: dict):
+        since = msg.get("since") or {}
+        backfill = msg.get("backfill")
+        for bot in msg.get("bots") or []:
+            channel = self.channel(bot)
+            if channel is None:
+                await self.send({"type": "error", "detail": "unknown bot", "bot": bot})
+                continue
+            if bot in self._streams:
+                continue
+            try:
+                after = log_hub.resume_point(
+                    channel,
+                    int(since[bot]) if bot in since else None,
+                    int(backfill) if backfill is not None else None,
+                )
+            except (TypeError, ValueError):
+                await self.send({"type": "error", "detail": "invalid offset", "bot": bot})
+                continue
+            self._streams[bot] = asyncio.ensure_future(self._stream(bot, channel, after))
+
+    async def _stream(self, bot: str, channel: str, after: int):
+        stream = log_hub.follow(channel, after, self.window)
+        try:
+            async for items in stream:
+                await self.send({
+                    "type": "logs",
+                    "bot": bot,
+                    "lines": [{"seq": s, "line": l} for s, l in items],
+                })
+            # Dropped for falling behind; the client resubscribes with since.
+            await self.send({"type": "error", "detail": "lagging", "bot": bot})
+        finally:
+            await stream.aclose()
+            if self._streams.get(bot) is asyncio.current_task():
+                del self._streams[bot]
+
+    async def _push_status(self, watch: asyncio.Queue, user: str | None = None):
+        while True:
+            snap = await watch.get()
+            if user is None or snap.get("user") == user:
+                await self.send({"type": "status", "bot": snap})
@@ -0,0 +1,227 @@
+# backend/loghub.py
+import asyncio
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .logstore import LogStore, log_store
+
+LOG_RING_LINES = int(os.getenv("LOG_RING_LINES", "1000"))
+LOG_SUBSCRIBER_QUEUE = int(os.getenv("LOG_SUBSCRIBER_QUEUE", "256"))
+# A subscriber that has to skip ahead this many times without reading is dropped.
+LOG_MAX_SKIPS = int(os.getenv("LOG_MAX_SKIPS", "8"))
+LOG_BATCH_WINDOW_MS = int(os.getenv("LOG_BATCH_WINDOW_MS", "50"))
+LOG_BATCH_MAX_BYTES = int(os.getenv("LOG_BATCH_MAX_BYTES", str(64 * 1024)))
+# Most history a (re)connecting client can ask for.
+LOG_BACKFILL_MAX = int(os.getenv("LOG_BACKFILL_MAX", "5000"))
+
+
+class Subscription:
+    def __init__(self, channel: "Channel", maxsize: int):
+        self.channel = channel
+        self.maxsize = max(maxsize, 1)
+        # One slot over maxsize is kept free for the skip notice.
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=self.maxsize + 1)
+        self.skipped = 0
+        self.skips_in_a_row = 0
+        self.closed = False
+        self._eof = False
+
+    def _offer(self, item):
+        if self.queue.qsize() < self.maxsize:
+            self.queue.put_nowait(item)
+            return
+        # Consumer fell behind: throw away its backlog and jump to the newest
+        # line instead of making the producer wait.
+        dropped = self.queue.qsize()
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.skipped += dropped
+        self.skips_in_a_row += 1
+        if self.skips_in_a_row > LOG_MAX_SKIPS:
+            self.close()
+            return
+        self.queue.put_nowait((None, f"[loghub] skipped {dropped} lines"))
+        self.queue.put_nowait(item)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.channel.subscribers.discard(self)
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def get(self):
+        """Next (seq, line) pair, or None once the subscription is closed."""
+        item = await self.queue.get()
+        self.skips_in_a_row = 0
+        return item
+
+    async def next_batch(self, window: float, max_bytes: int):
+        """Coalesce lines for up to `window` seconds or `max_bytes` of text.
+
+        Returns a non-empty list of (seq, line) pairs, or None once closed.
+        With window=0 this just drains whatever is already queued.
+        """
+        if self._eof:
+            return None
+        first = await self.get()
+        if first is None:
+            return None
+        batch = [first]
+        size = len(first[1])
+        deadline = asyncio.get_running_loop().time() + window
+        while size < max_bytes:
+            if self.queue.empty():
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = self.queue.get_nowait()
+            if item is None:
+                self._eof = True
+                break
+            batch.append(item)
+            size += len(item[1])
+        return batch
+
+
+class Channel:
+    def __init__(self, name: str, ring_size: int, seq: int = 0):
+        self.name = name
+        self.ring: deque = deque(maxlen=ring_size)
+        self.seq = seq
+        self.subscribers: set[Subscription] = set()
+
+
+class LogHub:
+    """Fan-out of bot log lines to WebSocket clients.
+
+    Everything runs on the event loop: publish() appends to the channel's
+    ring buffer and offers the line to every subscriber's bounded queue
+    without ever awaiting, so a slow client only hurts itself. With a store,
+    every line is also appended to disk and sequence numbers continue across
+    restarts. Store appends and history reads run on one writer thread, so
+    a slow disk never stalls the loop and a read sees every append queued
+    before it.
+    """
+
+    def __init__(self, ring_size: int = LOG_RING_LINES, queue_size: int = LOG_SUBSCRIBER_QUEUE,
+                 store: LogStore | None = None):
+        self.ring_size = ring_size
+        self.queue_size = queue_size
+        self.store = store
+        self._channels: dict[str, Channel] = {}
+        self._io = ThreadPoolExecutor(1, thread_name_prefix="logstore") if store is not None else None
+
+    def channel(self, name: str) -> Channel:
+        ch = self._channels.get(name)
+        if ch is None:
+            seq = self.store.last_seq(name) if self.store else 0
+            ch = self._channels[name] = Channel(name, self.ring_size, seq)
+        return ch
+
+    def last_seq(self, name: str) -> int:
+        return self.channel(name).seq
+
+    def publish(self, name: str, line: str) -> int:
+        ch = self.channel(name)
+        ch.seq += 1
+        if self._io is not None:
+            self._io.submit(self.store.append, name, ch.seq, line)
+        item = (ch.seq, line)
+        ch.ring.append(item)
+        for sub in list(ch.subscribers):
+            sub._offer(item)
+        return ch.seq
+
+    def subscribe(self, name: str) -> Subscription:
+        ch = self.channel(name)
+        sub = Subscription(ch, self.queue_size)
+        ch.subscribers.add(sub)
+        return sub
+
+    def resume_point(self, name: str, since: int | None = None, backfill: int | None = None) -> int:
+        """Sequence number after which a (re)connecting client should start."""
+        head = self.last_seq(name)
+        floor = max(head - LOG_BACKFILL_MAX, 0)
+        # A since from before a restart or rotation can be past the head;
+        # resuming there would skip every new line, so clamp it.
+        if since is not None:
+            return min(max(since, floor), head)
+        if backfill is not None:
+            return max(head - max(backfill, 0), floor)
+        return head
+
+    async def follow(self, name: str, after: int, window: float = 0.0,
+                     max_bytes: int = LOG_BATCH_MAX_BYTES, chunk: int = 500):
+        """Yield lists of (seq, line) newer than `after`: history, then live.
+
+        Stops when the live subscription is dropped for falling behind.
+        """
+        last = after
+        sub = None
+        try:
+            if self.store is not None:
+                async for batch in self._history(name, last, chunk):
+                    yield batch
+                    last = batch[-1][0]
+                # Lines published while that last read was in flight are on
+                # disk but were never queued for us; read once more after
+                # subscribing and let the seq filter below drop the overlap.
+                sub = self.subscribe(name)
+                async for batch in self._history(name, last, chunk):
+                    yield batch
+                    last = batch[-1][0]
+            else:
+                sub = self.subscribe(name)
+            while True:
+                items = await sub.next_batch(window, max_bytes)
+                if items is None:
+                    return
+                items = [(s, l) for s, l in items if s is None or s > last]
+                if items:
+                    yield items
+        finally:
+            if sub is not None:
+                sub.close()
+
+    async def _history(self, name: str, after: int, chunk: int):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await loop.run_in_executor(self._io, self.store.read, name, after + 1, chunk)
+            if not batch:
+                return
+            yield batch
+            after = batch[-1][0]
+
+    def close(self):
+        """Finish the queued appends, then close the store's files (they
+        reopen on the next append)."""
+        if self._io is not None:
+            self._io.submit(self.store.close).result()
+
+    def recent(self, name: str, limit: int | None = None) -> list[tuple[int, str]]:
+        items = list(self.channel(name).ring)
+        if limit is None:
+            return items
+        return items[max(0, len(items) - limit):]
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                "seq": ch.seq,
+                "subscribers": len(ch.subscribers),
+                "skipped": sum(s.skipped for s in ch.subscribers),
+            }
+            for name, ch in self._channels.items()
+        }
+
+
+log_hub = LogHub(store=log_store)
@@ -0,0 +1,223 @@
+# backend/logstore.py
+import mmap
+import os
+import re
+import struct
+from bisect import bisect_right
+from pathlib import Path
+
+LOG_DIR = Path(os.getenv("LOG_DIR", "./bot_logs"))
+LOG_SEGMENT_BYTES = int(os.getenv("LOG_SEGMENT_BYTES", str(8 * 1024 * 1024)))
+LOG_SEGMENTS_KEPT = int(os.getenv("LOG_SEGMENTS_KEPT", "8"))
+# One (seq, offset) index entry per this many lines.
+LOG_INDEX_EVERY = int(os.getenv("LOG_INDEX_EVERY", "256"))
+
+_IDX = struct.Struct("<QQ")
+_ESCAPED = re.compile(r"\\(.)", re.S)
+
+
+def _escape(line: str) -> str:
+    """One record per line on disk: backslash and newline are escaped."""
+    if "\\" in line or "\n" in line:
+        line = line.replace("\\", "\\\\").replace("\n", "\\n")
+    return line
+
+
+def _unescape(text: str) -> str:
+    if "\\" not in text:
+        return text
+    return _ESCAPED.sub(lambda m: "\n" if m.group(1) == "n" else m.group(1), text)
+
+
+class Segment:
+    """One append-only file of "<seq>\\t<line>\\n" records plus its sparse index.
+
+    Lines are stored escaped (see _escape), so a record never spans lines.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.idx_path = path.with_suffix(".idx")
+        self.base_seq = int(path.stem)
+        self.seqs: list[int] = []
+        self.offsets: list[int] = []
+        self.last_seq = self.base_seq - 1
+        self.size = 0
+        self._since_index = 0
+
+    def load(self):
+        """Read the index and recover last_seq, trimming a torn final line."""
+        if self.idx_path.exists():
+            raw = self.idx_path.read_bytes()
+            for i in range(0, len(raw) - len(raw) % _IDX.size, _IDX.size):
+                seq, off = _IDX.unpack_from(raw, i)
+                self.seqs.append(seq)
+                self.offsets.append(off)
+        self.size = self.path.stat().st_size
+        if not self.size:
+            return
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = mm.rfind(b"\n") + 1
+            start = self.offsets[-1] if self.offsets and self.offsets[-1] < end else 0
+            if not self.offsets or start == 0:
+                self.seqs, self.offsets = [], []
+            pos = start
+            count = 0
+            while pos < end:
+                nl = mm.find(b"\n", pos)
+                tab = mm.find(b"\t", pos, nl)
+                if tab < 0 or not mm[pos:tab].isdigit():
+                    pos = nl + 1  # a stray fragment from an unescaped line
+                    continue
+                seq = int(mm[pos:tab])
+                if not self.offsets or count >= LOG_INDEX_EVERY:
+                    if not self.offsets or seq != self.seqs[-1]:
+                        self.seqs.append(seq)
+                        self.offsets.append(pos)
+                    count = 0
+                self.last_seq = seq
+                count += 1
+                pos = nl + 1
+            self._since_index = count
+        if end != self.size:
+            os.truncate(self.path, end)
+            self.size = end
+        self.idx_path.write_bytes(b"".join(
+            _IDX.pack(s, o) for s, o in zip(self.seqs, self.offsets)))
+
+    def read(self, from_seq: int, limit: int) -> list[tuple[int, str]]:
+        if not self.size or from_seq > self.last_seq:
+            return []
+        i = bisect_right(self.seqs, from_seq) - 1
+        pos = self.offsets[max(i, 0)]
+        out = []
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), self.size, access=mmap.ACCESS_READ) as mm:
+            while pos < self.size and len(out) < limit:
+                nl = mm.find(b"\n", pos)
+                tab = mm.find(b"\t", pos, nl)
+                if tab >= 0 and mm[pos:tab].isdigit():
+                    seq = int(mm[pos:tab])
+                    if seq >= from_seq:
+                        out.append((seq, _unescape(mm[tab + 1:nl].decode("utf-8", "replace"))))
+                pos = nl + 1
+        return out
+
+
+class BotLog:
+    def __init__(self, root: Path):
+        self.root = root
+        root.mkdir(parents=True, exist_ok=True)
+        self.segments: list[Segment] = []
+        for path in sorted(root.glob("*.log")):
+            seg = Segment(path)
+            seg.load()
+            self.segments.append(seg)
+        self._fh = None
+        self._idx_fh = None
+        self._dirty = False
+
+    @property
+    def last_seq(self) -> int:
+        return self.segments[-1].last_seq if self.segments else 0
+
+    @property
+    def first_seq(self) -> int:
+        return self.segments[0].base_seq if self.segments else 1
+
+    def _open_tail(self):
+        seg = self.segments[-1]
+        self._fh = open(seg.path, "ab")
+        self._idx_fh = open(seg.idx_path, "ab")
+
+    def _rotate(self, seq: int):
+        self.close()
+        seg = Segment(self.root / f"{seq:020d}.log")
+        seg.path.touch()
+        self.segments.append(seg)
+        while len(self.segments) > LOG_SEGMENTS_KEPT:
+            old = self.segments.pop(0)
+            old.path.unlink(missing_ok=True)
+            old.idx_path.unlink(missing_ok=True)
+        self._open_tail()
+
+    def append(self, seq: int, line: str):
+        if not self.segments or self.segments[-1].size >= LOG_SEGMENT_BYTES:
+            self._rotate(seq)
+        elif self._fh is None:
+            self._open_tail()
+        seg = self.segments[-1]
+        if not seg.seqs or seg._since_index >= LOG_INDEX_EVERY:
+            seg.seqs.append(seq)
+            seg.offsets.append(seg.size)
+            self._idx_fh.write(_IDX.pack(seq, seg.size))
+            seg._since_index = 0
+        data = f"{seq}\t{_escape(line)}\n".encode("utf-8", "replace")
+        self._fh.write(data)
+        seg.size += len(data)
+        seg.last_seq = seq
+        seg._since_index += 1
+        self._dirty = True
+
+    def flush(self):
+        if self._dirty:
+            self._fh.flush()
+            self._idx_fh.flush()
+            self._dirty = False
+
+    def read(self, from_seq: int, limit: int) -> list[tuple[int, str]]:
+        self.flush()
+        from_seq = max(from_seq, self.first_seq)
+        bases = [s.base_seq for s in self.segments]
+        i = max(bisect_right(bases, from_seq) - 1, 0)
+        out: list[tuple[int, str]] = []
+        for seg in self.segments[i:]:
+            out.extend(seg.read(from_seq, limit - len(out)))
+            if len(out) >= limit:
+                break
+        return out
+
+    def close(self):
+        if self._fh is not None:
+            self.flush()
+            self._fh.close()
+            self._idx_fh.close()
+            self._fh = self._idx_fh = None
+
+
+class LogStore:
+    """Durable per-bot log history used for backfill and resume.
+
+    Appends go through a buffered handle and are flushed lazily before the
+    next read, so the write path stays a memcpy. Reads mmap the segment and
+    jump to the nearest sparse index entry instead of loading whole files.
+    """
+
+    def __init__(self, root: Path = LOG_DIR):
+        self.root = root
+        self._logs: dict[str, BotLog] = {}
+
+    def _log(self, name: str) -> BotLog:
+        log = self._logs.get(name)
+        if log is None:
+            log = self._logs[name] = BotLog(self.root / name)
+        return log
+
+    def last_seq(self, name: str) -> int:
+        return self._log(name).last_seq
+
+    def append(self, name: str, seq: int, line: str):
+        self._log(name).append(seq, line)
+
+    def read(self, name: str, from_seq: int, limit: int = 500) -> list[tuple[int, str]]:
+        return self._log(name).read(from_seq, limit)
+
+    def tail(self, name: str, n: int) -> list[tuple[int, str]]:
+        log = self._log(name)
+        return log.read(max(log.last_seq - n + 1, 1), n)
+
+    def close(self):
+        for log in self._logs.values():
+            log.close()
+
+
+log_store = LogStore()
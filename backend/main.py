@@ -1,26 +1,39 @@
 # backend/main.py
 
 import os
+import json
+import asyncio
 from fastapi import FastAPI, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, EmailStr
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, EmailStr, ValidationError
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 
-from .database import Base, engine, get_db
+from .database import Base, engine, get_db, SessionLocal
 from .models import User, Subscription
 from .auth import hash_password, verify_password, create_access_token, decode_token
 from .supabase_auth import verify_supabase_token
-from .bot import start_bot, stop_bot, bot_status, stream_logs
+from .revenue import ensure_rollup, record_submission, record_approval, revenue_report
+from .bot import supervisor, start_bot, stop_bot, claim_supervision
+from .workers import worker_pool
+from .loghub import log_hub, LOG_BATCH_MAX_BYTES, LOG_BATCH_WINDOW_MS
+from .dashboard import DashboardSession
+from .signals import query_signals
+from .metrics import TOKEN_VERIFY, instrument_app, instrument_pool
+from .sqlprofile import SQL_PROFILE, enable_sql_profiling
+from .applog import Lazy, setup_logging
+from .botconfig import BOT_CONFIG_SCHEMAS, ensure_config_table, latest_config, save_config, config_history, bot_snapshot
 
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
 from jose import jwt as jose_jwt
 import logging
 
 
 Base.metadata.create_all(bind=engine)
 
+setup_logging()
 logger = logging.getLogger("auth")
 
 def _token_debug(token: str) -> dict:
@@ -63,6 +76,8 @@ def create_runtime_tables():
               FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
             );
         """))
+        ensure_rollup(conn)
+        ensure_config_table(conn)
 
 
 def ensure_waitlist_schema():
@@ -119,14 +134,109 @@ def ensure_users_schema():
             add("is_active INTEGER NOT NULL DEFAULT 0")
         if "created_at" not in cols:
             add("created_at DATETIME DEFAULT CURRENT_TIMESTAMP")
+        if "version" not in cols:
+            add("version INTEGER NOT NULL DEFAULT 0")
+        if "payments_version" not in cols:
+            add("payments_version INTEGER NOT NULL DEFAULT 0")
+
+
+def ensure_version_triggers():
+    """Keep users.version and users.payments_version moving on every write.
+
+    Triggers rather than application code, so the raw-SQL writers (admin
+    approve, future scripts) can't forget. version covers the fields /me
+    returns; payments_version any change to the user's payments.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TRIGGER IF NOT EXISTS users_version_bump
+            AFTER UPDATE OF email, role, plan, is_active ON users
+            BEGIN
+              UPDATE users SET version = version + 1 WHERE id = NEW.id;
+            END;
+        """))
+        for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+            conn.execute(text(f"""
+                CREATE TRIGGER IF NOT EXISTS payments_version_{event.lower()}
+                AFTER {event} ON payments
+                BEGIN
+                  UPDATE users SET payments_version = payments_version + 1 WHERE id = {row}.user_id;
+                END;
+            """))
 
 
 create_runtime_tables()
 ensure_waitlist_schema()
 ensure_users_schema()
+ensure_version_triggers()
 
 app = FastAPI(title="SaaS Hub — Crypto Only")
 
+
+def load_bot_snapshot(bot: str) -> dict:
+    db = SessionLocal()
+    try:
+        return bot_snapshot(db, bot)
+    finally:
+        db.close()
+
+
+def load_user_config(user_id: str, bot: str) -> dict:
+    db = SessionLocal()
+    try:
+        return latest_config(db, int(user_id), bot)
+    finally:
+        db.close()
+
+
+def user_is_active(user_id: str) -> bool:
+    db = SessionLocal()
+    try:
+        user = db.get(User, int(user_id))
+        return bool(user and user.is_active)
+    finally:
+        db.close()
+
+
+_supervising = False
+
+
+def require_supervisor():
+    if not _supervising:
+        raise HTTPException(status_code=503, detail="bot_supervisor_elsewhere")
+
+
+@app.on_event("startup")
+async def start_supervisor():
+    global _supervising
+    # uvicorn and gunicorn both take their default worker count from here;
+    # every worker but one would answer bot endpoints with 503.
+    workers = os.getenv("WEB_CONCURRENCY", "").strip()
+    if workers.isdigit() and int(workers) > 1:
+        raise RuntimeError(f"WEB_CONCURRENCY={workers}: the bot supervisor needs the API "
+                           "to run as a single worker")
+    if not claim_supervision():
+        logger.warning("bot supervision is running in another API process; "
+                       "run the API as a single worker so bot endpoints work everywhere")
+        return
+    _supervising = True
+    loop = asyncio.get_running_loop()
+    if worker_pool.size:
+        # Users run their own instances in the pool; the shared per-bot
+        # processes keep only the env defaults.
+        worker_pool.config_source = load_user_config
+        worker_pool.active_source = user_is_active
+        worker_pool.attach(loop)
+    else:
+        supervisor.config_source = load_bot_snapshot
+    supervisor.attach(loop)
+
+
+@app.on_event("shutdown")
+async def stop_supervisor():
+    await asyncio.gather(supervisor.shutdown(), worker_pool.shutdown())
+    await asyncio.to_thread(log_hub.close)
+
 # CORS
 
 origin_list = [
@@ -158,6 +268,12 @@ app.add_middleware(
     allow_headers=["*"],
     expose_headers=["*"],
 )
+instrument_app(app, "api")
+instrument_pool(engine)
+if SQL_PROFILE:
+    enable_sql_profiling(app, engine)
+# backend/auth.py stays importable on its own, so legacy verifies are counted here.
+_LEGACY_OK, _LEGACY_ERROR = TOKEN_VERIFY.labels("legacy", "ok"), TOKEN_VERIFY.labels("legacy", "error")
 
 
 class GoogleToken(BaseModel):
@@ -166,6 +282,7 @@ class GoogleToken(BaseModel):
 
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "")
 ALLOW_LEGACY_TOKENS = os.getenv("ALLOW_LEGACY_TOKENS", "false").lower() == "true"
+BOT_STATUS_MAX_WAIT = float(os.getenv("BOT_STATUS_MAX_WAIT", "60"))
 
 
 class RegisterPayload(BaseModel):
@@ -187,6 +304,12 @@ class BotControlPayload(BaseModel):
     bot_name: str
 
 
+class BotConfigPayload(BaseModel):
+    bot_name: str
+    config: dict
+    expected_version: int | None = None
+
+
 class MeResponse(BaseModel):
     email: EmailStr
     role: str
@@ -270,15 +393,18 @@ def require_user(request: Request, db: Session) -> User:
     auth = request.headers.get("authorization", "")
     if not auth.lower().startswith("bearer "):
         raise HTTPException(status_code=401, detail="unauthorized")
-    token = auth.split(" ", 1)[1]
+    return user_from_token(auth.split(" ", 1)[1], db)
+
+
+def user_from_token(token: str, db: Session) -> User:
     try:
         payload = verify_supabase_token(token)
         return _get_or_create_user_from_supabase(payload, db)
     except Exception as exc:
         logger.warning(
             "supabase token verify failed: %s; claims=%s; iss_env=%s; aud_env=%s",
-            str(exc),
-            _token_debug(token),
+            exc,
+            Lazy(_token_debug, token),
             os.getenv("SUPABASE_ISSUER"),
             os.getenv("SUPABASE_AUDIENCE"),
         )
@@ -287,7 +413,9 @@ def require_user(request: Request, db: Session) -> User:
     try:
         payload = decode_token(token)
     except Exception:
+        _LEGACY_ERROR.inc()
         raise HTTPException(status_code=401, detail="invalid token")
+    _LEGACY_OK.inc()
     email = payload.get("sub")
     user = db.query(User).filter(User.email == email).first()
     if not user:
@@ -307,8 +435,8 @@ def maybe_user_id(request: Request, db: Session):
     except Exception as exc:
         logger.warning(
             "supabase token verify failed (maybe_user_id): %s; claims=%s; iss_env=%s; aud_env=%s",
-            str(exc),
-            _token_debug(token),
+            exc,
+            Lazy(_token_debug, token),
             os.getenv("SUPABASE_ISSUER"),
             os.getenv("SUPABASE_AUDIENCE"),
         )
@@ -316,6 +444,11 @@ def maybe_user_id(request: Request, db: Session):
             return None
     try:
         payload = decode_token(token)
+    except Exception:
+        _LEGACY_ERROR.inc()
+        return None
+    _LEGACY_OK.inc()
+    try:
         email = payload.get("sub")
         u = db.query(User).filter(User.email == email).first()
         return u.id if u else None
@@ -366,9 +499,29 @@ def login(payload: LoginPayload, db: Session = Depends(get_db)):
     return {"access_token": token, "token_type": "bearer"}
 
 
+def not_modified(request: Request, etag: str) -> bool:
+    match = request.headers.get("if-none-match")
+    if not match:
+        return False
+    tags = {t.strip().removeprefix("W/") for t in match.split(",")}
+    return etag in tags or "*" in tags
+
+
+def _conditional(request: Request, response: Response, etag: str) -> Response | None:
+    """304 if the client already has `etag`; otherwise tag `response`."""
+    headers = {"ETag": etag, "Vary": "Authorization", "Cache-Control": "private, no-cache"}
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
 @app.get("/me", response_model=MeResponse)
-def me(request: Request, db: Session = Depends(get_db)):
+def me(request: Request, response: Response, db: Session = Depends(get_db)):
     user = require_user(request, db)
+    unchanged = _conditional(request, response, f'"me-{user.id}-{user.version}"')
+    if unchanged is not None:
+        return unchanged
     return {"email": user.email, "role": user.role, "plan": user.plan, "is_active": user.is_active}
 
 
@@ -439,6 +592,9 @@ def admin_users_update(payload: AdminUserUpdate, request: Request, db: Session =
     if payload.is_active is not None:
         user.is_active = payload.is_active
     db.commit()
+    if payload.is_active is False and worker_pool.size:
+        # Their pool instances would otherwise keep alerting their chat.
+        worker_pool.stop_user(payload.user_id)
     return {"ok": True}
 
 
@@ -469,13 +625,19 @@ def crypto_submit(payload: CryptoSubmit, request: Request, db: Session = Depends
             "tg": (payload.telegram_username or "").strip(),
         },
     )
+    record_submission(db, payload.plan, payload.chain,
+                      payload.asset, payload.amount)
     db.commit()
     return {"ok": True}
 
 
 @app.get("/crypto/my-payments")
-def my_payments(request: Request, db: Session = Depends(get_db)):
+def my_payments(request: Request, response: Response, db: Session = Depends(get_db)):
+    """Latest 50 payments; an If-None-Match hit skips the query."""
     user = require_user(request, db)
+    unchanged = _conditional(request, response, f'"payments-{user.id}-{user.payments_version}"')
+    if unchanged is not None:
+        return unchanged
     rows = db.execute(
         text("""
             SELECT id, plan, chain, asset, amount, tx_hash, status, telegram_username, created_at
@@ -493,7 +655,7 @@ def my_payments(request: Request, db: Session = Depends(get_db)):
 def crypto_approve(payload: ApprovePayload, request: Request, db: Session = Depends(get_db)):
     require_admin(request, db)
     row = db.execute(
-        text("SELECT id, user_id, plan FROM payments WHERE id=:id AND status='pending'"),
+        text("SELECT id, user_id, plan, chain, asset, amount, created_at FROM payments WHERE id=:id AND status='pending'"),
         {"id": payload.payment_id},
     ).fetchone()
     if not row:
@@ -506,50 +668,316 @@ def crypto_approve(payload: ApprovePayload, request: Request, db: Session = Depe
     user.plan = row.plan
     db.execute(text("UPDATE payments SET status='approved' WHERE id=:id"), {
                "id": row.id})
+    record_approval(db, row)
     db.commit()
     return {"ok": True}
 
 
+@app.get("/admin/revenue")
+def admin_revenue(start: str | None = None, end: str | None = None, group_by: str = "day,plan,chain,asset",
+                  request: Request = None, db: Session = Depends(get_db)):
+    require_admin(request, db)
+    cols = tuple(c.strip() for c in group_by.split(",") if c.strip())
+    rows = revenue_report(db, start=start, end=end, group_by=cols)
+    totals = {
+        "submitted_count": sum(r["submitted_count"] for r in rows),
+        "submitted_amount": sum(r["submitted_amount"] for r in rows),
+        "approved_count": sum(r["approved_count"] for r in rows),
+        "approved_amount": sum(r["approved_amount"] for r in rows),
+    }
+    return {"rows": rows, "totals": totals}
+
+
 @app.post("/bot/start")
 def bot_start(payload: BotControlPayload, request: Request, db: Session = Depends(get_db)):
     user = require_user(request, db)
+    require_supervisor()
     if not user.is_active:
         raise HTTPException(status_code=403, detail="inactive plan")
-    return start_bot(payload.bot_name)
+    try:
+        if worker_pool.size:
+            return worker_pool.start_instance(user.id, payload.bot_name)
+        return start_bot(payload.bot_name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="unknown bot")
 
 
 @app.post("/bot/stop")
 def bot_stop(payload: BotControlPayload, request: Request, db: Session = Depends(get_db)):
+    """In the worker pool anyone may stop their own instance, plan or not;
+    the shared per-bot processes need an active plan."""
+    user = require_user(request, db)
+    require_supervisor()
+    try:
+        if worker_pool.size:
+            return worker_pool.stop_instance(user.id, payload.bot_name)
+        if not user.is_active:
+            raise HTTPException(status_code=403, detail="inactive plan")
+        return stop_bot(payload.bot_name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="unknown bot")
+
+
+async def wait_for_bots(since: int, timeout: float):
+    """Until either registry moves; the public version is their sum."""
+    if supervisor.version + worker_pool.version > since:
+        return
+    waits = [asyncio.ensure_future(r.wait_for_version(r.version, timeout))
+             for r in (supervisor, worker_pool)]
+    _, pending = await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+    for w in pending:
+        w.cancel()
+
+
+def _status_caller(request: Request, db: Session) -> tuple[int, str, bool]:
+    """(id, role, is_active) of the caller, with the session closed.
+
+    A long-poll can hold for BOT_STATUS_MAX_WAIT, so the pooled connection
+    goes back first. The values are copied out beforehand: require_user may
+    have committed, which expires the User and makes it unreadable once
+    the session is gone.
+    """
+    try:
+        user = require_user(request, db)
+        return user.id, user.role, user.is_active
+    finally:
+        db.close()
+
+
+@app.get("/bot/status")
+async def bot_status_all(request: Request, since: int | None = None, wait: float = 0,
+                         db: Session = Depends(get_db)):
+    """Registry snapshot with a weak ETag on its version.
+
+    ?since=<version>&wait=<seconds> holds the request until the registry
+    moves past `since` (or the wait runs out), so idle dashboards cost one
+    open connection instead of a poll every few seconds. `instances` are
+    the caller's own bots in the worker pool; admins also get `workers`
+    and pool-wide `telemetry` per bot. Every entry carries p50/p99 tick
+    time, scheduler lag and signal/error counts from the bot runtime;
+    those move the version at most every BOT_TELEMETRY_STATUS_INTERVAL.
+    """
+    user_id, role, is_active = await run_in_threadpool(_status_caller, request, db)
+    require_supervisor()
+    if not is_active:
+        raise HTTPException(status_code=403, detail="inactive plan")
+    if since is not None and wait > 0:
+        await wait_for_bots(since, min(wait, BOT_STATUS_MAX_WAIT))
+    version, bots = supervisor.status_all()
+    pool_version, workers = worker_pool.status_all()
+    version += pool_version
+    etag = f'W/"{version}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag, "Vary": "Authorization"})
+    body = {"version": version, "bots": bots}
+    if worker_pool.size:
+        body["instances"] = worker_pool.instances_for(user_id)
+        if role == "admin":
+            body["workers"] = workers
+            body["telemetry"] = worker_pool.telemetry()
+    return JSONResponse(body, headers={"ETag": etag, "Vary": "Authorization"})
+
+
+def require_active_user(request: Request, db: Session) -> User:
     user = require_user(request, db)
     if not user.is_active:
         raise HTTPException(status_code=403, detail="inactive plan")
-    return stop_bot(payload.bot_name)
+    return user
 
 
-@app.get("/bot/status")
-def bot_status_all(request: Request, db: Session = Depends(get_db)):
+@app.get("/bot/config")
+def get_bot_config(bot_name: str, request: Request, db: Session = Depends(get_db)):
+    user = require_active_user(request, db)
+    try:
+        return latest_config(db, user.id, bot_name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="unknown bot")
+
+
+@app.put("/bot/config")
+def put_bot_config(payload: BotConfigPayload, request: Request, db: Session = Depends(get_db)):
+    """Store a new config version and push it to the running bot.
+
+    Send the version you edited as expected_version to get a 409 instead
+    of silently overwriting a change made elsewhere.
+    """
+    user = require_active_user(request, db)
+    try:
+        saved = save_config(db, user.id, payload.bot_name, payload.config, payload.expected_version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="unknown bot")
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    except IntegrityError:
+        # A concurrent save took the same version number.
+        saved = None
+    if saved is None:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="version conflict")
+    db.commit()
+    if worker_pool.size:
+        worker_pool.push_user_config(user.id, payload.bot_name, saved)
+    elif payload.bot_name in supervisor.names():
+        supervisor.push_config(payload.bot_name, bot_snapshot(db, payload.bot_name))
+    return saved
+
+
+@app.get("/bot/config/history")
+def get_bot_config_history(bot_name: str, request: Request, limit: int = 20, db: Session = Depends(get_db)):
+    user = require_active_user(request, db)
+    if bot_name not in BOT_CONFIG_SCHEMAS:
+        raise HTTPException(status_code=404, detail="unknown bot")
+    return {"bot": bot_name, "versions": config_history(db, user.id, bot_name, max(1, min(limit, 100)))}
+
+
+@app.get("/signals")
+def list_signals(request: Request, bot: str | None = None, symbol: str | None = None,
+                 start: int | None = None, end: int | None = None, cursor: str | None = None,
+                 limit: int = 100, db: Session = Depends(get_db)):
+    """Signal history, newest first. start/end are epoch ms; pass
+    next_cursor back as ?cursor= for the following page. Users see the
+    default profile's signals and their own; admins see everyone's."""
     user = require_user(request, db)
     if not user.is_active:
         raise HTTPException(status_code=403, detail="inactive plan")
-    names = ["trend_rider", "scalper", "reversal"]
-    return {"bots": [bot_status(n) for n in names]}
+    owner = None if user.role == "admin" else user.id
+    try:
+        return query_signals(bot, symbol.upper() if symbol else None, start, end, cursor, limit, user=owner)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
+
+def _int_param(params, key: str):
+    try:
+        return int(params[key]) if key in params else None
+    except ValueError:
+        return None
+
+
+def _is_admin_token(token: str) -> bool:
+    if not token:
+        return False
+    db = SessionLocal()
+    try:
+        return user_from_token(token, db).role == "admin"
+    except HTTPException:
+        return False
+    finally:
+        db.close()
 
 
 @app.websocket("/ws/logs")
 async def ws_logs(websocket: WebSocket):
+    """Stream one bot's log.
+
+    Worker channels (worker-N) need ?token=<admin bearer token>.
+    format=text (default) sends one line per frame, format=json one
+    {"seq", "line"} object per frame, and format=batch coalesces lines for
+    up to `window` ms (or LOG_BATCH_MAX_BYTES) into one JSON array frame.
+    """
     await websocket.accept()
-    bot = websocket.query_params.get("bot", "")
+    params = websocket.query_params
+    bot = params.get("bot", "")
+    if bot not in supervisor.names() and bot not in worker_pool.names():
+        await websocket.send_text("error: unknown bot")
+        await websocket.close()
+        return
+    # Worker logs interleave every tenant's instances, so only admins get them.
+    if bot in worker_pool.names() and not await run_in_threadpool(_is_admin_token, params.get("token", "")):
+        await websocket.send_text("error: admin_only")
+        await websocket.close(code=4403)
+        return
+    fmt = params.get("format", "text")
+    window = 0.0
+    if fmt == "batch":
+        window = min(max(_int_param(params, "window") or LOG_BATCH_WINDOW_MS, 0), 1000) / 1000
+
+    async def send(items):
+        if fmt == "batch":
+            await websocket.send_text(json.dumps([{"seq": s, "line": l} for s, l in items]))
+        elif fmt == "json":
+            for s, l in items:
+                await websocket.send_text(json.dumps({"seq": s, "line": l}))
+        else:
+            for _, l in items:
+                await websocket.send_text(l)
+
+    after = log_hub.resume_point(
+        bot, _int_param(params, "since"), _int_param(params, "backfill"))
+    stream = log_hub.follow(bot, after, window, LOG_BATCH_MAX_BYTES)
+    # The client never sends anything; this only notices it going away.
+    closed = asyncio.ensure_future(websocket.receive())
+    nxt = None
     try:
-        for line in stream_logs(bot):
-            await websocket.send_text(line.rstrip("\n"))
+        while True:
+            if nxt is None:
+                nxt = asyncio.ensure_future(stream.__anext__())
+            await asyncio.wait({nxt, closed}, return_when=asyncio.FIRST_COMPLETED)
+            if closed.done():
+                if closed.result()["type"] == "websocket.disconnect":
+                    return
+                closed = asyncio.ensure_future(websocket.receive())
+                if not nxt.done():
+                    continue
+            try:
+                items = nxt.result()
+            except StopAsyncIteration:
+                await websocket.close(code=1013)
+                return
+            nxt = None
+            await send(items)
     except WebSocketDisconnect:
         return
     except Exception as e:
         await websocket.send_text(f"error: {e}")
+    finally:
+        closed.cancel()
+        if nxt is not None:
+            nxt.cancel()
+            await asyncio.gather(nxt, return_exceptions=True)
+        await stream.aclose()
+
+
+@app.websocket("/ws/dashboard")
+async def ws_dashboard(websocket: WebSocket):
+    await websocket.accept()
+    session = DashboardSession(websocket)
+
+    def check(token: str) -> User:
+        db = SessionLocal()
+        try:
+            user = user_from_token(token, db)
+            if not user.is_active:
+                raise HTTPException(status_code=403, detail="inactive plan")
+            return user
+        finally:
+            db.close()
+
+    try:
+        user = await session.authenticate(check)
+    except HTTPException as e:
+        await session.send({"type": "error", "detail": e.detail})
+        await websocket.close(code=4000 + e.status_code)
+        return
+    except (asyncio.TimeoutError, PermissionError, ValueError):
+        await session.send({"type": "error", "detail": "unauthorized"})
+        await websocket.close(code=4401)
+        return
+    except WebSocketDisconnect:
+        return
+    if not _supervising:
+        await session.send({"type": "error", "detail": "bot_supervisor_elsewhere"})
+        await websocket.close(code=4503)
+        return
+    await session.run(user.id)
 
 
 @app.post("/auth/google", response_model=TokenResponse)
 def auth_google(payload: GoogleToken, db: Session = Depends(get_db)):
+    # google-auth is slow to import and only this endpoint needs it,
+    # so it loads on the first call.
+    from google.oauth2 import id_token
+    from google.auth.transport import requests as google_requests
     try:
         info = id_token.verify_oauth2_token(
             payload.id_token,
@@ -0,0 +1,289 @@
+# backend/metrics.py
+import bisect
+import os
+import threading
+import time
+
+from anyio import to_thread
+from fastapi import Request
+from fastapi.responses import PlainTextResponse, Response
+
+# Optional bearer token for /metrics; unset leaves it open to the scraper.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), registry=None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new()
+        (registry or REGISTRY).register(self)
+
+    def labels(self, *values):
+        """Child for one label set. Look it up once and keep it: the hot
+        path then touches no dict and allocates nothing."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new())
+        return child
+
+    def _label_str(self, key: tuple, extra: str = "") -> str:
+        parts = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in list(self._children.items()):
+            lines += self._render_child(key, child)
+        return lines
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    # += on a float attribute is not atomic across threads, but the GIL
+    # makes lost updates rare enough for monitoring.
+    def inc(self, n: float = 1):
+        self.value += n
+
+    def dec(self, n: float = 1):
+        self.value -= n
+
+    def set(self, v: float):
+        self.value = v
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new(self):
+        return _Value()
+
+    def _render_child(self, key, child):
+        return [f"{self.name}{self._label_str(key)} {_fmt(child.value)}"]
+
+
+class Gauge(Counter):
+    """Settable value; `collect` (called at scrape time) can fill it in."""
+
+    kind = "gauge"
+
+    def __init__(self, *args, collect=None, **kwargs):
+        self.collect = collect
+        super().__init__(*args, **kwargs)
+
+    def render(self) -> list[str]:
+        if self.collect is not None:
+            self.collect(self)
+        return super().render()
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, v: float):
+        self.counts[bisect.bisect_left(self.bounds, v)] += 1
+        self.sum += v
+        self.count += 1
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS,
+                 registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames, registry)
+
+    def _new(self):
+        return _Buckets(self.buckets)
+
+    def _render_child(self, key, child):
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += n
+            le = 'le="%s"' % _fmt(float(bound))
+            lines.append(f"{self.name}_bucket{self._label_str(key, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_str(key)} {_fmt(child.sum)}")
+        lines.append(f"{self.name}_count{self._label_str(key)} {child.count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"duplicate metric: {metric.name}")
+        self.metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route and status class.",
+                        ("app", "method", "route", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency by route.",
+                         ("app", "method", "route"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served.", ("app",))
+THREADPOOL = Gauge("threadpool_threads", "Worker threads for sync endpoints: busy and limit.",
+                   ("app", "state"))
+DB_POOL_WAIT = Histogram("db_pool_checkout_seconds", "Time to get a connection from the pool.", ("db",),
+                         buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0))
+DB_POOL = Gauge("db_pool_connections", "Pool connections by state.", ("db", "state"))
+JWKS_FETCHES = Counter("jwks_fetch_total", "JWKS fetches by result.", ("result",))
+TOKEN_VERIFY = Counter("token_verify_total", "Bearer token verifications by kind and result.",
+                       ("kind", "result"))
+
+
+class MetricsMiddleware:
+    """ASGI middleware: per-route count and latency, plus in-flight.
+
+    Routes are labelled by their path template (/bot/config, not the raw
+    URL), so the label sets are bounded; children for every route, method
+    and status class are created up front by prepare() and looked up with
+    one tuple-keyed dict get per request.
+    """
+
+    def __init__(self, app, name: str = "api"):
+        self.app = app
+        self.name = name
+        self.in_flight = HTTP_IN_FLIGHT.labels(name)
+        self._latency: dict[tuple, _Buckets] = {}
+        self._count: dict[tuple, _Value] = {}
+
+    def prepare(self, routes):
+        for route in routes:
+            path = getattr(route, "path", None)
+            for method in getattr(route, "methods", None) or ():
+                self._children(method, path)
+
+    def _children(self, method: str, route: str):
+        latency = self._latency[(method, route)] = HTTP_LATENCY.labels(self.name, method, route)
+        for cls in STATUS_CLASSES:
+            self._count[(method, route, cls)] = HTTP_REQUESTS.labels(self.name, method, route, cls)
+        return latency
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.in_flight.dec()
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            path = getattr(route, "path", "<unmatched>")
+            method = scope["method"] if scope["method"] in _METHODS else "OTHER"
+            latency = self._latency.get((method, path)) or self._children(method, path)
+            latency.observe(elapsed)
+            self._count[(method, path, f"{status // 100}xx")].inc()
+
+
+def instrument_app(app, name: str):
+    """Add the middleware, route children and the /metrics endpoint."""
+    busy, limit = THREADPOOL.labels(name, "busy"), THREADPOOL.labels(name, "limit")
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics(request: Request):
+        if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+            return Response(status_code=401)
+        # The anyio limiter is per event loop, so read it here on the loop.
+        limiter = to_thread.current_default_thread_limiter()
+        busy.set(limiter.borrowed_tokens)
+        limit.set(limiter.total_tokens)
+        return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+    app.add_middleware(MetricsMiddleware, name=name)
+
+    @app.on_event("startup")
+    async def _prepare_route_metrics():
+        # add_middleware only builds the stack on first request; find ours.
+        layer = app.middleware_stack
+        while layer is not None and not isinstance(layer, MetricsMiddleware):
+            layer = getattr(layer, "app", None)
+        if layer is not None:
+            layer.prepare(app.routes)
+
+
+def instrument_pool(engine, name: str = "main"):
+    """Time pool checkouts and report pool occupancy at scrape time."""
+    pool = engine.pool
+    wait = DB_POOL_WAIT.labels(name)
+    connect = pool.connect
+
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            wait.observe(time.perf_counter() - start)
+
+    pool.connect = timed_connect
+    _pools.append((pool, DB_POOL.labels(name, "checked_out"), DB_POOL.labels(name, "idle")))
+
+
+_pools: list[tuple] = []
+
+
+def _collect_pools(gauge):
+    for pool, checked_out, idle in _pools:
+        # Not every pool class counts (SQLite memory DBs use a static one).
+        checked_out.set(pool.checkedout() if hasattr(pool, "checkedout") else 0)
+        idle.set(pool.checkedin() if hasattr(pool, "checkedin") else 0)
+
+
+DB_POOL.collect = _collect_pools
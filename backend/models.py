@@ -16,6 +16,9 @@ class User(Base):
     is_active: Mapped[bool] = mapped_column(Boolean, default=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow)
+    # Bumped by triggers (see ensure_version_triggers) and used as ETags.
+    version: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    payments_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     subscription = relationship(
         "Subscription", back_populates="user", uselist=False)
 
@@ -0,0 +1,107 @@
+# backend/revenue.py
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# One row per (day, plan, chain, asset). Days follow the payment's created_at
+# so the table always equals a GROUP BY over payments, just precomputed.
+ROLLUP_DDL = """
+    CREATE TABLE IF NOT EXISTS revenue_daily (
+      day DATE NOT NULL,
+      plan TEXT NOT NULL,
+      chain TEXT NOT NULL,
+      asset TEXT NOT NULL,
+      submitted_count INTEGER NOT NULL DEFAULT 0,
+      submitted_amount REAL NOT NULL DEFAULT 0,
+      approved_count INTEGER NOT NULL DEFAULT 0,
+      approved_amount REAL NOT NULL DEFAULT 0,
+      PRIMARY KEY (day, plan, chain, asset)
+    );
+"""
+
+_UPSERT_SUBMITTED = text("""
+    INSERT INTO revenue_daily (day, plan, chain, asset, submitted_count, submitted_amount)
+    VALUES (date('now'), :plan, :chain, :asset, 1, :amount)
+    ON CONFLICT(day, plan, chain, asset) DO UPDATE SET
+      submitted_count = submitted_count + 1,
+      submitted_amount = submitted_amount + excluded.submitted_amount
+""")
+
+_UPSERT_APPROVED = text("""
+    INSERT INTO revenue_daily (day, plan, chain, asset, approved_count, approved_amount)
+    VALUES (:day, :plan, :chain, :asset, 1, :amount)
+    ON CONFLICT(day, plan, chain, asset) DO UPDATE SET
+      approved_count = approved_count + 1,
+      approved_amount = approved_amount + excluded.approved_amount
+""")
+
+GROUP_COLUMNS = ("day", "plan", "chain", "asset")
+
+
+def rebuild_rollup(conn) -> None:
+    """Recompute revenue_daily from a full scan of payments."""
+    conn.execute(text("DELETE FROM revenue_daily"))
+    conn.execute(text("""
+        INSERT INTO revenue_daily (day, plan, chain, asset,
+                                   submitted_count, submitted_amount,
+                                   approved_count, approved_amount)
+        SELECT date(created_at), plan, chain, asset,
+               COUNT(*), SUM(amount),
+               SUM(CASE WHEN status='approved' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN status='approved' THEN amount ELSE 0 END)
+        FROM payments
+        GROUP BY date(created_at), plan, chain, asset
+    """))
+
+
+def ensure_rollup(conn) -> None:
+    """Create revenue_daily and backfill it once if payments predate it."""
+    conn.execute(text(ROLLUP_DDL))
+    has_rollup = conn.execute(
+        text("SELECT 1 FROM revenue_daily LIMIT 1")).first()
+    has_payments = conn.execute(
+        text("SELECT 1 FROM payments LIMIT 1")).first()
+    if has_payments and not has_rollup:
+        rebuild_rollup(conn)
+
+
+def record_submission(db: Session, plan: str, chain: str, asset: str, amount: float) -> None:
+    """Count a new pending payment. Caller commits with the payment insert."""
+    db.execute(_UPSERT_SUBMITTED, {
+        "plan": plan, "chain": chain, "asset": asset, "amount": amount,
+    })
+
+
+def record_approval(db: Session, row) -> None:
+    """Count an approved payment row (needs created_at, plan, chain, asset, amount)."""
+    db.execute(_UPSERT_APPROVED, {
+        "day": str(row.created_at)[:10],
+        "plan": row.plan, "chain": row.chain, "asset": row.asset,
+        "amount": row.amount,
+    })
+
+
+def revenue_report(db: Session, start: str | None = None, end: str | None = None,
+                   group_by: tuple[str, ...] = GROUP_COLUMNS) -> list[dict]:
+    """Sum rollup rows in [start, end]; cost scales with days, not payments."""
+    cols = [c for c in group_by if c in GROUP_COLUMNS]
+    select_cols = ", ".join(cols + [
+        "SUM(submitted_count) AS submitted_count",
+        "SUM(submitted_amount) AS submitted_amount",
+        "SUM(approved_count) AS approved_count",
+        "SUM(approved_amount) AS approved_amount",
+    ])
+    where = []
+    params = {}
+    if start:
+        where.append("day >= :start")
+        params["start"] = start
+    if end:
+        where.append("day <= :end")
+        params["end"] = end
+    sql = f"SELECT {select_cols} FROM revenue_daily"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if cols:
+        sql += f" GROUP BY {', '.join(cols)} ORDER BY {', '.join(cols)}"
+    rows = db.execute(text(sql), params).fetchall()
+    return [dict(r._mapping) for r in rows if r.submitted_count is not None]
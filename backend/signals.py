@@ -0,0 +1,83 @@
+# backend/signals.py
+import json
+import os
+import sqlite3
+from pathlib import Path
+
+# Written by the bots (bots/runtime/journal.py); the API only reads it.
+SIGNAL_DB = Path(os.getenv("SIGNAL_DB", "./signals.db"))
+SIGNALS_MAX_PAGE = int(os.getenv("SIGNALS_MAX_PAGE", "500"))
+
+_COLUMNS = "id, ts, bot, symbol, side, price, detail"
+
+
+def encode_cursor(ts: int, id_: int) -> str:
+    return f"{ts}.{id_}"
+
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    ts, _, id_ = cursor.partition(".")
+    return int(ts), int(id_)
+
+
+def query_signals(bot: str | None = None, symbol: str | None = None,
+                  start: int | None = None, end: int | None = None,
+                  cursor: str | None = None, limit: int = 100,
+                  user: int | str | None = None, path: Path = SIGNAL_DB) -> dict:
+    """Newest-first page of signals with start <= ts < end (epoch ms).
+
+    Paging is keyset on (ts, id): next_cursor is the last row's position,
+    so each page is one index range scan however deep the client pages.
+    With `user`, rows from other users' profiles (detail.user) are left
+    out; untagged rows from the default profile are shared.
+    """
+    limit = max(1, min(limit, SIGNALS_MAX_PAGE))
+    where, params = [], []
+    for col, value in (("bot", bot), ("symbol", symbol)):
+        if value:
+            where.append(f"{col} = ?")
+            params.append(value)
+    if user is not None:
+        where.append("(json_extract(detail, '$.user') IS NULL"
+                     " OR CAST(json_extract(detail, '$.user') AS TEXT) = ?)")
+        params.append(str(user))
+    if start is not None:
+        where.append("ts >= ?")
+        params.append(start)
+    if end is not None:
+        where.append("ts < ?")
+        params.append(end)
+    if cursor:
+        cts, cid = decode_cursor(cursor)
+        where.append("(ts < ? OR (ts = ? AND id < ?))")
+        params += [cts, cts, cid]
+    sql = f"SELECT {_COLUMNS} FROM signals"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY ts DESC, id DESC LIMIT ?"
+    params.append(limit + 1)
+
+    if not path.exists():
+        return {"signals": [], "next_cursor": None}
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=5)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    except sqlite3.OperationalError as e:
+        # The bots have not created the table yet.
+        if "no such table" in str(e):
+            return {"signals": [], "next_cursor": None}
+        raise
+    finally:
+        conn.close()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    out = []
+    for r in rows:
+        item = dict(r)
+        item["detail"] = json.loads(item["detail"]) if item["detail"] else None
+        out.append(item)
+    return {
+        "signals": out,
+        "next_cursor": encode_cursor(rows[-1]["ts"], rows[-1]["id"]) if more else None,
+    }
@@ -0,0 +1,164 @@
+# backend/sqlprofile.py
+import atexit
+import contextvars
+import hashlib
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import time
+
+from sqlalchemy import event
+
+from .applog import LOG_QUEUE_SIZE, AsyncQueueHandler
+
+logger = logging.getLogger("backend.sql")
+
+# Off unless SQL_PROFILE=1: the hooks cost a few microseconds per query.
+SQL_PROFILE = os.getenv("SQL_PROFILE", "").lower() in ("1", "true", "yes")
+SQL_SLOW_MS = float(os.getenv("SQL_SLOW_MS", "100"))
+# Same statement shape this many times in one request looks like N+1.
+SQL_REPEAT_THRESHOLD = int(os.getenv("SQL_REPEAT_THRESHOLD", "5"))
+SQL_SLOW_LOG = os.getenv("SQL_SLOW_LOG", "")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"(?:\?|%s|:\w+|\$\d+)")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+_current: contextvars.ContextVar["RequestProfile | None"] = contextvars.ContextVar("sql_profile", default=None)
+
+
+def normalize(sql: str) -> str:
+    """Statement shape: literals and bind markers become ?, IN lists (...)."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PARAM.sub("?", sql)
+    sql = _IN_LIST.sub("(...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def fingerprint(sql: str) -> str:
+    return hashlib.blake2b(normalize(sql).encode(), digest_size=6).hexdigest()
+
+
+class RequestProfile:
+    """Queries issued while serving one request."""
+
+    __slots__ = ("count", "seconds", "slowest", "slowest_sql", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest = 0.0
+        self.slowest_sql = ""
+        self.shapes: dict[str, int] = {}
+
+    def add(self, sql: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        if seconds > self.slowest:
+            self.slowest = seconds
+            self.slowest_sql = sql
+        shape = normalize(sql)
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+    def repeated(self, threshold: int = SQL_REPEAT_THRESHOLD) -> list[tuple[str, int]]:
+        return sorted(((s, n) for s, n in self.shapes.items() if n >= threshold), key=lambda x: -x[1])
+
+
+# The start time rides on the execution context, which is dropped with the
+# statement, so a query that raises (no after_cursor_execute) leaves nothing
+# behind on the pooled connection.
+def _before(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._sql_profile_start = time.perf_counter()
+
+
+def _after(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_sql_profile_start", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    profile = _current.get()
+    if profile is not None:
+        profile.add(statement, elapsed)
+    if elapsed * 1000 >= SQL_SLOW_MS:
+        logger.warning("slow query %.1f ms [%s] %s", elapsed * 1000, fingerprint(statement), normalize(statement))
+
+
+class SQLProfileMiddleware:
+    """Per-request query count, DB time and slowest statement.
+
+    The totals go back in a Server-Timing header, so they show up in the
+    browser's network panel. A request that runs one statement shape
+    SQL_REPEAT_THRESHOLD or more times is logged as a likely N+1.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        profile = RequestProfile()
+        token = _current.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and profile.count:
+                headers = list(message.get("headers") or [])
+                headers.append((b"server-timing", (
+                    f'db;dur={profile.seconds * 1000:.2f};desc="{profile.count} queries"'
+                ).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self._report(scope, profile)
+
+    @staticmethod
+    def _report(scope, profile: RequestProfile):
+        if not profile.count:
+            return
+        route = getattr(scope.get("route"), "path", scope.get("path"))
+        for shape, n in profile.repeated():
+            logger.warning("possible N+1 on %s %s: %d x [%s] %s",
+                           scope["method"], route, n, fingerprint(shape), shape)
+        logger.debug("%s %s: %d queries, %.1f ms in DB, slowest %.1f ms: %s",
+                     scope["method"], route, profile.count, profile.seconds * 1000,
+                     profile.slowest * 1000, normalize(profile.slowest_sql))
+
+
+def enable_sql_profiling(app, engine):
+    """Hook the engine and add the middleware (see SQL_PROFILE)."""
+    event.listen(engine, "before_cursor_execute", _before)
+    event.listen(engine, "after_cursor_execute", _after)
+    app.add_middleware(SQLProfileMiddleware)
+    if SQL_SLOW_LOG:
+        _start_slow_log(SQL_SLOW_LOG)
+
+
+_slow_listener: logging.handlers.QueueListener | None = None
+
+
+def _start_slow_log(path: str):
+    """Copy backend.sql records to `path` from a writer thread (idempotent).
+
+    The records come from request threads; a file write there would make
+    every slow query slower still.
+    """
+    global _slow_listener
+    if _slow_listener is not None:
+        return
+    output = logging.FileHandler(path, delay=True)
+    output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    handler = AsyncQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    logger.addHandler(handler)
+    _slow_listener = logging.handlers.QueueListener(handler.queue, output)
+    _slow_listener.start()
+    atexit.register(_slow_listener.stop)
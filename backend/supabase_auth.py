@@ -6,6 +6,8 @@ from typing import Any
 import requests
 from jose import jwt, jwk
 
+from .metrics import JWKS_FETCHES, TOKEN_VERIFY
+
 
 SUPABASE_JWKS_URL = os.getenv("SUPABASE_JWKS_URL", "")
 SUPABASE_ISSUER = os.getenv("SUPABASE_ISSUER", "")
@@ -17,8 +19,21 @@ JWKS_CACHE_TTL = int(os.getenv("SUPABASE_JWKS_CACHE_TTL", "3600"))
 
 _JWKS_CACHE: dict[str, Any] = {"keys": [], "fetched_at": 0}
 
+_JWKS_OK, _JWKS_ERROR = JWKS_FETCHES.labels("ok"), JWKS_FETCHES.labels("error")
+_VERIFY_OK, _VERIFY_ERROR = TOKEN_VERIFY.labels("supabase", "ok"), TOKEN_VERIFY.labels("supabase", "error")
+
 
 def _fetch_jwks() -> dict:
+    try:
+        data = _request_jwks()
+    except Exception:
+        _JWKS_ERROR.inc()
+        raise
+    _JWKS_OK.inc()
+    return data
+
+
+def _request_jwks() -> dict:
     if not SUPABASE_JWKS_URL:
         raise ValueError("SUPABASE_JWKS_URL is not set")
     headers = {}
@@ -52,6 +67,16 @@ def _get_jwks() -> dict:
 
 
 def verify_supabase_token(token: str) -> dict:
+    try:
+        claims = _verify(token)
+    except Exception:
+        _VERIFY_ERROR.inc()
+        raise
+    _VERIFY_OK.inc()
+    return claims
+
+
+def _verify(token: str) -> dict:
     if not token:
         raise ValueError("missing token")
     header = jwt.get_unverified_header(token)
@@ -0,0 +1,117 @@
+# backend/telemetry.py
+import os
+import threading
+import time
+from collections import deque
+
+# Bots write reports to stdout behind this prefix (bots/runtime/telemetry.py).
+TELEMETRY_PREFIX = "@telemetry "
+# Reports kept per strategy; at the default 10 s interval that is a minute.
+TELEMETRY_WINDOW = int(os.getenv("TELEMETRY_WINDOW", "6"))
+
+_COUNTERS = ("ticks", "errors", "skipped", "overruns", "signals")
+
+
+def _percentile(hist: dict[int, int], total: int, q: float) -> int:
+    rank = max(1, -(-total * q // 100))
+    seen = 0
+    for value in sorted(hist):
+        seen += hist[value]
+        if seen >= rank:
+            return value
+    return 0
+
+
+class _Series:
+    __slots__ = ("reports", "totals", "lag_ms", "updated")
+
+    def __init__(self, window: int):
+        self.reports: deque = deque(maxlen=window)
+        self.totals = dict.fromkeys(_COUNTERS, 0)
+        self.lag_ms = 0.0
+        self.updated = 0.0
+
+
+class TelemetryStore:
+    """Latest per-strategy runtime reports from every bot process.
+
+    Each report covers one interval: counter deltas plus a sparse tick
+    duration histogram. The store keeps the last TELEMETRY_WINDOW reports
+    per strategy key ("scalper", or "scalper:<user>" in the worker pool)
+    and merges them on read, so p50/p99 cover roughly the last minute in
+    fixed memory however long a bot has run.
+    """
+
+    def __init__(self, window: int = TELEMETRY_WINDOW):
+        self.window = window
+        self._series: dict[str, _Series] = {}
+        self._lock = threading.Lock()
+
+    def ingest(self, payload: dict) -> list[str]:
+        """Store one report line's payload; returns the keys it touched."""
+        interval = float(payload.get("interval") or 0)
+        keys = []
+        with self._lock:
+            for key, entry in (payload.get("strategies") or {}).items():
+                series = self._series.get(key)
+                if series is None:
+                    series = self._series[key] = _Series(self.window)
+                hist = {int(v): int(n) for v, n in entry.get("tick_us") or ()}
+                series.reports.append((interval, hist, int(entry.get("tick_max_us") or 0),
+                                       int(entry.get("ticks") or 0), int(entry.get("signals") or 0)))
+                for name in _COUNTERS:
+                    series.totals[name] += int(entry.get(name) or 0)
+                series.lag_ms = float(entry.get("lag_ms") or 0)
+                series.updated = time.time()
+                keys.append(key)
+        return keys
+
+    def forget(self, key: str):
+        with self._lock:
+            self._series.pop(key, None)
+
+    def summary(self, key: str) -> dict | None:
+        with self._lock:
+            series = self._series.get(key)
+            return self._summarize([series]) if series is not None else None
+
+    def summary_prefix(self, prefix: str) -> dict | None:
+        """One summary over every key starting with `prefix` (a bot's
+        instances in the pool)."""
+        with self._lock:
+            found = [s for k, s in self._series.items() if k.startswith(prefix)]
+            return self._summarize(found) if found else None
+
+    @staticmethod
+    def _summarize(series: list[_Series]) -> dict:
+        hist: dict[int, int] = {}
+        seconds = 0.0
+        ticks = signals = tick_max = 0
+        totals = dict.fromkeys(_COUNTERS, 0)
+        for s in series:
+            for interval, h, top, n_ticks, n_signals in s.reports:
+                for value, n in h.items():
+                    hist[value] = hist.get(value, 0) + n
+                tick_max = max(tick_max, top)
+                ticks += n_ticks
+                signals += n_signals
+            seconds = max(seconds, sum(r[0] for r in s.reports))
+            for name in _COUNTERS:
+                totals[name] += s.totals[name]
+        recorded = sum(hist.values())
+        per_min = 60 / seconds if seconds else 0
+        return {
+            "tick_p50_ms": round(_percentile(hist, recorded, 50) / 1000, 3) if recorded else None,
+            "tick_p99_ms": round(min(_percentile(hist, recorded, 99), tick_max) / 1000, 3) if recorded else None,
+            "tick_max_ms": round(tick_max / 1000, 3),
+            "lag_ms": max(s.lag_ms for s in series),
+            "ticks_per_min": round(ticks * per_min, 1),
+            "signals_per_min": round(signals * per_min, 2),
+            "errors": totals["errors"],
+            "skipped": totals["skipped"],
+            "overruns": totals["overruns"],
+            "updated": max(s.updated for s in series),
+        }
+
+
+telemetry_store = TelemetryStore()
@@ -0,0 +1,71 @@
+# test_applog.py
+import io
+import json
+import logging
+import queue
+import time
+
+from backend.applog import AsyncQueueHandler, JSONFormatter, Lazy, SamplingFilter
+
+
+def _record(msg, *args, level=logging.WARNING, name="auth"):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_sampling_counts_suppressed_repeats():
+    f = SamplingFilter(burst=2, window=0.05)
+    passed = [f.filter(_record("verify failed: %s", i)) for i in range(5)]
+    assert passed == [True, True, False, False, False]
+    assert f.filter(_record("other: %s", 1))
+    assert f.filter(_record("verify failed: %s", 9, level=logging.ERROR))
+    assert all(f.filter(_record("verify failed: %s", i, level=logging.INFO)) for i in range(5))
+
+    time.sleep(0.06)
+    rec = _record("verify failed: %s", 6)
+    assert f.filter(rec)
+    assert rec.suppressed == 3
+
+
+def test_lazy_args_run_only_when_formatted():
+    calls = []
+
+    def expensive(token):
+        calls.append(token)
+        return {"sub": token}
+
+    q = queue.Queue(1)
+    handler = AsyncQueueHandler(q)
+    logger = logging.getLogger("test_applog.lazy")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        logger.warning("claims=%s", Lazy(expensive, "a"))
+        logger.warning("claims=%s", Lazy(expensive, "b"))  # queue full: dropped
+    finally:
+        logger.removeHandler(handler)
+    assert calls == [] and handler.dropped == 1
+
+    line = JSONFormatter().format(q.get_nowait())
+    out = json.loads(line)
+    assert calls == ["a"]
+    assert out["msg"] == "claims={'sub': 'a'}"
+    assert out["level"] == "warning" and out["logger"] == "test_applog.lazy"
+
+
+def test_json_extras_and_exceptions():
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JSONFormatter())
+    logger = logging.getLogger("test_applog.json")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logger.exception("boom %s", "x", extra={"event_id": "evt_1"})
+    finally:
+        logger.removeHandler(handler)
+    out = json.loads(stream.getvalue())
+    assert out["msg"] == "boom x" and out["event_id"] == "evt_1"
+    assert "ZeroDivisionError" in out["exc"]
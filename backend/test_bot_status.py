@@ -0,0 +1,77 @@
+# test_bot_status.py
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+from backend.auth import create_access_token
+from backend.bot import supervisor
+from backend.database import SessionLocal
+from backend.models import User
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "ALLOW_LEGACY_TOKENS", True)
+    db = SessionLocal()
+    if not db.query(User).filter(User.email == "status@x.com").first():
+        db.add(User(email="status@x.com", password_hash="x", role="user", is_active=True))
+        db.commit()
+    db.close()
+    # Entering the client runs startup, which attaches the supervisor.
+    with TestClient(main.app) as c:
+        c.headers["authorization"] = "Bearer " + create_access_token({"sub": "status@x.com"})
+        yield c
+
+
+def _bump_later(delay):
+    bot = supervisor._bots[supervisor.names()[0]]
+    timer = threading.Timer(delay, supervisor._loop.call_soon_threadsafe, (supervisor._changed, bot))
+    timer.start()
+    return timer
+
+
+def test_matching_etag_gets_304(client):
+    r = client.get("/bot/status")
+    assert r.status_code == 200 and r.headers["etag"] == f'W/"{r.json()["version"]}"'
+    again = client.get("/bot/status", headers={"if-none-match": r.headers["etag"]})
+    assert again.status_code == 304 and again.headers["etag"] == r.headers["etag"]
+
+
+def test_long_poll_wakes_on_a_version_bump(client):
+    version = client.get("/bot/status").json()["version"]
+    timer = _bump_later(0.3)
+    started = time.monotonic()
+    r = client.get("/bot/status", params={"since": version, "wait": 10})
+    timer.join()
+    assert r.json()["version"] > version
+    assert 0.2 < time.monotonic() - started < 5
+
+
+def test_long_poll_returns_the_same_version_after_the_wait(client):
+    version = client.get("/bot/status").json()["version"]
+    r = client.get("/bot/status", params={"since": version, "wait": 0.2},
+                   headers={"if-none-match": f'W/"{version}"'})
+    assert r.status_code == 304
+
+
+def test_caller_survives_a_commit_in_require_user(client, monkeypatch):
+    # A first Supabase login or email sync commits, expiring the User.
+    real = main.require_user
+
+    def committing(request, db):
+        user = real(request, db)
+        db.commit()
+        return user
+
+    monkeypatch.setattr(main, "require_user", committing)
+    assert client.get("/bot/status").status_code == 200
+
+
+def test_several_configured_workers_refuse_to_start(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    with pytest.raises(RuntimeError, match="single worker"):
+        with TestClient(main.app):
+            pass
@@ -0,0 +1,53 @@
+# test_botconfig.py
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.botconfig import bot_snapshot, config_history, ensure_config_table, latest_config, save_config
+from backend.database import Base
+from backend.models import User
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 't.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        ensure_config_table(conn)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        User(email="a@x.com", password_hash="x", is_active=True),
+        User(email="b@x.com", password_hash="x", is_active=False),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_versions_conflicts_and_snapshot(db):
+    assert latest_config(db, 1, "trend_rider")["version"] == 0
+    saved = save_config(db, 1, "trend_rider", {"fast": 5, "symbols": ["solusdt"]}, expected_version=0)
+    assert saved["version"] == 1 and saved["config"]["symbols"] == ["SOLUSDT"]
+    assert save_config(db, 1, "trend_rider", {"fast": 6}, expected_version=0) is None
+    save_config(db, 1, "trend_rider", {"fast": 7}, expected_version=1)
+    save_config(db, 2, "trend_rider", {"fast": 4})
+    db.commit()
+
+    assert [h["version"] for h in config_history(db, 1, "trend_rider")] == [2, 1]
+    snap = bot_snapshot(db, "trend_rider")
+    assert list(snap["users"]) == ["1"] and snap["users"]["1"]["fast"] == 7
+    save_config(db, 1, "trend_rider", {"enabled": False})
+    later = bot_snapshot(db, "trend_rider")
+    assert later["users"] == {} and later["version"] > snap["version"]
+
+
+def test_validation(db):
+    with pytest.raises(ValidationError):
+        save_config(db, 1, "trend_rider", {"fast": 30, "slow": 20})
+    with pytest.raises(ValidationError):
+        save_config(db, 1, "scalper", {"symbols": ["BTC-USD"]})
+    with pytest.raises(ValidationError):
+        save_config(db, 1, "reversal", {"unknown": 1})
+    with pytest.raises(KeyError):
+        save_config(db, 1, "nope", {})
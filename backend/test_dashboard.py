@@ -0,0 +1,113 @@
+# test_dashboard.py
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from backend import main
+from backend.auth import create_access_token
+from backend.bot import BotProcess, supervisor
+from backend.database import SessionLocal
+from backend.dashboard import DashboardSession
+from backend.loghub import log_hub
+from backend.models import User
+from backend.workers import WorkerPool
+
+BOT = "scalper"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "ALLOW_LEGACY_TOKENS", True)
+    db = SessionLocal()
+    if not db.query(User).filter(User.email == "dash@x.com").first():
+        db.add(User(email="dash@x.com", password_hash="x", role="user", is_active=True))
+        db.commit()
+    db.close()
+    with TestClient(main.app) as c:
+        yield c
+
+
+def _connect(client):
+    ws = client.websocket_connect("/ws/dashboard").__enter__()
+    ws.send_json({"type": "auth", "token": create_access_token({"sub": "dash@x.com"})})
+    return ws
+
+
+def _publish(line):
+    supervisor._loop.call_soon_threadsafe(log_hub.publish, BOT, line)
+
+
+def test_bad_token_is_rejected(client):
+    with client.websocket_connect("/ws/dashboard") as ws:
+        ws.send_json({"type": "auth", "token": "nope"})
+        assert ws.receive_json()["type"] == "error"
+        with pytest.raises(WebSocketDisconnect) as e:
+            ws.receive_json()
+        assert e.value.code == 4401
+
+
+def test_status_subscribe_unsubscribe_and_bad_frames(client):
+    ws = _connect(client)
+    try:
+        first = ws.receive_json()
+        assert first["type"] == "status" and BOT in [b["name"] for b in first["bots"]]
+
+        ws.send_json({"type": "subscribe", "bots": [BOT, "nope"]})
+        assert ws.receive_json() == {"type": "error", "detail": "unknown bot", "bot": "nope"}
+        _publish("hello")
+        msg = ws.receive_json()
+        assert msg["type"] == "logs" and msg["bot"] == BOT and msg["lines"][-1]["line"] == "hello"
+
+        # A malformed frame gets an error instead of ending the session.
+        ws.send_text("{not json")
+        assert ws.receive_json() == {"type": "error", "detail": "invalid json"}
+
+        ws.send_json({"type": "unsubscribe", "bots": [BOT]})
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "error", "detail": "unknown message"}
+        _publish("after unsubscribe")
+        ws.send_text("[")
+        assert ws.receive_json() == {"type": "error", "detail": "invalid json"}
+
+        supervisor._loop.call_soon_threadsafe(supervisor._changed, supervisor._bots[BOT])
+        push = ws.receive_json()
+        assert push["type"] == "status" and push["bot"]["name"] == BOT
+    finally:
+        ws.__exit__(None, None, None)
+
+
+def test_pool_mode_follows_the_users_own_instance(tmp_path, monkeypatch):
+    pool = WorkerPool(size=1, state_file=tmp_path / "pool.json")
+    pool.start_instance(7, BOT)
+    pool._log(BotProcess("worker-0", tmp_path / "w.py"), f"@instance {BOT}:7 tick 1")
+    pool._log(BotProcess("worker-0", tmp_path / "w.py"), "@instance reversal:8 not placed here")
+    assert log_hub.recent(f"{BOT}:7", 1)[0][1] == "tick 1"
+    assert log_hub.recent("worker-0", 1)[0][1] == "@instance reversal:8 not placed here"
+
+    monkeypatch.setattr("backend.dashboard.worker_pool", pool)
+    session = DashboardSession(None)
+    session.user_id = 7
+    assert session.channel(BOT) == f"{BOT}:7"
+    assert session.channel("worker-0") is None
+
+
+def test_ws_logs_batch_frames_follow_the_window_and_byte_cap(client, monkeypatch):
+    monkeypatch.setattr(main, "LOG_BATCH_MAX_BYTES", 25)
+    loop = supervisor._loop
+    subscribers = lambda: log_hub.stats().get(BOT, {}).get("subscribers", 0)  # noqa: E731
+    before = subscribers()
+    with client.websocket_connect(f"/ws/logs?bot={BOT}&format=batch&window=300") as ws:
+        deadline = time.monotonic() + 5
+        while subscribers() == before:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        for i, line in enumerate("abc"):
+            loop.call_soon_threadsafe(loop.call_later, i * 0.03, log_hub.publish, BOT, line)
+        assert [m["line"] for m in ws.receive_json()] == ["a", "b", "c"]
+
+        for i in range(5):
+            _publish(f"{i}" * 10)
+        assert len(ws.receive_json()) == 3
+        assert len(ws.receive_json()) == 2
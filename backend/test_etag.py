@@ -0,0 +1,65 @@
+# test_etag.py
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+from backend import main
+from backend.auth import create_access_token
+from backend.database import SessionLocal, engine
+from backend.models import User
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "ALLOW_LEGACY_TOKENS", True)
+    db = SessionLocal()
+    if not db.query(User).filter(User.email == "etag@x.com").first():
+        db.add(User(email="etag@x.com", password_hash="x", role="user", is_active=True))
+        db.commit()
+    db.close()
+    c = TestClient(main.app)
+    c.headers["authorization"] = "Bearer " + create_access_token({"sub": "etag@x.com"})
+    return c
+
+
+@pytest.fixture
+def payment_queries():
+    seen = []
+
+    def count(conn, cursor, statement, *args):
+        if "FROM payments" in statement:
+            seen.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    yield seen
+    event.remove(engine, "before_cursor_execute", count)
+
+
+def test_304_on_a_matching_tag_skips_the_payments_query(client, payment_queries):
+    r = client.get("/crypto/my-payments")
+    assert r.status_code == 200 and r.headers["etag"]
+    assert len(payment_queries) == 1
+
+    again = client.get("/crypto/my-payments", headers={"if-none-match": r.headers["etag"]})
+    assert again.status_code == 304 and again.headers["etag"] == r.headers["etag"]
+    assert len(payment_queries) == 1
+
+
+def test_writes_move_the_right_stamp(client):
+    me = client.get("/me").headers["etag"]
+    payments = client.get("/crypto/my-payments").headers["etag"]
+
+    r = client.post("/crypto/submit", json={"plan": "pro", "amount": 10, "tx_hash": "0xetag"})
+    assert r.status_code == 200
+    assert client.get("/me", headers={"if-none-match": me}).status_code == 304
+    fresh = client.get("/crypto/my-payments", headers={"if-none-match": payments})
+    assert fresh.status_code == 200 and fresh.headers["etag"] != payments
+    assert fresh.json()["payments"][0]["tx_hash"] == "0xetag"
+    payments = fresh.headers["etag"]
+
+    # Raw SQL outside the ORM still moves users.version via the trigger.
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE users SET plan = 'elite' WHERE email = 'etag@x.com'"))
+    fresh = client.get("/me", headers={"if-none-match": me})
+    assert fresh.status_code == 200 and fresh.json()["plan"] == "elite"
+    assert client.get("/crypto/my-payments", headers={"if-none-match": payments}).status_code == 304
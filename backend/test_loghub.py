@@ -0,0 +1,127 @@
+# test_loghub.py
+import asyncio
+import threading
+
+from backend.loghub import LogHub
+from backend.logstore import LogStore
+
+
+def test_fanout_reaches_every_subscriber():
+    async def run():
+        hub = LogHub(ring_size=10, queue_size=10)
+        a, b = hub.subscribe("scalper"), hub.subscribe("scalper")
+        hub.publish("scalper", "tick 1")
+        hub.publish("scalper", "tick 2")
+        got_a = [await a.get(), await a.get()]
+        got_b = [await b.get(), await b.get()]
+        assert got_a == got_b == [(1, "tick 1"), (2, "tick 2")]
+        assert hub.recent("scalper", 1) == [(2, "tick 2")]
+
+    asyncio.run(run())
+
+
+def test_slow_subscriber_skips_ahead_then_is_dropped():
+    async def run():
+        hub = LogHub(ring_size=100, queue_size=4)
+        slow = hub.subscribe("reversal")
+        for i in range(5):
+            hub.publish("reversal", f"line {i}")
+        # Backlog was discarded and replaced by a notice plus the newest line.
+        assert (await slow.get())[1] == "[loghub] skipped 4 lines"
+        assert await slow.get() == (5, "line 4")
+
+        for i in range(200):
+            hub.publish("reversal", f"flood {i}")
+        assert slow.closed
+        assert hub.stats()["reversal"]["subscribers"] == 0
+
+    asyncio.run(run())
+
+
+def test_stale_since_resumes_at_head():
+    async def run():
+        hub = LogHub(ring_size=10, queue_size=10)
+        for i in range(3):
+            hub.publish("scalper", f"line {i}")
+        # A since from before a restart, and a nonsense backfill, both land
+        # on the live head instead of somewhere no line will ever reach.
+        assert hub.resume_point("scalper", since=500) == 3
+        assert hub.resume_point("scalper", backfill=-10) == 3
+        assert hub.resume_point("scalper", since=1) == 1
+
+        stream = hub.follow("scalper", hub.resume_point("scalper", since=500))
+        nxt = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        hub.publish("scalper", "after reconnect")
+        assert await nxt == [(4, "after reconnect")]
+        await stream.aclose()
+
+    asyncio.run(run())
+
+
+def test_queue_of_one_still_gets_the_skip_notice():
+    async def run():
+        hub = LogHub(ring_size=10, queue_size=1)
+        sub = hub.subscribe("scalper")
+        hub.publish("scalper", "a")
+        hub.publish("scalper", "b")
+        assert await sub.get() == (None, "[loghub] skipped 1 lines")
+        assert await sub.get() == (2, "b")
+
+    asyncio.run(run())
+
+
+def test_store_io_runs_off_the_loop_and_history_meets_live(tmp_path):
+    store = LogStore(tmp_path)
+    threads = set()
+    append, read = store.append, store.read
+    store.append = lambda *a: threads.add(threading.current_thread()) or append(*a)
+    store.read = lambda *a: threads.add(threading.current_thread()) or read(*a)
+
+    async def run():
+        hub = LogHub(ring_size=10, queue_size=100, store=store)
+        for i in range(5):
+            hub.publish("scalper", f"line {i}")
+        stream = hub.follow("scalper", 0, chunk=2)
+        seen = []
+        while len(seen) < 5:
+            seen += await stream.__anext__()
+        # Published while the stream moves from history to live.
+        nxt = asyncio.ensure_future(stream.__anext__())
+        hub.publish("scalper", "line 5")
+        seen += await nxt
+        await stream.aclose()
+        hub.close()
+        return seen
+
+    seen = asyncio.run(run())
+    assert seen == [(i + 1, f"line {i}") for i in range(6)]
+    assert threading.main_thread() not in threads and len(threads) == 1
+
+
+def test_next_batch_coalesces_the_window_and_splits_at_max_bytes():
+    async def run():
+        hub = LogHub(ring_size=100, queue_size=100)
+        sub = hub.subscribe("scalper")
+        loop = asyncio.get_running_loop()
+        hub.publish("scalper", "a")
+        loop.call_later(0.02, hub.publish, "scalper", "b")
+        loop.call_later(0.04, hub.publish, "scalper", "c")
+        assert await sub.next_batch(0.2, 1000) == [(1, "a"), (2, "b"), (3, "c")]
+
+        for i in range(5):
+            hub.publish("scalper", f"{i}" * 10)
+        first = await sub.next_batch(0.2, 25)
+        rest = await sub.next_batch(0.05, 25)
+        assert [len(b) for b in (first, rest)] == [3, 2]
+
+    asyncio.run(run())
+
+
+
+if __name__ == "__main__":
+    test_fanout_reaches_every_subscriber()
+    test_slow_subscriber_skips_ahead_then_is_dropped()
+    test_stale_since_resumes_at_head()
+    test_queue_of_one_still_gets_the_skip_notice()
+    test_next_batch_coalesces_the_window_and_splits_at_max_bytes()
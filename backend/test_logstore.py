@@ -0,0 +1,45 @@
+# test_logstore.py
+from backend import logstore
+from backend.logstore import LogStore
+
+
+def test_tail_and_resume_across_segments(tmp_path, monkeypatch):
+    monkeypatch.setattr(logstore, "LOG_SEGMENT_BYTES", 256)
+    monkeypatch.setattr(logstore, "LOG_INDEX_EVERY", 4)
+    store = LogStore(tmp_path)
+    for seq in range(1, 101):
+        store.append("scalper", seq, f"tick {seq}")
+
+    assert len(list((tmp_path / "scalper").glob("*.log"))) > 1
+    assert store.tail("scalper", 2) == [(99, "tick 99"), (100, "tick 100")]
+    assert [s for s, _ in store.read("scalper", 37, 5)] == [37, 38, 39, 40, 41]
+
+
+def test_reopen_recovers_seq_and_trims_torn_line(tmp_path):
+    store = LogStore(tmp_path)
+    for seq in range(1, 11):
+        store.append("reversal", seq, f"tick {seq}")
+    store.close()
+    seg = sorted((tmp_path / "reversal").glob("*.log"))[-1]
+    with open(seg, "ab") as f:
+        f.write(b"11\tcut off mid-wri")
+
+    reopened = LogStore(tmp_path)
+    assert reopened.last_seq("reversal") == 10
+    reopened.append("reversal", 11, "tick 11")
+    assert reopened.read("reversal", 10, 10) == [(10, "tick 10"), (11, "tick 11")]
+
+
+
+def test_multiline_entries_round_trip_and_survive_reload(tmp_path):
+    tb = 'Traceback (most recent call last):\n  File "main.py", line 3\nValueError: C:\\tmp\\n'
+    store = LogStore(tmp_path)
+    store.append("scalper", 1, "before")
+    store.append("scalper", 2, tb)
+    store.append("scalper", 3, "after")
+    assert store.read("scalper", 1) == [(1, "before"), (2, tb), (3, "after")]
+    store.close()
+
+    reopened = LogStore(tmp_path)
+    assert reopened.last_seq("scalper") == 3
+    assert reopened.tail("scalper", 2) == [(2, tb), (3, "after")]
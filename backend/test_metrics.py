@@ -0,0 +1,42 @@
+# test_metrics.py
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from backend.metrics import Counter, Histogram, Registry, instrument_app
+
+
+def test_text_format():
+    reg = Registry()
+    c = Counter("jobs_total", "Jobs.", ("kind",), registry=reg)
+    h = Histogram("job_seconds", "Job time.", buckets=(0.1, 1.0), registry=reg)
+    c.labels('a"b').inc(2)
+    child = h.labels()
+    for v in (0.05, 0.5, 0.5, 3):
+        child.observe(v)
+    lines = reg.render().splitlines()
+    assert '# TYPE jobs_total counter' in lines
+    assert 'jobs_total{kind="a\\"b"} 2' in lines
+    assert 'job_seconds_bucket{le="0.1"} 1' in lines
+    assert 'job_seconds_bucket{le="1.0"} 3' in lines
+    assert 'job_seconds_bucket{le="+Inf"} 4' in lines
+    assert 'job_seconds_count 4' in lines
+
+
+def test_routes_are_labelled_by_template():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        if item_id == 0:
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    instrument_app(app, "test_routes")
+    with TestClient(app) as client:
+        for i in range(3):
+            client.get(f"/items/{i}")
+        text = client.get("/metrics").text
+    assert 'http_requests_total{app="test_routes",method="GET",route="/items/{item_id}",status="2xx"} 2' in text
+    assert 'http_requests_total{app="test_routes",method="GET",route="/items/{item_id}",status="4xx"} 1' in text
+    assert 'http_request_duration_seconds_count{app="test_routes",method="GET",route="/items/{item_id}"} 3' in text
+    assert 'threadpool_threads{app="test_routes",state="limit"}' in text
@@ -0,0 +1,81 @@
+# test_revenue.py
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from backend.revenue import ensure_rollup, rebuild_rollup, record_approval, record_submission, revenue_report
+
+PAYMENTS_DDL = """
+    CREATE TABLE payments (
+      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      user_id INTEGER NOT NULL,
+      plan TEXT NOT NULL,
+      chain TEXT NOT NULL,
+      asset TEXT NOT NULL,
+      amount REAL NOT NULL,
+      tx_hash TEXT NOT NULL,
+      status TEXT NOT NULL,
+      created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 't.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(PAYMENTS_DDL))
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _submit(db, plan, chain, asset, amount):
+    db.execute(text("""
+        INSERT INTO payments (user_id, plan, chain, asset, amount, tx_hash, status)
+        VALUES (1, :plan, :chain, :asset, :amount, 'tx', 'pending')
+    """), {"plan": plan, "chain": chain, "asset": asset, "amount": amount})
+    record_submission(db, plan, chain, asset, amount)
+    db.commit()
+
+
+def _approve(db, payment_id):
+    row = db.execute(text("SELECT id, plan, chain, asset, amount, created_at FROM payments WHERE id = :id"),
+                     {"id": payment_id}).fetchone()
+    db.execute(text("UPDATE payments SET status = 'approved' WHERE id = :id"), {"id": payment_id})
+    record_approval(db, row)
+    db.commit()
+
+
+def _reports(db):
+    return [revenue_report(db), revenue_report(db, group_by=("plan",)),
+            revenue_report(db, start="2026-01-02"), revenue_report(db, end="2026-01-01", group_by=())]
+
+
+def test_incremental_rollup_matches_a_full_recompute(db):
+    # Yesterday's payments predate the rollup table and get backfilled.
+    db.execute(text("""
+        INSERT INTO payments (user_id, plan, chain, asset, amount, tx_hash, status, created_at) VALUES
+          (1, 'pro', 'solana', 'USDC', 29, 'a', 'pending', '2026-01-01 09:00:00'),
+          (1, 'pro', 'solana', 'USDC', 29, 'b', 'approved', '2026-01-01 10:00:00'),
+          (1, 'elite', 'ethereum', 'USDT', 99, 'c', 'pending', '2026-01-01 23:59:59')
+    """))
+    ensure_rollup(db.connection())
+    db.commit()
+
+    _submit(db, "pro", "solana", "USDC", 29)
+    _submit(db, "pro", "solana", "USDC", 31.5)
+    _submit(db, "elite", "solana", "SOL", 0.75)
+    # Late approvals count on the day the payment was submitted.
+    _approve(db, 1)
+    _approve(db, 3)
+    _approve(db, 5)
+
+    incremental = _reports(db)
+    day1 = [r for r in incremental[0] if r["day"] == "2026-01-01"]
+    assert sum(r["approved_count"] for r in day1) == 3
+    assert sum(r["submitted_count"] for r in incremental[0]) == 6
+
+    rebuild_rollup(db.connection())
+    db.commit()
+    assert _reports(db) == incremental
@@ -0,0 +1,46 @@
+# test_signals.py
+from bots.runtime.journal import SignalJournal
+
+from backend.signals import query_signals
+
+
+def test_journal_group_commits_and_api_pages_by_cursor(tmp_path):
+    db = tmp_path / "signals.db"
+    j = SignalJournal(str(db), flush_ms=50)
+    for i in range(25):
+        j.record("scalper", "BTCUSDT" if i % 2 else "ETHUSDT", "LONG", 100 + i, ts=1_000 + i)
+    j.record("reversal", "BTCUSDT", "SHORT", 99.5, ts=1_030, detail={"rsi": 78.2})
+    assert j.flush(5)
+    assert j.written == 26 and j.commits < 26
+    j.close()
+
+    page = query_signals(bot="scalper", symbol="BTCUSDT", limit=5, path=db)
+    assert [s["ts"] for s in page["signals"]] == [1_023, 1_021, 1_019, 1_017, 1_015]
+    seen = [s["ts"] for s in page["signals"]]
+    while page["next_cursor"]:
+        page = query_signals(bot="scalper", symbol="BTCUSDT", limit=5, cursor=page["next_cursor"], path=db)
+        seen += [s["ts"] for s in page["signals"]]
+    assert seen == list(range(1_023, 1_000, -2))
+
+    window = query_signals(start=1_020, end=1_031, path=db)["signals"]
+    assert window[0]["bot"] == "reversal" and window[0]["detail"] == {"rsi": 78.2}
+    assert [s["ts"] for s in window[1:]] == [1_024, 1_023, 1_022, 1_021, 1_020]
+    assert query_signals(path=tmp_path / "missing.db") == {"signals": [], "next_cursor": None}
+
+
+def test_users_see_shared_signals_and_only_their_own(tmp_path):
+    db = tmp_path / "signals.db"
+    j = SignalJournal(str(db), flush_ms=50)
+    j.record("scalper", "BTCUSDT", "LONG", 100, ts=1)
+    j.record("scalper", "SOLUSDT", "LONG", 20, ts=2, detail={"user": "1"})
+    j.record("scalper", "ETHUSDT", "SHORT", 30, ts=3, detail={"user": "2"})
+    j.record("reversal", "BTCUSDT", "SHORT", 99, ts=4, detail={"rsi": 78.2})
+    assert j.flush(5)
+    j.close()
+
+    def seen(user):
+        return [s["ts"] for s in query_signals(user=user, path=db)["signals"]]
+
+    assert seen(1) == [4, 2, 1]
+    assert seen("2") == [4, 3, 1]
+    assert seen(None) == [4, 3, 2, 1]
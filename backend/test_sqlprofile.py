@@ -0,0 +1,84 @@
+# test_sqlprofile.py
+import atexit
+import logging
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import StaticPool
+
+from backend.sqlprofile import fingerprint, normalize, enable_sql_profiling
+
+
+def test_normalize_strips_literals():
+    a = "SELECT * FROM users WHERE email = 'a@b.c' AND id IN (1, 2, 3)"
+    b = "SELECT  *  FROM users WHERE email = 'x''y' AND id IN (7)"
+    assert normalize(a) == "SELECT * FROM users WHERE email = ? AND id IN (...)"
+    assert fingerprint(a) == fingerprint(b)
+    assert normalize("UPDATE t SET v = :v WHERE id = ?") == "UPDATE t SET v = ? WHERE id = ?"
+
+
+def test_request_profile_and_repeats(caplog):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+    app = FastAPI()
+    enable_sql_profiling(app, engine)
+
+    def db():
+        with engine.connect() as conn:
+            yield conn
+
+    @app.get("/items")
+    def items(conn=Depends(db)):
+        for i in range(6):
+            conn.execute(text("SELECT id FROM t WHERE id = :i"), {"i": i})
+        return {}
+
+    @app.get("/none")
+    def none():
+        return {}
+
+    c = TestClient(app)
+    with caplog.at_level(logging.WARNING, logger="backend.sql"):
+        r = c.get("/items")
+    assert 'desc="6 queries"' in r.headers["server-timing"]
+    assert any("possible N+1 on GET /items: 6 x" in m for m in caplog.messages)
+    assert "server-timing" not in c.get("/none").headers
+
+
+def test_failed_statements_leave_nothing_on_the_connection():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    enable_sql_profiling(FastAPI(), engine)
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing"))
+        conn.execute(text("SELECT 1"))
+        assert not conn.info.get("sql_profile_start")
+
+
+def test_slow_log_file_is_written_off_the_request_thread(tmp_path, monkeypatch):
+    from backend import sqlprofile
+
+    path = tmp_path / "slow.log"
+    monkeypatch.setattr(sqlprofile, "SQL_SLOW_LOG", str(path))
+    monkeypatch.setattr(sqlprofile, "SQL_SLOW_MS", 0.0)
+    before = list(sqlprofile.logger.handlers)
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    enable_sql_profiling(FastAPI(), engine)
+    listener = sqlprofile._slow_listener
+    try:
+        added = [h for h in sqlprofile.logger.handlers if h not in before]
+        assert added and not any(isinstance(h, logging.FileHandler) for h in added)
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    finally:
+        atexit.unregister(listener.stop)
+        listener.stop()
+        for h in added:
+            sqlprofile.logger.removeHandler(h)
+        sqlprofile._slow_listener = None
+    assert "slow query" in path.read_text()
@@ -0,0 +1,115 @@
+# test_supervisor.py
+import asyncio
+import json
+import time
+
+from backend import bot as botmod
+from backend.bot import Supervisor
+
+CRASHY = """
+print("boom", flush=True)
+raise SystemExit(3)
+"""
+
+STUBBORN = """
+import signal, time
+signal.signal(signal.SIGTERM, signal.SIG_IGN)
+print("ready", flush=True)
+while True:
+    time.sleep(1)
+"""
+
+
+class RecordingSupervisor(Supervisor):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lines: list[tuple[str, str]] = []
+        self.backoffs: list[float] = []
+
+    def _log(self, bot, line):
+        self.lines.append((bot.name, line))
+
+    def _changed(self, bot):
+        if bot.status == "backoff":
+            self.backoffs.append(bot.next_restart_at - time.time())
+        super()._changed(bot)
+
+
+def _bots(tmp_path):
+    for name, source in (("crashy", CRASHY), ("stubborn", STUBBORN)):
+        (tmp_path / "bots" / name).mkdir(parents=True)
+        (tmp_path / "bots" / name / "main.py").write_text(source)
+    return tmp_path / "bots"
+
+
+async def _until(cond, timeout=10.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not cond():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.02)
+
+
+def test_crashing_bot_restarts_with_growing_backoff(tmp_path, monkeypatch):
+    monkeypatch.setattr(botmod, "RESTART_BACKOFF_BASE", 0.1)
+    monkeypatch.setattr(botmod, "RESTART_BACKOFF_MAX", 0.4)
+    sup = RecordingSupervisor(_bots(tmp_path), tmp_path / "state.json")
+
+    async def main():
+        sup.attach(asyncio.get_running_loop())
+        sup.start("crashy")
+        bot = sup._bots["crashy"]
+        await _until(lambda: bot.restarts >= 4)
+
+        sup.stop("crashy")
+        await _until(lambda: bot.status == "stopped")
+        await bot.task
+        return bot
+
+    bot = asyncio.run(main())
+    assert bot.exit_code == 3 and bot.pid is None
+    assert sup.lines.count(("crashy", "boom")) >= 4
+    # 0.1, 0.2, then capped at 0.4.
+    assert [round(d, 2) for d in sup.backoffs[:4]] == [0.1, 0.2, 0.4, 0.4]
+    assert json.loads((tmp_path / "state.json").read_text())["crashy"] == "stopped"
+
+
+def test_stop_escalates_to_kill(tmp_path, monkeypatch):
+    monkeypatch.setattr(botmod, "STOP_TIMEOUT", 0.3)
+    sup = RecordingSupervisor(_bots(tmp_path), tmp_path / "state.json")
+
+    async def main():
+        sup.attach(asyncio.get_running_loop())
+        sup.start("stubborn")
+        bot = sup._bots["stubborn"]
+        await _until(lambda: ("stubborn", "ready") in sup.lines)
+        stopped = time.monotonic()
+        sup.stop("stubborn")
+        await _until(lambda: bot.status == "stopped")
+        return bot, time.monotonic() - stopped
+
+    bot, took = asyncio.run(main())
+    # SIGTERM is ignored, so only the kill after STOP_TIMEOUT ends it.
+    assert bot.exit_code == -9 and bot.restarts == 0
+    assert took >= 0.3
+
+
+def test_desired_state_is_restored_from_the_state_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(botmod, "STOP_TIMEOUT", 0.3)
+    bots = _bots(tmp_path)
+    state = tmp_path / "state.json"
+    state.write_text(json.dumps({"stubborn": "running", "crashy": "stopped", "gone": "running"}))
+    sup = RecordingSupervisor(bots, state)
+    assert {n: b.desired for n, b in sup._bots.items()} == {"crashy": "stopped", "stubborn": "running"}
+
+    async def main():
+        sup.attach(asyncio.get_running_loop())
+        bot = sup._bots["stubborn"]
+        await _until(lambda: bot.status == "running" and ("stubborn", "ready") in sup.lines)
+        assert sup._bots["crashy"].task is None
+        await sup.shutdown()
+        return bot
+
+    bot = asyncio.run(main())
+    assert bot.status == "stopped"
+    # Shutting down keeps what the user asked for, so the next start brings it back.
+    assert json.loads(state.read_text())["stubborn"] == "running"
@@ -0,0 +1,43 @@
+# test_telemetry.py
+import asyncio
+
+from backend.bot import BotProcess, Supervisor
+from backend.telemetry import TelemetryStore
+
+
+def _report(ticks, hist, errors=0, signals=0):
+    return {"interval": 10, "strategies": {"scalper:1": {
+        "ticks": ticks, "errors": errors, "signals": signals, "lag_ms": 1.5,
+        "tick_max_us": max(v for v, _ in hist), "tick_us": hist,
+    }}}
+
+
+def test_store_merges_a_window_of_reports():
+    store = TelemetryStore(window=2)
+    store.ingest(_report(100, [[5000, 100]], errors=2))
+    store.ingest(_report(100, [[1000, 98], [9000, 2]], signals=3))
+    s = store.summary("scalper:1")
+    assert s["tick_p50_ms"] == 5.0 and s["tick_p99_ms"] == 5.0
+    assert s["ticks_per_min"] == 600 and s["signals_per_min"] == 9 and s["errors"] == 2
+
+    # The oldest report falls out of the window; totals keep counting.
+    store.ingest(_report(100, [[2000, 100]], errors=1))
+    s = store.summary("scalper:1")
+    assert s["tick_p50_ms"] == 2.0 and s["tick_max_ms"] == 9.0 and s["errors"] == 3
+    assert store.summary_prefix("scalper:")["ticks_per_min"] == 600
+    assert store.summary("reversal") is None
+
+
+def test_reports_reach_watchers_without_moving_the_version(tmp_path):
+    async def run():
+        sup = Supervisor(tmp_path, tmp_path / "state.json")
+        q = sup.watch()
+        bot = BotProcess("scalper", tmp_path / "main.py")
+        start = sup.version
+        for _ in range(5):
+            sup._telemetry_changed(bot, ["scalper"])
+        # One bump per BOT_TELEMETRY_STATUS_INTERVAL, however many reports.
+        assert sup.version == start + 1
+        assert q.qsize() == 5
+
+    asyncio.run(run())
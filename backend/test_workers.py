@@ -0,0 +1,82 @@
+# test_workers.py
+import asyncio
+import json
+import os
+import signal
+
+from backend.workers import HashRing, WorkerPool
+
+
+def test_ring_moves_only_the_keys_a_node_gains_or_loses():
+    ring = HashRing()
+    for i in range(4):
+        ring.add(f"worker-{i}")
+    keys = [f"scalper:{u}" for u in range(2000)]
+    before = {k: ring.owner(k) for k in keys}
+    counts = {n: list(before.values()).count(n) for n in ring.nodes}
+    assert min(counts.values()) > 2000 / 4 * 0.6
+
+    ring.remove("worker-2")
+    after = {k: ring.owner(k) for k in keys}
+    moved = [k for k in keys if before[k] != after[k]]
+    assert moved and all(before[k] == "worker-2" for k in moved)
+
+    ring.add("worker-2")
+    assert {k: ring.owner(k) for k in keys} == before
+
+
+async def _until(cond, timeout=10.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not cond():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.05)
+
+
+def test_pool_places_instances_and_fails_over(tmp_path):
+    pool = WorkerPool(size=2, state_file=tmp_path / "pool.json")
+    pool.config_source = lambda user, bot: {"version": 1, "config": {"symbols": ["BTCUSDT"]}}
+
+    async def main():
+        pool.attach(asyncio.get_running_loop())
+        for user in range(6):
+            pool.start_instance(user, "scalper")
+        running = lambda: all(i.status == "running" for i in pool.instances.values())  # noqa: E731
+        await _until(running)
+        placed = {k: i.worker for k, i in pool.instances.items()}
+        assert set(placed.values()) == {"worker-0", "worker-1"}
+
+        os.kill(pool._bots["worker-0"].pid, signal.SIGKILL)
+        await _until(lambda: "worker-0" not in pool.ring.nodes)
+        assert all(i.worker == "worker-1" for i in pool.instances.values())
+        # Back after its restart backoff: it takes its own keys again.
+        await _until(lambda: {k: i.worker for k, i in pool.instances.items()} == placed and running())
+
+        pool.stop_instance(0, "scalper")
+        await _until(lambda: pool.instances["scalper:0"].status == "stopped")
+        assert {b["name"]: b["status"] for b in pool.instances_for(0)}["scalper"] == "stopped"
+        await pool.shutdown()
+
+    asyncio.run(main())
+    saved = json.loads((tmp_path / "pool.json").read_text())
+    assert sorted(saved) == [f"scalper:{u}" for u in range(1, 6)]
+
+
+def test_instances_of_inactive_users_are_stopped_not_placed(tmp_path):
+    state = tmp_path / "pool.json"
+    state.write_text(json.dumps({"scalper:1": "running", "scalper:2": "running"}))
+    pool = WorkerPool(size=1, state_file=state)
+    pool.active_source = lambda user: user != "1"
+
+    async def main():
+        pool.attach(asyncio.get_running_loop())
+        await _until(lambda: pool.instances["scalper:2"].status == "running")
+        await _until(lambda: pool.instances["scalper:1"].status == "stopped")
+        assert json.loads(state.read_text()) == {"scalper:2": "running"}
+
+        # An admin deactivating user 2 stops what is already running.
+        assert pool.stop_user(2) == ["scalper"]
+        await _until(lambda: pool.instances["scalper:2"].status == "stopped")
+        await pool.shutdown()
+
+    asyncio.run(main())
+    assert json.loads(state.read_text()) == {}
@@ -0,0 +1,303 @@
+# backend/workers.py
+import asyncio
+import bisect
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from .bot import BOTS_DIR, REPO_ROOT, BotProcess, Supervisor
+from .loghub import log_hub
+from .telemetry import telemetry_store
+
+# Opt-in. At 0 (the default) /bot/start and /bot/stop drive the shared
+# per-bot processes directly and no worker processes are spawned.
+BOT_WORKERS = int(os.getenv("BOT_WORKERS", "0"))
+BOT_POOL_STATE_FILE = Path(os.getenv("BOT_POOL_STATE_FILE", "./bot_pool.json"))
+RING_VNODES = int(os.getenv("BOT_RING_VNODES", "64"))
+WORKER_SCRIPT = REPO_ROOT / "bots" / "worker.py"
+# Workers tag an instance's output with this (bots/worker.py).
+INSTANCE_PREFIX = "@instance "
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hashing with virtual nodes.
+
+    Each node owns RING_VNODES points on a 64-bit ring and a key belongs to
+    the first point at or after its hash, so adding or removing a node only
+    moves the keys that node gains or loses (about 1/n of them).
+    """
+
+    def __init__(self, vnodes: int = RING_VNODES):
+        self.vnodes = vnodes
+        self.nodes: set[str] = set()
+        self._points: list[int] = []
+        self._owners: list[str] = []
+
+    def add(self, node: str):
+        if node in self.nodes:
+            return
+        self.nodes.add(node)
+        for i in range(self.vnodes):
+            h = _hash(f"{node}#{i}")
+            at = bisect.bisect(self._points, h)
+            self._points.insert(at, h)
+            self._owners.insert(at, node)
+
+    def remove(self, node: str):
+        if node not in self.nodes:
+            return
+        self.nodes.discard(node)
+        kept = [(h, n) for h, n in zip(self._points, self._owners) if n != node]
+        self._points = [h for h, _ in kept]
+        self._owners = [n for _, n in kept]
+
+    def owner(self, key: str) -> str | None:
+        if not self._points:
+            return None
+        at = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[at]
+
+
+class Instance:
+    """One user's copy of one bot."""
+
+    __slots__ = ("user", "bot", "desired", "status", "worker")
+
+    def __init__(self, user: str, bot: str, desired: str = "stopped"):
+        self.user = user
+        self.bot = bot
+        self.desired = desired
+        self.status = "stopped"
+        self.worker: str | None = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.bot}:{self.user}"
+
+    def snapshot(self) -> dict:
+        return {
+            "name": self.bot,
+            "user": self.user,
+            "status": self.status,
+            "desired": self.desired,
+            "worker": self.worker,
+            "telemetry": telemetry_store.summary(self.key),
+        }
+
+
+class WorkerPool(Supervisor):
+    """Packs per-user bot instances into a fixed set of worker processes.
+
+    The workers are bots/worker.py children, kept alive with the same
+    restart and backoff as the per-bot supervisor. Each (bot, user)
+    instance lives on the worker the hash ring picks among the workers that
+    are currently up. When a worker dies, its instances move to the next
+    ones on the ring. When it comes back, only the keys it owns move back.
+    Start, stop and config commands go to the owner as JSON lines on its
+    stdin. What an instance prints lands on its own log channel.
+
+    `config_source(user, bot)` (blocking, DB-backed) returns the user's
+    latest config as {"version", "config"}; it is read on every placement.
+    `active_source(user)` (same) says whether the user still has a plan;
+    an instance whose user has lost it is stopped instead of placed.
+    Desired instance state is persisted so a restart brings them back.
+    """
+
+    def __init__(self, size: int = BOT_WORKERS, bots_dir: Path = BOTS_DIR,
+                 state_file: Path = BOT_POOL_STATE_FILE):
+        self.size = size
+        self.bots = sorted(p.parent.name for p in bots_dir.glob("*/main.py"))
+        self.ring = HashRing()
+        self.instances: dict[str, Instance] = {}
+        self.active_source = None
+        super().__init__(bots_dir, state_file)
+
+    def _discover(self) -> dict[str, BotProcess]:
+        workers = {}
+        for i in range(self.size):
+            worker = BotProcess(f"worker-{i}", WORKER_SCRIPT)
+            worker.desired = "running"
+            workers[worker.name] = worker
+        return workers
+
+    def _restore(self, state: dict):
+        for key, desired in state.items():
+            bot, _, user = key.partition(":")
+            if bot in self.bots and user and desired == "running":
+                self.instances[key] = Instance(user, bot, "running")
+
+    def _save_state(self):
+        data = {k: i.desired for k, i in self.instances.items() if i.desired == "running"}
+        try:
+            self.state_file.write_text(json.dumps(data))
+        except OSError:
+            pass
+
+    def start_instance(self, user_id, bot: str) -> dict:
+        if bot not in self.bots:
+            raise KeyError(bot)
+        key = f"{bot}:{user_id}"
+        with self._lock:
+            inst = self.instances.get(key)
+            if inst is None:
+                inst = self.instances[key] = Instance(str(user_id), bot)
+            inst.desired = "running"
+            if inst.status == "stopped":
+                inst.status = "starting"
+            self.version += 1
+            self._save_state()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._place, inst)
+        return {"ok": True, "bot": bot, "status": inst.status}
+
+    def stop_instance(self, user_id, bot: str) -> dict:
+        if bot not in self.bots:
+            raise KeyError(bot)
+        with self._lock:
+            inst = self.instances.get(f"{bot}:{user_id}")
+            if inst is None:
+                return {"ok": True, "bot": bot, "status": "stopped"}
+            inst.desired = "stopped"
+            self.version += 1
+            self._save_state()
+        telemetry_store.forget(inst.key)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._place, inst)
+        return {"ok": True, "bot": bot, "status": "stopped" if inst.worker is None else "stopping"}
+
+    def stop_user(self, user_id) -> list[str]:
+        """Stop every instance the user has running; returns their bots."""
+        bots = [i.bot for i in list(self.instances.values())
+                if i.user == str(user_id) and i.desired == "running"]
+        for bot in bots:
+            self.stop_instance(user_id, bot)
+        return bots
+
+    def push_user_config(self, user_id, bot: str, saved: dict):
+        """Send a freshly saved config to the user's running instance."""
+        inst = self.instances.get(f"{bot}:{user_id}")
+        if inst is not None and self._loop is not None:
+            msg = {"type": "config", "bot": bot, "user": inst.user,
+                   "version": saved["version"], "config": saved["config"]}
+            self._loop.call_soon_threadsafe(self._send_to, inst, msg)
+
+    def instances_for(self, user_id) -> list[dict]:
+        """The user's view: one entry per bot, stopped if never started."""
+        out = []
+        for bot in self.bots:
+            inst = self.instances.get(f"{bot}:{user_id}")
+            out.append(inst.snapshot() if inst is not None else Instance(str(user_id), bot).snapshot())
+        return out
+
+    def owner(self, user_id, bot: str) -> str | None:
+        return self.ring.owner(f"{bot}:{user_id}")
+
+    def _send_to(self, inst: Instance, msg: dict):
+        if inst.worker is not None and inst.desired == "running":
+            self._send(self._bots[inst.worker], msg)
+
+    def _place(self, inst: Instance):
+        """Move `inst` to where it belongs now (loop only)."""
+        target = self.ring.owner(inst.key) if inst.desired == "running" else None
+        if target == inst.worker:
+            status = inst.status
+            if inst.desired != "running":
+                status = "stopped"
+            elif target is None:
+                status = "pending"
+            if status != inst.status:
+                inst.status = status
+                self._instance_changed(inst)
+            return
+        if inst.worker is not None:
+            self._send(self._bots[inst.worker], {"type": "stop", "bot": inst.bot, "user": inst.user})
+        inst.worker = target
+        if target is None:
+            inst.status = "stopped" if inst.desired != "running" else "pending"
+        else:
+            inst.status = "starting"
+            asyncio.ensure_future(self._start_on(inst, target))
+        self._instance_changed(inst)
+
+    async def _start_on(self, inst: Instance, worker: str):
+        if self.active_source is not None:
+            try:
+                active = await asyncio.to_thread(self.active_source, inst.user)
+            except Exception as exc:
+                self._log(self._bots[worker], f"[pool] plan check failed for {inst.key}: {exc}")
+                active = True
+            if not active:
+                # Restored from state or failed over after the plan lapsed.
+                self._log(self._bots[worker], f"[pool] {inst.key}: inactive plan, stopping")
+                self.stop_instance(inst.user, inst.bot)
+                return
+        cfg = {"version": 0, "config": {}}
+        if self.config_source is not None:
+            try:
+                cfg = await asyncio.to_thread(self.config_source, inst.user, inst.bot)
+            except Exception as exc:
+                self._log(self._bots[worker], f"[pool] config load failed for {inst.key}: {exc}")
+        if inst.worker != worker or inst.desired != "running":
+            return  # moved or stopped while the config loaded
+        msg = {"type": "start", "bot": inst.bot, "user": inst.user,
+               "version": cfg["version"], "config": cfg["config"]}
+        if self._send(self._bots[worker], msg):
+            inst.status = "running"
+            self._instance_changed(inst)
+
+    def _rebalance(self):
+        for inst in list(self.instances.values()):
+            self._place(inst)
+
+    async def _on_spawn(self, bot: BotProcess):
+        self.ring.add(bot.name)
+        self._rebalance()
+
+    def _on_exit(self, bot: BotProcess):
+        self.ring.remove(bot.name)
+        for inst in self.instances.values():
+            if inst.worker == bot.name:
+                inst.worker = None
+        if not self._closing:
+            self._rebalance()
+
+    def _log(self, bot: BotProcess, line: str):
+        """Instance output goes to its own "<bot>:<user>" channel; the
+        rest stays on the worker's."""
+        if line.startswith(INSTANCE_PREFIX):
+            key, _, text = line[len(INSTANCE_PREFIX):].partition(" ")
+            if key in self.instances:
+                log_hub.publish(key, text)
+                return
+        log_hub.publish(bot.name, line)
+
+    def _notify(self, bot: BotProcess):
+        # Worker state only wakes long-pollers; watchers get instance changes.
+        self._wake()
+
+    def telemetry(self) -> dict:
+        """Per bot, merged over every user's instance."""
+        return {bot: telemetry_store.summary_prefix(f"{bot}:") for bot in self.bots}
+
+    def _telemetry_changed(self, bot: BotProcess, keys: list[str]):
+        if self._watchers:
+            for key in keys:
+                inst = self.instances.get(key)
+                if inst is not None:
+                    self._publish(inst.snapshot())
+        self._bump_for_telemetry()
+
+    def _instance_changed(self, inst: Instance):
+        with self._lock:
+            self.version += 1
+        self._wake()
+        if self._watchers:
+            self._publish(inst.snapshot())
+
+
+worker_pool = WorkerPool()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+api_load_bench.py
+
+Load test for the backend API: throughput and p50/p95/p99 latency of
+/me, /bot/status, /waitlist, /crypto/submit and /ws/logs (connect, first
+frame, close) at a fixed number of concurrent clients.
+
+Starts the backend with uvicorn against a temporary database, bots dir and
+log dir, plus a local JWKS server standing in for Supabase. Requests carry
+RS256 tokens minted up front for a handful of users, so every request goes
+through the real verify and user lookup path.
+
+Results are compared with benchmarks/api_load_baseline.json and the run
+exits 1 if any scenario's p95 or p99 grew, or its throughput dropped, by
+more than the baseline's thresholds. Baselines are machine-specific:
+refresh with --update-baseline on the machine that runs the comparison.
+
+Usage:
+  python benchmarks/api_load_bench.py --concurrency 16 --seconds 10
+  python benchmarks/api_load_bench.py --scenarios me,bot_status --update-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import http.server
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from pathlib import Path
+
+import httpx
+import websockets
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+REPO = Path(__file__).resolve().parent.parent
+BASELINE = Path(__file__).resolve().parent / "api_load_baseline.json"
+SCENARIOS = ("me", "bot_status", "waitlist", "crypto_submit", "ws_logs")
+KID = "bench"
+USERS = 8
+
+BENCH_BOT = """
+import time
+i = 0
+while True:
+    i += 1
+    print(f"[bench] tick {i}", flush=True)
+    time.sleep(0.1)
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Keys:
+    """RSA key pair, its JWKS and tokens signed with it."""
+
+    def __init__(self):
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.private_pem = key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()).decode()
+        public_pem = key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo).decode()
+        public = jwk.construct(public_pem, "RS256").to_dict()
+        self.jwks = {"keys": [{**public, "kid": KID, "use": "sig"}]}
+
+    def token(self, sub: str, email: str, issuer: str) -> str:
+        claims = {"sub": sub, "email": email, "aud": "authenticated", "iss": issuer,
+                  "exp": int(time.time()) + 86400}
+        return jwt.encode(claims, self.private_pem, algorithm="RS256", headers={"kid": KID})
+
+
+def serve_jwks(jwks: dict) -> tuple[http.server.HTTPServer, int]:
+    body = json.dumps(jwks).encode()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    port = _free_port()
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, port
+
+
+def start_server(tmp: Path, jwks_port: int, workers: int) -> tuple[subprocess.Popen, int]:
+    bots = tmp / "bots" / "bench"
+    bots.mkdir(parents=True)
+    (bots / "main.py").write_text(BENCH_BOT)
+    (tmp / "bot_state.json").write_text(json.dumps({"bench": "running"}))
+    port = _free_port()
+    env = dict(os.environ,
+               PYTHONPATH=str(REPO),
+               DATABASE_URL=f"sqlite:///{tmp}/bench.db",
+               BOTS_DIR=str(tmp / "bots"),
+               BOT_STATE_FILE=str(tmp / "bot_state.json"),
+               BOT_WORKERS="0",
+               LOG_DIR=str(tmp / "logs"),
+               SUPABASE_JWKS_URL=f"http://127.0.0.1:{jwks_port}/auth/v1/.well-known/jwks.json",
+               SUPABASE_ISSUER=f"http://127.0.0.1:{jwks_port}/auth/v1",
+               SUPABASE_AUDIENCE="authenticated",
+               SUPABASE_JWT_SECRET="")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=tmp, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1)
+            return proc, port
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise SystemExit("server did not start")
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class Scenario:
+    """One endpoint under load: run() makes a single request."""
+
+    def __init__(self, name: str, base: str, tokens: list[str]):
+        self.name = name
+        self.base = base
+        self.ws_base = base.replace("http://", "ws://")
+        self.tokens = tokens
+        self.n = 0
+
+    def _headers(self) -> dict:
+        self.n += 1
+        return {"Authorization": f"Bearer {self.tokens[self.n % len(self.tokens)]}"}
+
+    async def run(self, client: httpx.AsyncClient) -> bool:
+        if self.name == "me":
+            r = await client.get("/me", headers=self._headers())
+        elif self.name == "bot_status":
+            r = await client.get("/bot/status", headers=self._headers())
+        elif self.name == "waitlist":
+            r = await client.post("/waitlist", json={"email": f"{uuid.uuid4().hex[:12]}@bench.example.com",
+                                                     "name": "bench"})
+        elif self.name == "crypto_submit":
+            r = await client.post("/crypto/submit", headers=self._headers(), json={
+                "plan": "pro", "amount": 49.0, "tx_hash": uuid.uuid4().hex})
+        else:
+            async with websockets.connect(f"{self.ws_base}/ws/logs?bot=bench&backfill=1") as ws:
+                frame = await ws.recv()
+            return not frame.startswith("error:")
+        return r.status_code < 400
+
+
+async def drive(scenario: Scenario, base: str, concurrency: int, seconds: float, warmup: float) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    measuring = False
+    stop = False
+
+    async def client_loop(client: httpx.AsyncClient):
+        nonlocal errors
+        while not stop:
+            t0 = time.perf_counter()
+            try:
+                ok = await scenario.run(client)
+            except Exception:
+                ok = False
+            if measuring:
+                latencies.append(time.perf_counter() - t0)
+                errors += not ok
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=30) as client:
+        tasks = [asyncio.create_task(client_loop(client)) for _ in range(concurrency)]
+        await asyncio.sleep(warmup)
+        measuring = True
+        t0 = time.perf_counter()
+        await asyncio.sleep(seconds)
+        measuring = False
+        elapsed = time.perf_counter() - t0
+        stop = True
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    latencies.sort()
+    return {
+        "scenario": scenario.name,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def prepare_users(tmp: Path, base: str, keys: Keys, issuer: str) -> list[str]:
+    """Mint tokens, let the API create the users, then mark them active."""
+    tokens = [keys.token(f"bench-{i}", f"bench{i}@bench.example.com", issuer) for i in range(USERS)]
+    with httpx.Client(base_url=base) as client:
+        for token in tokens:
+            r = client.get("/me", headers={"Authorization": f"Bearer {token}"})
+            r.raise_for_status()
+    with sqlite3.connect(tmp / "bench.db") as db:
+        db.execute("UPDATE users SET is_active = 1, plan = 'pro' WHERE email LIKE '%@bench.example.com'")
+    return tokens
+
+
+def compare(results: list[dict], baseline: dict) -> list[str]:
+    limits = baseline.get("thresholds", {})
+    latency = float(limits.get("latency_ratio", 1.5))
+    throughput = float(limits.get("throughput_ratio", 0.75))
+    failures = []
+    for r in results:
+        base = baseline.get("scenarios", {}).get(r["scenario"])
+        if not base:
+            continue
+        for key in ("p95_ms", "p99_ms"):
+            if base[key] and r[key] > base[key] * latency:
+                failures.append(f"{r['scenario']}: {key} {r[key]} > {base[key]} x {latency}")
+        if base["rps"] and r["rps"] < base["rps"] * throughput:
+            failures.append(f"{r['scenario']}: rps {r['rps']} < {base['rps']} x {throughput}")
+        if r["errors"]:
+            failures.append(f"{r['scenario']}: {r['errors']} failed requests")
+    return failures
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scenarios", default=",".join(SCENARIOS))
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--warmup", type=float, default=2)
+    ap.add_argument("--workers", type=int, default=1, help="uvicorn worker processes; bot endpoints only work in the one that "
+                    "holds the supervisor lock, so bot_status needs 1")
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--update-baseline", action="store_true", help="write these results as the baseline")
+    ap.add_argument("--json", action="store_true", help="print results as JSON")
+    args = ap.parse_args()
+    names = [s for s in args.scenarios.split(",") if s]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    keys = Keys()
+    jwks_server, jwks_port = serve_jwks(keys.jwks)
+    issuer = f"http://127.0.0.1:{jwks_port}/auth/v1"
+    with tempfile.TemporaryDirectory() as tmp:
+        proc, port = start_server(Path(tmp), jwks_port, args.workers)
+        base = f"http://127.0.0.1:{port}"
+        try:
+            tokens = prepare_users(Path(tmp), base, keys, issuer)
+            results = [
+                asyncio.run(drive(Scenario(name, base, tokens), base,
+                                  args.concurrency, args.seconds, args.warmup))
+                for name in names
+            ]
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+            jwks_server.shutdown()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{args.concurrency} clients, {args.seconds}s per scenario, {args.workers} worker(s)")
+        print(f"{'scenario':<15}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for r in results:
+            print(f"{r['scenario']:<15}{r['requests']:>10}{r['errors']:>8}{r['rps']:>10}"
+                  f"{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}")
+
+    if args.update_baseline:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        baseline.setdefault("thresholds", {"latency_ratio": 1.5, "throughput_ratio": 0.75})
+        baseline["concurrency"] = args.concurrency
+        scenarios = baseline.setdefault("scenarios", {})
+        for r in results:
+            scenarios[r["scenario"]] = {k: r[k] for k in ("rps", "p50_ms", "p95_ms", "p99_ms")}
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return
+    if not args.baseline.exists():
+        return
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("concurrency") not in (None, args.concurrency):
+        print(f"baseline was taken at concurrency {baseline['concurrency']}; not comparing")
+        return
+    failures = compare(results, baseline)
+    for f in failures:
+        print("REGRESSION", f)
+    if failures:
+        sys.exit(1)
+    print("within baseline thresholds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+dedup_bench.py
+
+Fills bots.runtime.dedup.Deduper with --keys distinct (bot, symbol, type)
+keys, then reports table memory, per-check latency on the hot path and the
+cost of a full eviction sweep.
+
+Usage:
+  python benchmarks/dedup_bench.py --keys 1000000 --checks 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bots.runtime.dedup import Deduper, Rule  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--keys", type=int, default=1_000_000)
+    ap.add_argument("--checks", type=int, default=200_000)
+    args = ap.parse_args()
+
+    d = Deduper({"LONG": Rule(cooldown=300), "oversold": Rule(enter=30, exit=35)}, ttl=3600)
+    t0 = time.perf_counter()
+    for i in range(args.keys):
+        d.allow("scanner", f"SYM{i}", "LONG", now=1_000_000)
+    fill = time.perf_counter() - t0
+    print(f"{len(d)} keys in {d.mask + 1} slots: {d.nbytes / 2**20:.1f} MB, "
+          f"filled in {fill:.1f}s ({fill / args.keys * 1e6:.2f} us/insert incl. rehashes)")
+
+    rng = random.Random(0)
+    probes = [(f"SYM{rng.randrange(args.keys)}", rng.random() < 0.5) for _ in range(args.checks)]
+    t0 = time.perf_counter()
+    for sym, active in probes:
+        d.allow("scanner", sym, "LONG", active, now=1_000_100)
+    hot = time.perf_counter() - t0
+    print(f"allow() on existing keys: {hot / args.checks * 1e6:.2f} us/check")
+
+    for i in range(0, args.keys, 2):
+        d.allow("scanner", f"SYM{i}", "LONG", False, now=1_005_000)
+    t0 = time.perf_counter()
+    n = d.evict(now=1_005_000)
+    print(f"evicted {n} stale keys in {(time.perf_counter() - t0) * 1000:.1f} ms; {len(d)} left")
+
+
+if __name__ == "__main__":
+    main()
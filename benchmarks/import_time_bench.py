@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+import_time_bench.py
+
+Cold-start cost of the two FastAPI apps: `python -X importtime` for
+`import backend.main` and `import main`, summarized as self time per top-level package,
+with the child's wall time and peak RSS. Each target runs once to warm
+the .pyc cache and then --runs times; the medians are reported.
+
+It also fails if a module that should load lazily (google-auth, stripe)
+shows up at import time, and compares totals with
+benchmarks/import_time_baseline.json (refresh with --update-baseline).
+
+Usage:
+  python benchmarks/import_time_bench.py --runs 5 --top 12
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+BASELINE = Path(__file__).resolve().parent / "import_time_baseline.json"
+TARGETS = ("backend.main", "main")
+# Loaded on first use by the endpoints that need them.
+LAZY = ("google.oauth2", "google.auth", "stripe")
+
+
+def run_once(target: str, tmp: Path) -> dict:
+    env = dict(os.environ,
+               PYTHONPATH=str(REPO),
+               DATABASE_URL=f"sqlite:///{tmp}/import.db",
+               LOG_DIR=str(tmp / "logs"))
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-X", "importtime", "-c", f"import {target}"],
+                            cwd=tmp, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    err = proc.stderr.read()
+    # wait4 rather than communicate() to get this child's own peak RSS.
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - t0
+    if proc.returncode:
+        tail = "\n".join(line for line in err.splitlines() if not line.startswith("import time:"))[-2000:]
+        raise SystemExit(f"import {target} failed:\n{tail}")
+
+    packages: dict[str, int] = {}
+    modules = set()
+    total = 0
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        modules.add(name)
+        # Self time, so each package is charged only for its own modules.
+        us = int(own)
+        total += us
+        top = name.split(".")[0]
+        packages[top] = packages.get(top, 0) + us
+    return {"wall_ms": wall * 1000, "import_ms": total / 1000, "rss_mb": usage.ru_maxrss / 1024,  # kB on Linux
+            "packages": packages, "modules": modules}
+
+
+def measure(target: str, runs: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        run_once(target, Path(tmp))  # warm the .pyc cache
+        samples = [run_once(target, Path(tmp)) for _ in range(runs)]
+    packages = {}
+    for name in samples[0]["packages"]:
+        packages[name] = round(statistics.median(s["packages"].get(name, 0) for s in samples) / 1000, 1)
+    return {
+        "target": target,
+        "import_ms": round(statistics.median(s["import_ms"] for s in samples), 1),
+        "wall_ms": round(statistics.median(s["wall_ms"] for s in samples), 1),
+        "rss_mb": round(statistics.median(s["rss_mb"] for s in samples), 1),
+        "packages": dict(sorted(packages.items(), key=lambda kv: -kv[1])),
+        "eager": sorted(p for p in LAZY if any(m == p or m.startswith(p + ".") for m in samples[0]["modules"])),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--targets", default=",".join(TARGETS))
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--top", type=int, default=12, help="packages to list per target")
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--update-baseline", action="store_true", help="write these results as the baseline")
+    ap.add_argument("--json", action="store_true", help="print results as JSON")
+    args = ap.parse_args()
+
+    results = [measure(t, args.runs) for t in args.targets.split(",") if t]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            print(f"import {r['target']}: {r['import_ms']} ms in imports, {r['wall_ms']} ms wall, "
+                  f"{r['rss_mb']} MB peak RSS (median of {args.runs})")
+            for name, ms in list(r["packages"].items())[:args.top]:
+                print(f"  {name:<24}{ms:>9} ms")
+
+    failures = [f"{r['target']} imports {', '.join(r['eager'])} eagerly" for r in results if r["eager"]]
+    if args.update_baseline:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        baseline.setdefault("threshold_ratio", 1.3)
+        targets = baseline.setdefault("targets", {})
+        for r in results:
+            targets[r["target"]] = {"import_ms": r["import_ms"], "wall_ms": r["wall_ms"], "rss_mb": r["rss_mb"],
+                                    "packages": dict(list(r["packages"].items())[:args.top])}
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        ratio = float(baseline.get("threshold_ratio", 1.3))
+        for r in results:
+            base = baseline.get("targets", {}).get(r["target"])
+            if base and r["import_ms"] > base["import_ms"] * ratio:
+                failures.append(f"{r['target']}: import {r['import_ms']} ms > {base['import_ms']} x {ratio}")
+    for f in failures:
+        print("REGRESSION", f)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
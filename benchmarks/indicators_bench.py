@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+indicators_bench.py
+
+Measures the per-tick cost of the indicator library: one new candle for
+each of N symbols pushed through the full IndicatorSet (EMA 9/21, RSI,
+MACD, VWAP, ATR, Bollinger, volume spike), after warming every symbol from
+history with the batch functions.
+
+Usage:
+  python benchmarks/indicators_bench.py --symbols 1000 --history 500 --ticks 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bots.runtime.indicators import IndicatorSet  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--symbols", type=int, default=1000)
+    ap.add_argument("--history", type=int, default=500)
+    ap.add_argument("--ticks", type=int, default=200)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    n = args.history + args.ticks
+    close = 100 + np.cumsum(rng.normal(0, 0.5, (args.symbols, n)), axis=1)
+    high = close + rng.random((args.symbols, n))
+    low = close - rng.random((args.symbols, n))
+    volume = rng.random((args.symbols, n)) * 1000 + 1
+
+    hist = args.history
+    t0 = time.perf_counter()
+    sets = [IndicatorSet.from_history(high[i, :hist], low[i, :hist], close[i, :hist], volume[i, :hist])
+            for i in range(args.symbols)]
+    warm = time.perf_counter() - t0
+
+    # Plain floats, as they come off the feed, not NumPy scalars.
+    feed = [list(zip(high[:, t].tolist(), low[:, t].tolist(), close[:, t].tolist(), volume[:, t].tolist()))
+            for t in range(hist, n)]
+    samples = []
+    for candles in feed:
+        t0 = time.perf_counter()
+        for s, candle in zip(sets, candles):
+            s.update(*candle)
+        samples.append((time.perf_counter() - t0) * 1000)
+
+    samples.sort()
+    print(f"symbols={args.symbols} history={hist} ticks={args.ticks}")
+    print(f"warm from history: {warm * 1000:.1f} ms total, {warm / args.symbols * 1e6:.0f} us/symbol")
+    print(f"per tick: p50 {statistics.median(samples):.2f} ms  "
+          f"p99 {samples[int(len(samples) * 0.99) - 1]:.2f} ms  max {samples[-1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
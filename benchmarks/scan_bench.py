@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+scan_bench.py
+
+Measures per-tick scan latency of bots.runtime.scan.Scanner as the symbol
+universe and worker count grow. Candles live in a temporary shared-memory
+OHLCV store; the predicate computes RSI and Bollinger bands over the last
+200 candles of every symbol.
+
+Usage:
+  python benchmarks/scan_bench.py --symbols 250,500,1000 --workers 1,2,4 --ticks 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bots.runtime.indicators import bollinger, rsi  # noqa: E402
+from bots.runtime.ohlcv import OHLCVStore  # noqa: E402
+from bots.runtime.scan import Scanner  # noqa: E402
+
+
+def oversold_squeeze(symbol, candles):
+    close = candles["close"]
+    r = rsi(close, 14)[-1]
+    mid, upper, lower = bollinger(close, 20, 2.0)
+    if r < 30 and close[-1] < lower[-1]:
+        return float(r)
+    return None
+
+
+async def run(scanner: Scanner, ticks: int):
+    await scanner.scan()  # first call pays for worker startup
+    scanner.stats = type(scanner.stats)()
+    for _ in range(ticks):
+        await scanner.scan()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--symbols", default="250,500,1000")
+    ap.add_argument("--workers", default=f"1,2,{os.cpu_count()}")
+    ap.add_argument("--ticks", type=int, default=30)
+    args = ap.parse_args()
+
+    sizes = [int(x) for x in args.symbols.split(",")]
+    workers = sorted({int(x) for x in args.workers.split(",")})
+    prefix = f"bench_scan_{os.getpid()}"
+    store = OHLCVStore(writer=True, capacity=256, prefix=prefix)
+    rng = np.random.default_rng(0)
+    universe = [f"SYM{i:04d}" for i in range(max(sizes))]
+    try:
+        for sym in universe:
+            s = store.series(sym, "1m")
+            close = 100 + np.cumsum(rng.normal(0, 0.5, 256))
+            for t, c in enumerate(close.tolist()):
+                s.append(t, c, c + 0.2, c - 0.2, c, 1000.0)
+
+        print(f"{'symbols':>8} {'workers':>8} {'p50 ms':>8} {'p99 ms':>8} {'hits':>6}")
+        for n in sizes:
+            for w in workers:
+                scanner = Scanner(oversold_squeeze, universe[:n], workers=w, prefix=prefix)
+                try:
+                    asyncio.run(run(scanner, args.ticks))
+                finally:
+                    scanner.close()
+                st = scanner.stats.as_dict()
+                print(f"{n:>8} {w:>8} {st['p50_ms']:>8.2f} {st['p99_ms']:>8.2f} {st['hits'] // args.ticks:>6}")
+    finally:
+        store.close(unlink=True)
+
+
+if __name__ == "__main__":
+    main()
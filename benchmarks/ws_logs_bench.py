@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+ws_logs_bench.py
+
+Measures /ws/logs delivery cost: frames per second and server CPU per
+connected client while one bot prints a fixed number of lines per second.
+
+Starts the backend with uvicorn against a temporary database, bots dir and
+log dir, so it does not touch saas.db or the real bots.
+
+Usage:
+  python benchmarks/ws_logs_bench.py --rate 1000 --clients 10 --seconds 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+import websockets
+
+REPO = Path(__file__).resolve().parent.parent
+
+BENCH_BOT = """
+import os, time
+rate = int(os.environ.get("BENCH_RATE", "1000"))
+pad = "x" * 60
+step = 1.0 / rate
+nxt = time.monotonic()
+i = 0
+while True:
+    i += 1
+    print(f"[bench] tick {i} {pad}")
+    nxt += step
+    delay = nxt - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _cpu_seconds(pid: int) -> float:
+    # utime + stime from /proc/<pid>/stat (Linux only).
+    fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def start_server(tmp: Path, rate: int) -> tuple[subprocess.Popen, int]:
+    bots = tmp / "bots" / "bench"
+    bots.mkdir(parents=True)
+    (bots / "main.py").write_text(BENCH_BOT)
+    (tmp / "bot_state.json").write_text(json.dumps({"bench": "running"}))
+    port = _free_port()
+    env = dict(os.environ,
+               PYTHONPATH=str(REPO),
+               DATABASE_URL=f"sqlite:///{tmp}/bench.db",
+               BOTS_DIR=str(tmp / "bots"),
+               BOT_STATE_FILE=str(tmp / "bot_state.json"),
+               LOG_DIR=str(tmp / "logs"),
+               BENCH_RATE=str(rate))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=tmp, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1)
+            return proc, port
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise SystemExit("server did not start")
+
+
+async def run_mode(port: int, pid: int, fmt: str, window: int, clients: int, seconds: float, warmup: float) -> dict:
+    url = f"ws://127.0.0.1:{port}/ws/logs?bot=bench&format={fmt}&window={window}"
+    counts = {"frames": 0, "lines": 0, "bytes": 0}
+    measuring = False
+
+    async def client():
+        async with websockets.connect(url, max_queue=None) as ws:
+            async for msg in ws:
+                if not measuring:
+                    continue
+                counts["frames"] += 1
+                counts["bytes"] += len(msg)
+                counts["lines"] += len(json.loads(msg)) if fmt == "batch" else 1
+
+    tasks = [asyncio.create_task(client()) for _ in range(clients)]
+    await asyncio.sleep(warmup)
+    measuring = True
+    cpu0, t0 = _cpu_seconds(pid), time.perf_counter()
+    await asyncio.sleep(seconds)
+    cpu1, t1 = _cpu_seconds(pid), time.perf_counter()
+    measuring = False
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = t1 - t0
+    cpu = (cpu1 - cpu0) / elapsed
+    return {
+        "format": fmt,
+        "window_ms": window if fmt == "batch" else 0,
+        "clients": clients,
+        "frames_per_sec_per_client": round(counts["frames"] / elapsed / clients, 1),
+        "lines_per_sec_per_client": round(counts["lines"] / elapsed / clients, 1),
+        "server_cpu_pct": round(cpu * 100, 1),
+        "server_cpu_pct_per_client": round(cpu * 100 / clients, 2),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rate", type=int, default=1000, help="lines per second printed by the bot")
+    ap.add_argument("--clients", type=int, default=10)
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--warmup", type=float, default=2)
+    ap.add_argument("--window", type=int, default=50, help="batch window in ms")
+    ap.add_argument("--json", action="store_true", help="print results as JSON")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        proc, port = start_server(Path(tmp), args.rate)
+        try:
+            results = [
+                asyncio.run(run_mode(port, proc.pid, fmt, args.window,
+                                     args.clients, args.seconds, args.warmup))
+                for fmt in ("text", "batch")
+            ]
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"bot rate {args.rate} lines/s, {args.clients} clients, {args.seconds}s")
+    print(f"{'format':<8}{'window':>8}{'frames/s/client':>18}{'lines/s/client':>16}{'cpu%':>8}{'cpu%/client':>13}")
+    for r in results:
+        print(f"{r['format']:<8}{r['window_ms']:>8}{r['frames_per_sec_per_client']:>18}"
+              f"{r['lines_per_sec_per_client']:>16}{r['server_cpu_pct']:>8}{r['server_cpu_pct_per_client']:>13}")
+
+
+if __name__ == "__main__":
+    main()
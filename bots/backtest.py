@@ -0,0 +1,70 @@
+# bots/backtest.py
+"""
+Backtest a bot over historical candles, optionally over a parameter grid.
+
+  python -m bots.backtest trend_rider history/*.csv
+  python -m bots.backtest trend_rider history/ --grid fast=5,9,12 slow=21,34 --horizon 30
+  python -m bots.backtest scalper history/ --json report.json
+
+Each file holds one symbol (named after the file) with a header row and
+ts,open,high,low,close,volume columns; .parquet files need pyarrow.
+"""
+import argparse
+import json
+from pathlib import Path
+
+from bots.runtime.backtest import BACKTEST_WORKERS, backtest
+
+
+def _value(raw: str):
+    for cast in (int, float):
+        try:
+            return cast(raw)
+        except ValueError:
+            pass
+    return raw
+
+
+def parse_grid(items: list[str]) -> dict[str, list]:
+    spec = {}
+    for item in items:
+        key, _, values = item.partition("=")
+        if not values:
+            raise SystemExit(f"bad --grid entry {item!r}, expected name=v1,v2")
+        spec[key] = [_value(v) for v in values.split(",")]
+    return spec
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("bot")
+    ap.add_argument("data", nargs="+", help="CSV/Parquet files or directories of them")
+    ap.add_argument("--grid", nargs="*", default=[], help="name=v1,v2 ...")
+    ap.add_argument("--horizon", type=int, default=15, help="candles ahead used to score a signal")
+    ap.add_argument("--fee-bps", type=float, default=0.0)
+    ap.add_argument("--workers", type=int, default=BACKTEST_WORKERS)
+    ap.add_argument("--json", help="write the full report here")
+    args = ap.parse_args()
+
+    files = []
+    for item in map(Path, args.data):
+        if item.is_dir():
+            files += [p for p in item.iterdir() if p.suffix in (".csv", ".parquet")]
+        else:
+            files.append(item)
+    report = backtest(args.bot, files, parse_grid(args.grid), args.horizon, args.fee_bps, args.workers)
+
+    print(f"{report['bot']} ({report['mode']}): {report['files']} files, {report['candles']} candles, "
+          f"{len(report['combos'])} combos in {report['elapsed_s']}s")
+    ranked = sorted(report["combos"], key=lambda c: c["total"]["hit_rate"] or 0, reverse=True)
+    for entry in ranked:
+        t = entry["total"]
+        rate = f"{t['hit_rate']:.2%}" if t["hit_rate"] is not None else "-"
+        print(f"  {json.dumps(entry['params'])}  signals={t['signals']} (L{t['longs']}/S{t['shorts']}) "
+              f"hit_rate={rate} avg_return_bps={t['avg_return_bps']}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
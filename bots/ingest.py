@@ -0,0 +1,62 @@
+# bots/ingest.py
+"""
+Stream klines and trades into the shared OHLCV store.
+
+  python -m bots.ingest --symbols btcusdt,ethusdt --intervals 1m,5m
+  python -m bots.ingest --symbols btcusdt --trades --trade-intervals 1s --url ws://127.0.0.1:9100
+
+This process is the store's single writer; strategies attach as readers.
+"""
+import argparse
+import asyncio
+import logging
+import signal
+
+from bots.runtime.feed import FEED_REST_URL, FEED_WS_URL, FeedClient, OHLCVSink, rest_backfill
+from bots.runtime.ohlcv import OHLCVStore
+
+logger = logging.getLogger("bots.runtime")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--symbols", required=True, help="comma-separated, e.g. btcusdt,ethusdt")
+    ap.add_argument("--intervals", default="1m", help="kline intervals to subscribe to")
+    ap.add_argument("--trades", action="store_true", help="also build candles from raw trades")
+    ap.add_argument("--trade-intervals", default="1s",
+                    help="candle intervals built from trades; ones also in --intervals keep the klines")
+    ap.add_argument("--url", default=FEED_WS_URL)
+    ap.add_argument("--rest", default=FEED_REST_URL, help="REST base for gap backfill; empty disables")
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    symbols = [s.strip().lower() for s in args.symbols.split(",") if s.strip()]
+    intervals = [i.strip() for i in args.intervals.split(",") if i.strip()]
+    streams = [f"{s}@kline_{i}" for s in symbols for i in intervals]
+    if args.trades:
+        streams += [f"{s}@trade" for s in symbols]
+
+    trade_intervals = tuple(i.strip() for i in args.trade_intervals.split(",") if i.strip())
+
+    store = OHLCVStore(writer=True)
+    client = FeedClient(streams, OHLCVSink(store, trade_intervals), url=args.url,
+                        backfill=rest_backfill(args.rest) if args.rest else None)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, client.stop)
+            except NotImplementedError:
+                pass
+        await client.run()
+
+    try:
+        asyncio.run(run())
+    finally:
+        logger.info("ingest stopped: %s", client.stats.as_dict())
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
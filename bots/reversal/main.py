@@ -1,6 +1,26 @@
-import time
-i=0
-while True:
-    i+=1
-    print(f"[reversal] tick {i}")
-    time.sleep(2)
+from bots.runtime import run
+from bots.runtime.indicators import bollinger, rsi
+from bots.runtime.signals import SignalStrategy, crossings
+
+
+class Reversal(SignalStrategy):
+    """Fade stretched moves: RSI past its band and price outside Bollinger."""
+
+    name = "reversal"
+    interval = 2.0
+    params = {"rsi_period": 14, "oversold": 30.0, "overbought": 70.0, "bb_period": 20, "bb_k": 2.0}
+
+    def signals(self, candles):
+        p = self.params
+        close = candles["close"]
+        r = rsi(close, p["rsi_period"])
+        _, upper, lower = bollinger(close, p["bb_period"], p["bb_k"])
+        longs = crossings((r < p["oversold"]) & (close < lower))
+        shorts = crossings((r > p["overbought"]) & (close > upper))
+        return longs.astype("i1") - shorts.astype("i1")
+
+
+STRATEGY = Reversal
+
+if __name__ == "__main__":
+    run([Reversal()])
@@ -0,0 +1,32 @@
+# bots/run.py
+"""
+Run several strategies in one process.
+
+  python -m bots.run trend_rider scalper reversal
+  python -m bots.run --shard 0/2 trend_rider scalper reversal
+
+With --shard i/n only every n-th strategy (by position) starting at i is
+loaded, so the same command line can be split across a few processes.
+"""
+import argparse
+import importlib
+
+from bots.runtime import run
+
+
+def load(name: str):
+    return importlib.import_module(f"bots.{name}.main").STRATEGY()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("strategies", nargs="+")
+    ap.add_argument("--shard", default="0/1", help="i/n: run every n-th strategy starting at i")
+    args = ap.parse_args()
+    index, count = (int(x) for x in args.shard.split("/"))
+    names = args.strategies[index::count]
+    run([load(n) for n in names])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+from .engine import Engine, Strategy, StrategyStats, Tick, run
+
+__all__ = ["Engine", "Strategy", "StrategyStats", "Tick", "run"]
@@ -0,0 +1,165 @@
+# bots/runtime/backtest.py
+import importlib
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from .ohlcv import COLUMNS
+from .signals import SignalStrategy
+
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", "0")) or os.cpu_count() or 1
+
+
+def load_candles(path: str | Path) -> dict[str, np.ndarray]:
+    """Read ts,open,high,low,close,volume columns from a CSV (with header)
+    or Parquet file, oldest first."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("reading parquet needs pyarrow: pip install pyarrow")
+        table = pq.read_table(path, columns=list(COLUMNS))
+        cols = {name: table.column(name).to_numpy() for name in COLUMNS}
+    else:
+        with open(path) as f:
+            header = [h.strip().lower() for h in f.readline().split(",")]
+        missing = [c for c in COLUMNS if c not in header]
+        if missing:
+            raise ValueError(f"{path.name}: missing columns {missing}")
+        raw = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2,
+                         usecols=[header.index(c) for c in COLUMNS])
+        cols = {name: raw[:, i] for i, name in enumerate(COLUMNS)}
+    cols["ts"] = cols["ts"].astype(np.int64)
+    for name in COLUMNS[1:]:
+        cols[name] = np.ascontiguousarray(cols[name], dtype=np.float64)
+    return cols
+
+
+def grid(spec: dict[str, list]) -> list[dict]:
+    """Cartesian product of parameter values, in a stable order."""
+    keys = list(spec)
+    return [dict(zip(keys, values)) for values in itertools.product(*(spec[k] for k in keys))]
+
+
+def load_strategy(bot: str) -> type[SignalStrategy]:
+    return importlib.import_module(f"bots.{bot}.main").STRATEGY
+
+
+def run_signals(strategy: SignalStrategy, candles: dict[str, np.ndarray]) -> np.ndarray:
+    """Signals for every candle: vectorized if the strategy is stateless,
+    otherwise one step() per candle in order."""
+    if not strategy.stateful:
+        return np.asarray(strategy.signals(candles), dtype=np.int8)
+    state = strategy.new_state()
+    step = strategy.step
+    cols = [candles[k].tolist() for k in COLUMNS]
+    return np.fromiter((step(state, *row) for row in zip(*cols)), dtype=np.int8, count=len(cols[0]))
+
+
+def score(signals: np.ndarray, close: np.ndarray, horizon: int, fee_bps: float = 0.0) -> dict:
+    """A signal is a hit when price moved its way by more than the fee
+    `horizon` candles later. Signals too close to the end are not scored."""
+    idx = np.flatnonzero(signals)
+    scored = idx[idx + horizon < len(close)]
+    side = signals[scored].astype(np.float64)
+    ret = side * (close[scored + horizon] / close[scored] - 1.0) - fee_bps / 1e4
+    hits = int(np.count_nonzero(ret > 0))
+    return {
+        "signals": int(len(idx)),
+        "longs": int(np.count_nonzero(signals[idx] > 0)),
+        "shorts": int(np.count_nonzero(signals[idx] < 0)),
+        "scored": int(len(scored)),
+        "hits": hits,
+        "return_sum": float(ret.sum()),
+    }
+
+
+_STAT_KEYS = ("signals", "longs", "shorts", "scored", "hits", "return_sum")
+
+
+def _merge(into: dict, part: dict):
+    for k, v in part.items():
+        into[k] += v
+
+
+def _finish(stats: dict) -> dict:
+    scored = stats["scored"]
+    stats["hit_rate"] = round(stats["hits"] / scored, 4) if scored else None
+    stats["avg_return_bps"] = round(stats.pop("return_sum") / scored * 1e4, 2) if scored else None
+    return stats
+
+
+def _run_task(bot: str, path: str, combos: list[dict], horizon: int, fee_bps: float):
+    cls = load_strategy(bot)
+    began = time.perf_counter()
+    candles = load_candles(path)
+    load_s = time.perf_counter() - began
+    out = []
+    for params in combos:
+        sig = run_signals(cls(**params), candles)
+        out.append(score(sig, candles["close"], horizon, fee_bps))
+    return Path(path).stem, len(candles["ts"]), load_s, time.perf_counter() - began - load_s, out
+
+
+def backtest(bot: str, files: list[str | Path], spec: dict[str, list] | None = None,
+             horizon: int = 15, fee_bps: float = 0.0, workers: int = BACKTEST_WORKERS) -> dict:
+    """Run `bot` over every file for every parameter combination.
+
+    Work is split into (file, slice of the grid) tasks so both many symbols
+    and large grids spread over the pool; each task loads its file once.
+    Results are merged in grid order, then file order, whatever order the
+    tasks finish in.
+    """
+    cls = load_strategy(bot)
+    combos = grid(spec or {}) or [{}]
+    for params in combos:
+        cls(**params)  # reject unknown params before starting workers
+    files = sorted(str(f) for f in files)
+    per_file = max(1, -(-workers * 2 // max(len(files), 1)))
+    size = max(1, -(-len(combos) // per_file))
+    slices = [(i, combos[i:i + size]) for i in range(0, len(combos), size)]
+
+    began = time.perf_counter()
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {
+            (f, start): pool.submit(_run_task, bot, f, chunk, horizon, fee_bps)
+            for f in files for start, chunk in slices
+        }
+        results = {key: fut.result() for key, fut in futures.items()}
+
+    report = [
+        {"params": {**cls.params, **p}, "total": dict.fromkeys(_STAT_KEYS, 0), "symbols": {}}
+        for p in combos
+    ]
+    candles = load_s = eval_s = 0
+    for f in files:
+        for start, chunk in slices:
+            symbol, n, t_load, t_eval, stats = results[(f, start)]
+            load_s += t_load
+            eval_s += t_eval
+            if start == 0:
+                candles += n
+            for offset, s in enumerate(stats):
+                entry = report[start + offset]
+                _merge(entry["total"], s)
+                entry["symbols"][symbol] = _finish(dict(s))
+    for entry in report:
+        _finish(entry["total"])
+    return {
+        "bot": bot,
+        "mode": "event" if cls.stateful else "vectorized",
+        "horizon": horizon,
+        "fee_bps": fee_bps,
+        "files": len(files),
+        "candles": candles,
+        "combos": report,
+        "elapsed_s": round(time.perf_counter() - began, 3),
+        "load_s": round(load_s, 3),
+        "eval_s": round(eval_s, 3),
+    }
@@ -0,0 +1,87 @@
+# bots/runtime/config.py
+import json
+import logging
+import sys
+import threading
+from types import MappingProxyType
+
+logger = logging.getLogger("bots.runtime")
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class ConfigSnapshot:
+    """One bot's per-user configuration at a given version.
+
+    Deep-frozen on construction and never changed afterwards, so the tick
+    loop can read it without a lock; an update is a new snapshot.
+    """
+
+    __slots__ = ("bot", "version", "users")
+
+    def __init__(self, bot: str, version: int, users: dict):
+        self.bot = bot
+        self.version = int(version)
+        self.users = _freeze({str(uid): cfg for uid, cfg in users.items()})
+
+    @classmethod
+    def from_message(cls, msg: dict) -> "ConfigSnapshot":
+        return cls(msg["bot"], msg["version"], msg.get("users") or {})
+
+
+# bot name -> newest snapshot. Writers swap whole entries; readers just look
+# one up, which is atomic under the GIL.
+_latest: dict[str, ConfigSnapshot] = {}
+
+
+def latest(bot: str) -> ConfigSnapshot | None:
+    return _latest.get(bot)
+
+
+def publish(snapshot: ConfigSnapshot) -> bool:
+    """Make `snapshot` current unless a newer one is already in place."""
+    current = _latest.get(snapshot.bot)
+    if current is not None and snapshot.version < current.version:
+        return False
+    _latest[snapshot.bot] = snapshot
+    return True
+
+
+def read_stream(stream) -> int:
+    """Publish every config message in a JSON-lines stream until EOF."""
+    n = 0
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            msg = json.loads(line)
+            if msg.get("type") != "config":
+                continue
+            snapshot = ConfigSnapshot.from_message(msg)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            logger.warning("ignoring bad config message: %.200s", line)
+            continue
+        if publish(snapshot):
+            logger.info("config %s v%d: %d user(s)", snapshot.bot, snapshot.version, len(snapshot.users))
+            n += 1
+    return n
+
+
+def start_reader(stream=None) -> threading.Thread:
+    """Follow config pushes from the supervisor (one JSON object per line
+    on stdin) in a daemon thread."""
+    thread = threading.Thread(target=read_stream, args=(stream or sys.stdin,),
+                              name="config-reader", daemon=True)
+    thread.start()
+    return thread
+
+
+def discard(bot: str):
+    _latest.pop(bot, None)
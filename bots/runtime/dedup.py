@@ -0,0 +1,172 @@
+# bots/runtime/dedup.py
+import os
+import time
+
+import numpy as np
+
+DEDUP_CAPACITY = int(os.getenv("DEDUP_CAPACITY", "65536"))
+# Keys untouched for this long are forgotten.
+DEDUP_TTL = float(os.getenv("DEDUP_TTL", str(24 * 3600)))
+DEDUP_MAX_LOAD = 0.7
+
+_EMPTY = 0
+_TOMB = 1
+_MASK63 = (1 << 63) - 1
+
+
+class Rule:
+    """How one signal type is deduplicated.
+
+    Boolean rules fire when the condition turns on and re-arm once it is
+    seen off. Threshold rules take a value: with enter < exit they fire at
+    value <= enter and re-arm at value >= exit (RSI 30/35 style), and the
+    other way round for enter > exit, so noise around a single level cannot
+    re-fire. Either way a key fires at most once per `cooldown` seconds.
+    """
+
+    __slots__ = ("cooldown", "enter", "exit")
+
+    def __init__(self, cooldown: float = 0.0, enter: float | None = None, exit: float | None = None):
+        if (enter is None) != (exit is None):
+            raise ValueError("enter and exit thresholds go together")
+        self.cooldown = cooldown
+        self.enter = enter
+        self.exit = exit
+
+    def state(self, value) -> int:
+        """1 = active, -1 = clear (re-arms), 0 = in the hysteresis band."""
+        if self.enter is None:
+            return 1 if value else -1
+        if self.enter < self.exit:
+            return 1 if value <= self.enter else -1 if value >= self.exit else 0
+        return 1 if value >= self.enter else -1 if value <= self.exit else 0
+
+
+class Deduper:
+    """Cooldown and hysteresis state for (bot, symbol, signal type) keys.
+
+    Keys are reduced to 63-bit hashes in an open-addressing table of NumPy
+    columns (hash, last fire time, last seen second, armed flag): about 21
+    bytes a slot, so a million live keys take ~40 MB. allow() is a hash and
+    a short linear probe. evict() drops stale keys with one vectorized
+    pass; the table is rebuilt, also vectorized, only when tombstones and
+    live keys together pass the load limit.
+    """
+
+    def __init__(self, rules: dict[str, Rule] | None = None, default: Rule | None = None,
+                 capacity: int = DEDUP_CAPACITY, ttl: float = DEDUP_TTL):
+        self.rules = dict(rules or {})
+        self.default = default or Rule()
+        self.ttl = ttl
+        self.live = 0
+        self.used = 0  # live + tombstones
+        self._alloc(1 << max(4, (max(capacity, 1) - 1).bit_length()))
+
+    def _alloc(self, size: int):
+        self.keys = np.zeros(size, dtype=np.int64)
+        self.fired = np.zeros(size, dtype=np.float64)
+        self.seen = np.zeros(size, dtype=np.uint32)
+        self.armed = np.ones(size, dtype=np.int8)
+        self.mask = size - 1
+
+    def __len__(self) -> int:
+        return self.live
+
+    @property
+    def nbytes(self) -> int:
+        return self.keys.nbytes + self.fired.nbytes + self.seen.nbytes + self.armed.nbytes
+
+    @staticmethod
+    def key(bot: str, symbol: str, kind: str) -> int:
+        h = hash((bot, symbol, kind)) & _MASK63
+        return h if h > _TOMB else h + 2
+
+    def _find(self, h: int) -> tuple[int, bool]:
+        """(slot, found). When not found, slot is where h should go."""
+        keys, mask = self.keys, self.mask
+        i = h & mask
+        tomb = -1
+        while True:
+            k = keys[i]
+            if k == h:
+                return i, True
+            if k == _EMPTY:
+                return (i if tomb < 0 else tomb), False
+            if k == _TOMB and tomb < 0:
+                tomb = i
+            i = (i + 1) & mask
+
+    def allow(self, bot: str, symbol: str, kind: str, value=True, now: float | None = None) -> bool:
+        """Record one observation of a signal and say whether to emit it."""
+        now = time.time() if now is None else now
+        rule = self.rules.get(kind, self.default)
+        state = rule.state(value)
+        h = self.key(bot, symbol, kind)
+        i, found = self._find(h)
+        if not found:
+            if state <= 0:
+                return False  # nothing to remember for a key that never fired
+            if self.keys[i] == _EMPTY:
+                self.used += 1
+            self.keys[i] = h
+            self.live += 1
+            self.armed[i] = 1
+            self.fired[i] = -np.inf
+            if self.used > DEDUP_MAX_LOAD * (self.mask + 1):
+                self._rehash()
+                i, _ = self._find(h)
+        self.seen[i] = int(now)
+        if state < 0:
+            self.armed[i] = 1
+            return False
+        if state == 0 or not self.armed[i] or now - self.fired[i] < rule.cooldown:
+            return False
+        self.armed[i] = 0
+        self.fired[i] = now
+        return True
+
+    def forget(self, bot: str, symbol: str, kind: str):
+        i, found = self._find(self.key(bot, symbol, kind))
+        if found:
+            self.keys[i] = _TOMB
+            self.live -= 1
+
+    def evict(self, now: float | None = None) -> int:
+        """Drop keys not seen within the TTL; returns how many."""
+        now = time.time() if now is None else now
+        stale = (self.keys > _TOMB) & (self.seen < int(now - self.ttl))
+        n = int(np.count_nonzero(stale))
+        if n:
+            self.keys[stale] = _TOMB
+            self.live -= n
+        if self.used > DEDUP_MAX_LOAD * (self.mask + 1) * 0.9:
+            self._rehash()
+        return n
+
+    def _rehash(self):
+        live = self.keys > _TOMB
+        keys, fired, seen, armed = (a[live] for a in (self.keys, self.fired, self.seen, self.armed))
+        size = self.mask + 1
+        while len(keys) > DEDUP_MAX_LOAD * size * 0.75:
+            size *= 2
+        self._alloc(size)
+        # Place keys in rounds: each round every unplaced key tries its
+        # current slot, one winner per free slot, the rest move one slot on.
+        # Keys only ever step past occupied slots, so probing still works.
+        pos = keys & self.mask
+        todo = np.arange(len(keys))
+        while todo.size:
+            slots = pos[todo]
+            free = self.keys[slots] == _EMPTY
+            cand, cand_slots = todo[free], slots[free]
+            won_slots, first = np.unique(cand_slots, return_index=True)
+            won = cand[first]
+            self.keys[won_slots] = keys[won]
+            self.fired[won_slots] = fired[won]
+            self.seen[won_slots] = seen[won]
+            self.armed[won_slots] = armed[won]
+            placed = np.zeros(len(keys), dtype=bool)
+            placed[won] = True
+            todo = todo[~placed[todo]]
+            pos[todo] = (pos[todo] + 1) & self.mask
+        self.live = self.used = len(keys)
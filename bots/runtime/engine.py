@@ -0,0 +1,230 @@
+# bots/runtime/engine.py
+import asyncio
+import logging
+import os
+import signal
+import traceback
+
+from . import config, telegram
+from .telemetry import TELEMETRY_INTERVAL, Histogram, Reporter, emit
+
+logger = logging.getLogger("bots.runtime")
+
+
+class Tick:
+    """What a strategy gets on every tick."""
+
+    __slots__ = ("n", "deadline", "lag")
+
+    def __init__(self, n: int, deadline: float, lag: float):
+        self.n = n                # tick number, counting skipped slots
+        self.deadline = deadline  # loop.time() the tick was scheduled for
+        self.lag = lag            # how late the scheduler woke up, seconds
+
+
+class Strategy:
+    """Base class for strategies run by the Engine.
+
+    Subclasses set `name` and `interval` (seconds) and implement on_tick.
+    on_tick must not block; anything slow belongs in an executor.
+    """
+
+    name = "strategy"
+    interval = 1.0
+    config = None
+
+    def apply_config(self, snapshot):
+        """Switch to a new ConfigSnapshot; called between ticks. Raise to
+        reject it and keep running on the previous one."""
+        self.config = snapshot
+
+    async def on_start(self):
+        pass
+
+    async def on_tick(self, tick: Tick):
+        raise NotImplementedError
+
+    async def on_stop(self):
+        pass
+
+
+class StrategyStats:
+    __slots__ = ("ticks", "overruns", "skipped", "errors", "last_duration", "max_lag", "lag", "tick_us")
+
+    def __init__(self):
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.errors = 0
+        self.last_duration = 0.0
+        self.max_lag = 0.0
+        self.lag = 0.0              # scheduler lag of the latest tick
+        self.tick_us = Histogram()  # tick durations since the last report
+
+    def as_dict(self) -> dict:
+        out = {k: getattr(self, k) for k in self.__slots__ if k != "tick_us"}
+        out["tick_p50_us"] = self.tick_us.percentile(50)
+        out["tick_p99_us"] = self.tick_us.percentile(99)
+        return out
+
+
+class Engine:
+    """Runs many strategies in one process on drift-free deadlines.
+
+    Tick n of a strategy is due at start + n * interval, so time spent in
+    on_tick never shifts later ticks. If a tick runs past the next deadline
+    the missed slots are skipped (and counted as an overrun) instead of
+    firing back-to-back to catch up. A newer config snapshot, if one was
+    pushed, is applied right before a tick, never during one.
+
+    With `telemetry` set (seconds), a report of every strategy's tick
+    histogram, lag and counters is written to stdout at that interval.
+    """
+
+    def __init__(self, telemetry: float | None = None):
+        self.telemetry = telemetry
+        self.strategies: dict[str, Strategy] = {}
+        self.stats: dict[str, StrategyStats] = {}
+        self._stop: asyncio.Event | None = None
+        self._halts: dict[str, asyncio.Event] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def add(self, strategy: Strategy, key: str | None = None) -> Strategy:
+        """Register a strategy under `key` (default: its name). While the
+        engine runs, it starts ticking right away."""
+        key = key or strategy.name
+        if key in self.strategies:
+            raise ValueError(f"duplicate strategy: {key}")
+        self.strategies[key] = strategy
+        self.stats[key] = StrategyStats()
+        if self._stop is not None and not self._stop.is_set():
+            self._launch(key)
+        return strategy
+
+    async def remove(self, key: str):
+        """Stop one strategy (running its on_stop) and forget it."""
+        halt = self._halts.pop(key, None)
+        task = self._tasks.pop(key, None)
+        if halt is not None:
+            halt.set()
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+        self.strategies.pop(key, None)
+        self.stats.pop(key, None)
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+
+    def _launch(self, key: str):
+        halt = self._halts[key] = asyncio.Event()
+        self._tasks[key] = asyncio.ensure_future(self._drive(key, self.strategies[key], halt))
+
+    async def run(self):
+        self._stop = asyncio.Event()
+        for key in list(self.strategies):
+            self._launch(key)
+        reporter = asyncio.ensure_future(self._report()) if self.telemetry else None
+        try:
+            await self._stop.wait()
+        finally:
+            self._stop.set()
+            if reporter is not None:
+                reporter.cancel()
+            for halt in self._halts.values():
+                halt.set()
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+            self._halts.clear()
+            self._tasks.clear()
+
+    async def _report(self):
+        reporter = Reporter()
+        while True:
+            await asyncio.sleep(self.telemetry)
+            emit(reporter.report(self.strategies, self.stats, self.telemetry))
+
+    @staticmethod
+    async def _sleep_until(loop, when: float, halt: asyncio.Event) -> bool:
+        """Sleep until loop time `when`; False if the strategy is stopping."""
+        delay = when - loop.time()
+        if delay > 0:
+            try:
+                await asyncio.wait_for(halt.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+        return not halt.is_set()
+
+    async def _drive(self, key: str, strategy: Strategy, halt: asyncio.Event):
+        loop = asyncio.get_running_loop()
+        stats = self.stats[key]
+        interval = strategy.interval
+        await strategy.on_start()
+        start = loop.time()
+        n = 0
+        offered = None
+        try:
+            while await self._sleep_until(loop, start + n * interval, halt):
+                snapshot = config.latest(key)
+                if snapshot is not offered:
+                    offered = snapshot
+                    try:
+                        strategy.apply_config(snapshot)
+                    except Exception:
+                        stats.errors += 1
+                        logger.error("%s rejected config v%d\n%s", key,
+                                     snapshot.version, traceback.format_exc())
+                deadline = start + n * interval
+                began = loop.time()
+                lag = began - deadline
+                stats.lag = lag
+                stats.max_lag = max(stats.max_lag, lag)
+                try:
+                    await strategy.on_tick(Tick(n, deadline, lag))
+                except Exception:
+                    stats.errors += 1
+                    logger.error("%s tick %d failed\n%s", key, n, traceback.format_exc())
+                ended = loop.time()
+                stats.ticks += 1
+                stats.last_duration = ended - began
+                stats.tick_us.record(stats.last_duration)
+                n += 1
+                late = ended - (start + n * interval)
+                if late > 0:
+                    missed = int(late // interval) + 1
+                    stats.skipped += missed
+                    n += missed
+                    if stats.last_duration > interval:
+                        stats.overruns += 1
+                        logger.warning("%s tick took %.3fs, over its %.3fs interval; skipped %d tick(s)",
+                                       key, stats.last_duration, interval, missed)
+                    else:
+                        # The tick itself was quick; something else held the loop.
+                        logger.warning("%s woke %.3fs late; skipped %d tick(s)",
+                                       key, lag, missed)
+        finally:
+            await strategy.on_stop()
+
+
+def run(strategies: list[Strategy]):
+    """Run strategies in this process until SIGINT/SIGTERM."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    # Set by the API supervisor, which reads the reports off stdout.
+    engine = Engine(TELEMETRY_INTERVAL if os.getenv("BOT_TELEMETRY") else None)
+    for strategy in strategies:
+        engine.add(strategy)
+    # Set by the API supervisor, which pushes config snapshots down stdin.
+    if os.getenv("BOT_CONFIG_STDIN"):
+        config.start_reader()
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, engine.stop)
+            except NotImplementedError:
+                pass
+        await engine.run()
+        await telegram.shutdown()
+
+    asyncio.run(main())
+    return engine
@@ -0,0 +1,328 @@
+# bots/runtime/feed.py
+import asyncio
+import inspect
+import json
+import logging
+import os
+import random
+import urllib.parse
+import urllib.request
+from typing import Any, Awaitable, Callable
+
+import orjson
+from websockets.asyncio.client import connect
+from websockets.exceptions import WebSocketException
+
+from .ohlcv import OHLCVStore
+
+logger = logging.getLogger("bots.runtime")
+
+FEED_WS_URL = os.getenv("FEED_WS_URL", "wss://stream.binance.com:9443/ws")
+FEED_REST_URL = os.getenv("FEED_REST_URL", "https://api.binance.com")
+FEED_BATCH_MS = int(os.getenv("FEED_BATCH_MS", "20"))
+FEED_BATCH_MAX = int(os.getenv("FEED_BATCH_MAX", "2000"))
+# Batches buffered for a slow consumer before the socket is back-pressured.
+FEED_QUEUE_BATCHES = int(os.getenv("FEED_QUEUE_BATCHES", "64"))
+# Frames the socket reads ahead of the decoder; past this it stops reading
+# and TCP flow control pushes back on the exchange.
+FEED_WS_QUEUE = int(os.getenv("FEED_WS_QUEUE", "1024"))
+FEED_BACKOFF_BASE = float(os.getenv("FEED_BACKOFF_BASE", "0.5"))
+FEED_BACKOFF_MAX = float(os.getenv("FEED_BACKOFF_MAX", "30"))
+FEED_BACKFILL_LIMIT = int(os.getenv("FEED_BACKFILL_LIMIT", "1000"))
+
+_UNITS = {"s": 1_000, "m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
+
+def interval_ms(interval: str) -> int:
+    return int(interval[:-1]) * _UNITS[interval[-1]]
+
+
+class Candle:
+    __slots__ = ("symbol", "interval", "ts", "open", "high", "low", "close", "volume", "closed")
+
+    def __init__(self, symbol, interval, ts, o, h, l, c, v, closed):
+        self.symbol = symbol
+        self.interval = interval
+        self.ts = ts
+        self.open = o
+        self.high = h
+        self.low = l
+        self.close = c
+        self.volume = v
+        self.closed = closed
+
+
+class Trade:
+    __slots__ = ("symbol", "ts", "price", "qty", "trade_id")
+
+    def __init__(self, symbol, ts, price, qty, trade_id):
+        self.symbol = symbol
+        self.ts = ts
+        self.price = price
+        self.qty = qty
+        self.trade_id = trade_id
+
+
+def parse(raw: str | bytes) -> Candle | Trade | None:
+    """Decode one kline or trade frame (plain or combined-stream envelope).
+    Subscription acks and unknown events return None."""
+    msg = orjson.loads(raw)
+    data = msg.get("data", msg) if isinstance(msg, dict) else None
+    if not isinstance(data, dict):
+        return None
+    kind = data.get("e")
+    if kind == "kline":
+        k = data["k"]
+        return Candle(data["s"], k["i"], k["t"], float(k["o"]), float(k["h"]),
+                      float(k["l"]), float(k["c"]), float(k["v"]), k["x"])
+    if kind == "trade":
+        return Trade(data["s"], data["T"], float(data["p"]), float(data["q"]), data["t"])
+    return None
+
+
+def kline_streams(streams: list[str]) -> list[tuple[str, str]]:
+    """(SYMBOL, interval) for every "<symbol>@kline_<interval>" stream."""
+    out = []
+    for s in streams:
+        sym, _, kind = s.partition("@")
+        if kind.startswith("kline_"):
+            out.append((sym.upper(), kind[len("kline_"):]))
+    return out
+
+
+# backfill(symbol, interval, start_ms) -> [[open_time, o, h, l, c, v, ...], ...]
+Backfill = Callable[[str, str, int], Awaitable[list]]
+
+
+def rest_backfill(base_url: str = FEED_REST_URL) -> Backfill:
+    """Backfill from a Binance-style GET /api/v3/klines endpoint."""
+
+    def fetch(symbol: str, interval: str, start_ms: int) -> list:
+        qs = urllib.parse.urlencode({
+            "symbol": symbol, "interval": interval,
+            "startTime": start_ms, "limit": FEED_BACKFILL_LIMIT,
+        })
+        with urllib.request.urlopen(f"{base_url}/api/v3/klines?{qs}", timeout=10) as r:
+            return json.loads(r.read())
+
+    async def backfill(symbol: str, interval: str, start_ms: int) -> list:
+        return await asyncio.to_thread(fetch, symbol, interval, start_ms)
+
+    return backfill
+
+
+class FeedStats:
+    __slots__ = ("connects", "messages", "events", "batches", "parse_errors",
+                 "backfilled", "backfill_errors", "trade_gaps")
+
+    def __init__(self):
+        for k in self.__slots__:
+            setattr(self, k, 0)
+
+    def as_dict(self) -> dict:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+class FeedClient:
+    """Streaming kline/trade client with reconnect and batched hand-off.
+
+    Decoded events are collected for up to `batch_ms` (or `batch_max`
+    events) and handed to `on_batch(list)` on a separate task, so a slow
+    consumer back-pressures the socket instead of growing memory. On every
+    (re)connect the client resubscribes, then backfills each kline stream
+    from the last candle it saw before reading live frames again.
+    """
+
+    def __init__(self, streams: list[str], on_batch: Callable[[list], Any],
+                 url: str = FEED_WS_URL, backfill: Backfill | None = None,
+                 batch_ms: int = FEED_BATCH_MS, batch_max: int = FEED_BATCH_MAX):
+        self.streams = list(streams)
+        self.on_batch = on_batch
+        self.url = url
+        self.backfill = backfill
+        self.batch_s = batch_ms / 1000
+        self.batch_max = batch_max
+        self.stats = FeedStats()
+        self.last_candle: dict[tuple[str, str], int] = {}
+        self.last_trade: dict[str, int] = {}
+        self._pending: list = []
+        self._queue: asyncio.Queue | None = None
+        self._stop: asyncio.Event | None = None
+        self._ws = None
+        self._msg_id = 0
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+            if self._ws is not None:
+                asyncio.ensure_future(self._ws.close())
+
+    async def run(self):
+        self._stop = asyncio.Event()
+        self._queue = asyncio.Queue(FEED_QUEUE_BATCHES)
+        consumer = asyncio.ensure_future(self._consume())
+        flusher = asyncio.ensure_future(self._flush_every())
+        delay = FEED_BACKOFF_BASE
+        try:
+            while not self._stop.is_set():
+                try:
+                    async with connect(self.url, max_queue=FEED_WS_QUEUE, compression=None) as ws:
+                        self._ws = ws
+                        self.stats.connects += 1
+                        await self._subscribe(ws)
+                        await self._backfill()
+                        delay = FEED_BACKOFF_BASE
+                        await self._read(ws)
+                except (OSError, asyncio.TimeoutError, WebSocketException) as e:
+                    logger.warning("feed %s disconnected: %r", self.url, e)
+                except (ValueError, IndexError, TypeError) as e:
+                    # Malformed klines from the REST backfill: retry the gap
+                    # on a fresh connection rather than killing the feed.
+                    self.stats.backfill_errors += 1
+                    logger.warning("feed %s backfill failed: %r", self.url, e)
+                finally:
+                    self._ws = None
+                if self._stop.is_set():
+                    break
+                wait = random.uniform(delay / 2, delay)
+                delay = min(delay * 2, FEED_BACKOFF_MAX)
+                try:
+                    await asyncio.wait_for(self._stop.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            flusher.cancel()
+            await asyncio.gather(flusher, return_exceptions=True)
+            await self._handoff()
+            await self._queue.put(None)
+            await consumer
+
+    async def _subscribe(self, ws):
+        self._msg_id += 1
+        await ws.send(orjson.dumps({"method": "SUBSCRIBE", "params": self.streams, "id": self._msg_id}))
+
+    async def _backfill(self):
+        if self.backfill is None:
+            return
+        for key in kline_streams(self.streams):
+            last = self.last_candle.get(key)
+            if last is None:
+                continue
+            symbol, interval = key
+            rows = await self.backfill(symbol, interval, last)
+            for i, row in enumerate(rows):
+                ts = int(row[0])
+                if ts < last:
+                    continue
+                # Every row but the newest is a finished candle.
+                self._emit(Candle(symbol, interval, ts, float(row[1]), float(row[2]),
+                                  float(row[3]), float(row[4]), float(row[5]), i < len(rows) - 1))
+                self.stats.backfilled += 1
+        await self._handoff()
+
+    async def _read(self, ws):
+        stats = self.stats
+        async for raw in ws:
+            stats.messages += 1
+            try:
+                ev = parse(raw)
+            except (ValueError, KeyError, TypeError):
+                stats.parse_errors += 1
+                continue
+            if ev is None:
+                continue
+            self._emit(ev)
+            if len(self._pending) >= self.batch_max:
+                await self._handoff()
+
+    def _emit(self, ev):
+        if ev.__class__ is Candle:
+            self.last_candle[(ev.symbol, ev.interval)] = ev.ts
+        else:
+            last = self.last_trade.get(ev.symbol)
+            if last is not None and ev.trade_id > last + 1:
+                self.stats.trade_gaps += 1
+            self.last_trade[ev.symbol] = ev.trade_id
+        self.stats.events += 1
+        self._pending.append(ev)
+
+    async def _handoff(self):
+        if self._pending:
+            batch, self._pending = self._pending, []
+            self.stats.batches += 1
+            await self._queue.put(batch)
+
+    async def _flush_every(self):
+        while True:
+            await asyncio.sleep(self.batch_s)
+            await self._handoff()
+
+    async def _consume(self):
+        while True:
+            batch = await self._queue.get()
+            if batch is None:
+                return
+            try:
+                result = self.on_batch(batch)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("feed consumer failed on a batch of %d", len(batch))
+
+
+class OHLCVSink:
+    """Batch consumer that folds candles and trades into an OHLCVStore.
+
+    Within a batch only the last update of each open candle is written, so
+    a burst of trades costs one shared-memory write per candle, not one per
+    trade. Candles older than the newest stored one are dropped. A series
+    that a kline stream feeds takes its candles only from there; trades
+    never fold into it, or their volume would be counted twice.
+    """
+
+    def __init__(self, store: OHLCVStore, trade_intervals: tuple[str, ...] = ("1m",)):
+        self.store = store
+        self.trade_intervals = [(iv, interval_ms(iv)) for iv in trade_intervals]
+        # (symbol, interval) -> [ts, o, h, l, c, v] still being written
+        self._open: dict[tuple[str, str], list] = {}
+        self._klines: set[tuple[str, str]] = set()
+
+    def __call__(self, batch: list):
+        dirty: dict[tuple[str, str], list] = {}
+        for ev in batch:
+            if ev.__class__ is Candle:
+                key = (ev.symbol, ev.interval)
+                self._klines.add(key)
+                row = [ev.ts, ev.open, ev.high, ev.low, ev.close, ev.volume]
+                prev = dirty.get(key)
+                if prev is not None and prev[0] != ev.ts:
+                    self._write(key, prev)
+                dirty[key] = row
+                continue
+            for iv, step in self.trade_intervals:
+                key = (ev.symbol, iv)
+                if key in self._klines:
+                    continue
+                ts = ev.ts - ev.ts % step
+                row = dirty.get(key) or self._open.get(key)
+                if row is None or row[0] != ts:
+                    if row is not None and key in dirty:
+                        self._write(key, row)
+                    row = [ts, ev.price, ev.price, ev.price, ev.price, 0.0]
+                if ev.price > row[2]:
+                    row[2] = ev.price
+                if ev.price < row[3]:
+                    row[3] = ev.price
+                row[4] = ev.price
+                row[5] += ev.qty
+                dirty[key] = row
+        for key, row in dirty.items():
+            self._write(key, row)
+
+    def _write(self, key: tuple[str, str], row: list):
+        series = self.store.series(*key)
+        last = series.last_ts()
+        if last is not None and row[0] < last:
+            return
+        series.upsert(*row)
+        self._open[key] = row
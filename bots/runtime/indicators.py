@@ -0,0 +1,450 @@
+# bots/runtime/indicators.py
+"""
+Technical indicators in two modes.
+
+Batch functions take NumPy arrays and return arrays of the same length,
+NaN where the indicator is still warming up. Use them over history.
+
+Incremental classes keep O(1) state in __slots__ and take one candle per
+update() call. Use them on the live tick path. Each class has a
+from_history() constructor that warms its state with the batch functions,
+so a bot can seed from the OHLCV store and then keep updating per candle.
+
+Both modes agree: EMA-style averages are seeded with the first value and
+Wilder smoothing (RSI, ATR) is an EMA with alpha = 1 / period.
+"""
+import math
+
+import numpy as np
+
+NAN = float("nan")
+
+
+# ---------------- Batch ---------------- #
+
+def _ewm(x: np.ndarray, alpha: float, seed: float | None = None) -> np.ndarray:
+    """y[0] = seed or x[0]; y[t] = y[t-1] + alpha * (x[t] - y[t-1]).
+
+    Solved in closed form per block: with d = 1 - alpha,
+    y[t] = d^(t+1) * y[-1] + alpha * d^t * cumsum(x[k] / d^k). Blocks are
+    sized so d^-k stays under ~1e150, and each block is scaled by its
+    largest |x|, so the cumsum stays finite whatever the input magnitude.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    out = np.empty_like(x)
+    if not len(x):
+        return out
+    d = 1.0 - alpha
+    if d <= 0.0:
+        out[:] = x
+        return out
+    block = max(1, int(150.0 / -math.log10(d))) if d < 1.0 else len(x)
+    prev = x[0] if seed is None else seed
+    start = 0
+    if seed is None:
+        out[0] = prev
+        start = 1
+    for lo in range(start, len(x), block):
+        chunk = x[lo:lo + block]
+        scale = np.abs(chunk).max()
+        if not 0.0 < scale < math.inf:
+            scale = 1.0
+        k = np.arange(len(chunk), dtype=np.float64)
+        inv = d ** -k
+        pw = d ** (k + 1)
+        acc = np.cumsum((chunk / scale) * inv) * (d ** k)
+        out[lo:lo + len(chunk)] = pw * prev + (alpha * scale) * acc
+        prev = out[lo + len(chunk) - 1]
+    return out
+
+
+def ema(x: np.ndarray, period: int) -> np.ndarray:
+    out = _ewm(x, 2.0 / (period + 1))
+    out[:period - 1] = np.nan
+    return out
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    close = np.asarray(close, dtype=np.float64)
+    out = np.full(len(close), np.nan)
+    if len(close) < 2:
+        return out
+    delta = np.diff(close)
+    gain = _ewm(np.maximum(delta, 0.0), 1.0 / period)
+    loss = _ewm(np.maximum(-delta, 0.0), 1.0 / period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = gain / loss
+        val = np.where(loss == 0.0, 100.0, 100.0 - 100.0 / (1.0 + rs))
+    out[1:] = val
+    out[:period] = np.nan
+    return out
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9):
+    """Returns (macd, signal, histogram)."""
+    line = _ewm(close, 2.0 / (fast + 1)) - _ewm(close, 2.0 / (slow + 1))
+    sig = _ewm(line, 2.0 / (signal + 1))
+    hist = line - sig
+    warm = slow + signal - 2
+    for arr in (line, sig, hist):
+        arr[:min(warm, len(arr))] = np.nan
+    return line, sig, hist
+
+
+def vwap(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """Cumulative VWAP over the whole input (pass one session at a time)."""
+    tp = (np.asarray(high) + np.asarray(low) + np.asarray(close)) / 3.0
+    vol = np.asarray(volume, dtype=np.float64)
+    cv = np.cumsum(vol)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(cv > 0, np.cumsum(tp * vol) / cv, np.nan)
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    tr = high - low
+    if len(tr) > 1:
+        pc = close[:-1]
+        tr[1:] = np.maximum(tr[1:], np.maximum(np.abs(high[1:] - pc), np.abs(low[1:] - pc)))
+    return tr
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    out = _ewm(true_range(high, low, close), 1.0 / period)
+    out[:period - 1] = np.nan
+    return out
+
+
+def _rolling_sum(x: np.ndarray, period: int) -> np.ndarray:
+    c = np.cumsum(np.concatenate(([0.0], x)))
+    out = np.full(len(x), np.nan)
+    if len(x) >= period:
+        out[period - 1:] = c[period:] - c[:-period]
+    return out
+
+
+def bollinger(close: np.ndarray, period: int = 20, k: float = 2.0):
+    """Returns (middle, upper, lower) using the population std of the window."""
+    close = np.asarray(close, dtype=np.float64)
+    mean = _rolling_sum(close, period) / period
+    # Centre before squaring so large prices do not cancel catastrophically.
+    ref = close[0] if len(close) else 0.0
+    dev = close - ref
+    var = _rolling_sum(dev * dev, period) / period - (mean - ref) ** 2
+    std = np.sqrt(np.maximum(var, 0.0))
+    return mean, mean + k * std, mean - k * std
+
+
+def volume_spike(volume: np.ndarray, period: int = 20, threshold: float = 3.0):
+    """Returns (ratio, spike): volume over the mean of the previous `period` bars."""
+    volume = np.asarray(volume, dtype=np.float64)
+    prev_mean = np.full(len(volume), np.nan)
+    if len(volume) > period:
+        prev_mean[period:] = _rolling_sum(volume, period)[period - 1:-1] / period
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = volume / prev_mean
+    return ratio, ratio >= threshold
+
+
+# ---------------- Incremental ---------------- #
+
+class EMA:
+    __slots__ = ("period", "alpha", "value", "n")
+
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.value = NAN
+        self.n = 0
+
+    @classmethod
+    def from_history(cls, x: np.ndarray, period: int) -> "EMA":
+        ind = cls(period)
+        if len(x):
+            ind.value = float(_ewm(x, ind.alpha)[-1])
+            ind.n = len(x)
+        return ind
+
+    def update(self, x: float) -> float:
+        n = self.n
+        self.n = n + 1
+        if n:
+            self.value += self.alpha * (x - self.value)
+        else:
+            self.value = x
+        return self.value if n + 1 >= self.period else NAN
+
+
+class RSI:
+    __slots__ = ("period", "alpha", "prev", "avg_gain", "avg_loss", "n")
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.alpha = 1.0 / period
+        self.prev = NAN
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.n = 0
+
+    @classmethod
+    def from_history(cls, close: np.ndarray, period: int = 14) -> "RSI":
+        ind = cls(period)
+        ind.n = len(close)
+        if len(close):
+            ind.prev = float(close[-1])
+        if len(close) > 1:
+            delta = np.diff(np.asarray(close, dtype=np.float64))
+            ind.avg_gain = float(_ewm(np.maximum(delta, 0.0), ind.alpha)[-1])
+            ind.avg_loss = float(_ewm(np.maximum(-delta, 0.0), ind.alpha)[-1])
+        return ind
+
+    def update(self, close: float) -> float:
+        n = self.n
+        self.n = n + 1
+        if not n:
+            self.prev = close
+            return NAN
+        delta = close - self.prev
+        self.prev = close
+        gain = delta if delta > 0.0 else 0.0
+        loss = -delta if delta < 0.0 else 0.0
+        if n == 1:
+            self.avg_gain, self.avg_loss = gain, loss
+        else:
+            a = self.alpha
+            self.avg_gain += a * (gain - self.avg_gain)
+            self.avg_loss += a * (loss - self.avg_loss)
+        if n < self.period:
+            return NAN
+        if self.avg_loss == 0.0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss)
+
+
+class MACD:
+    __slots__ = ("fa", "sa", "ga", "fast", "slow", "line_signal", "n", "warm")
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fa = 2.0 / (fast + 1)
+        self.sa = 2.0 / (slow + 1)
+        self.ga = 2.0 / (signal + 1)
+        self.fast = self.slow = self.line_signal = NAN
+        self.n = 0
+        self.warm = slow + signal - 2
+
+    @classmethod
+    def from_history(cls, close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> "MACD":
+        ind = cls(fast, slow, signal)
+        if len(close):
+            f = _ewm(close, ind.fa)
+            s = _ewm(close, ind.sa)
+            ind.fast, ind.slow = float(f[-1]), float(s[-1])
+            ind.line_signal = float(_ewm(f - s, ind.ga)[-1])
+            ind.n = len(close)
+        return ind
+
+    def update(self, close: float) -> tuple[float, float, float]:
+        n = self.n
+        self.n = n + 1
+        if n:
+            self.fast += self.fa * (close - self.fast)
+            self.slow += self.sa * (close - self.slow)
+            line = self.fast - self.slow
+            self.line_signal += self.ga * (line - self.line_signal)
+        else:
+            self.fast = self.slow = close
+            line = 0.0
+            self.line_signal = 0.0
+        if n < self.warm:
+            return NAN, NAN, NAN
+        return line, self.line_signal, line - self.line_signal
+
+
+class VWAP:
+    __slots__ = ("pv", "vol")
+
+    def __init__(self):
+        self.pv = 0.0
+        self.vol = 0.0
+
+    @classmethod
+    def from_history(cls, high, low, close, volume) -> "VWAP":
+        ind = cls()
+        vol = np.asarray(volume, dtype=np.float64)
+        ind.pv = float(np.sum((np.asarray(high) + np.asarray(low) + np.asarray(close)) / 3.0 * vol))
+        ind.vol = float(np.sum(vol))
+        return ind
+
+    def reset(self):
+        """Start a new session."""
+        self.pv = 0.0
+        self.vol = 0.0
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        self.pv += (high + low + close) / 3.0 * volume
+        self.vol += volume
+        return self.pv / self.vol if self.vol > 0.0 else NAN
+
+
+class ATR:
+    __slots__ = ("period", "alpha", "prev_close", "value", "n")
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.alpha = 1.0 / period
+        self.prev_close = NAN
+        self.value = NAN
+        self.n = 0
+
+    @classmethod
+    def from_history(cls, high, low, close, period: int = 14) -> "ATR":
+        ind = cls(period)
+        if len(close):
+            ind.value = float(_ewm(true_range(high, low, close), ind.alpha)[-1])
+            ind.prev_close = float(close[-1])
+            ind.n = len(close)
+        return ind
+
+    def update(self, high: float, low: float, close: float) -> float:
+        n = self.n
+        self.n = n + 1
+        tr = high - low
+        if n:
+            pc = self.prev_close
+            a, b = abs(high - pc), abs(low - pc)
+            if a > tr:
+                tr = a
+            if b > tr:
+                tr = b
+            self.value += self.alpha * (tr - self.value)
+        else:
+            self.value = tr
+        self.prev_close = close
+        return self.value if n + 1 >= self.period else NAN
+
+
+class _Window:
+    """Fixed-size ring of floats with running sum and sum of squares."""
+
+    __slots__ = ("buf", "i", "full", "total", "total_sq")
+
+    def __init__(self, size: int):
+        self.buf = [0.0] * size
+        self.i = 0
+        self.full = False
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def push(self, x: float) -> float:
+        """Insert x and return the value it evicted (0.0 while filling)."""
+        buf, i = self.buf, self.i
+        old = buf[i]
+        buf[i] = x
+        self.total += x - old
+        self.total_sq += x * x - old * old
+        i += 1
+        if i == len(buf):
+            i = 0
+            self.full = True
+            # Resync once per lap so rounding in the running sums cannot drift.
+            self.total = math.fsum(buf)
+            self.total_sq = math.fsum(v * v for v in buf)
+        self.i = i
+        return old
+
+
+class Bollinger:
+    __slots__ = ("period", "k", "win")
+
+    def __init__(self, period: int = 20, k: float = 2.0):
+        self.period = period
+        self.k = k
+        self.win = _Window(period)
+
+    @classmethod
+    def from_history(cls, close: np.ndarray, period: int = 20, k: float = 2.0) -> "Bollinger":
+        ind = cls(period, k)
+        for x in np.asarray(close, dtype=np.float64)[-period:]:
+            ind.win.push(float(x))
+        return ind
+
+    def update(self, close: float) -> tuple[float, float, float]:
+        win = self.win
+        win.push(close)
+        if not win.full:
+            return NAN, NAN, NAN
+        p = self.period
+        mean = win.total / p
+        var = win.total_sq / p - mean * mean
+        std = math.sqrt(var) if var > 0.0 else 0.0
+        return mean, mean + self.k * std, mean - self.k * std
+
+
+class VolumeSpike:
+    __slots__ = ("period", "threshold", "win")
+
+    def __init__(self, period: int = 20, threshold: float = 3.0):
+        self.period = period
+        self.threshold = threshold
+        self.win = _Window(period)
+
+    @classmethod
+    def from_history(cls, volume: np.ndarray, period: int = 20, threshold: float = 3.0) -> "VolumeSpike":
+        ind = cls(period, threshold)
+        for x in np.asarray(volume, dtype=np.float64)[-period:]:
+            ind.win.push(float(x))
+        return ind
+
+    def update(self, volume: float) -> tuple[float, bool]:
+        win = self.win
+        ready = win.full
+        mean = win.total / self.period
+        win.push(volume)
+        if not ready or mean <= 0.0:
+            return NAN, False
+        ratio = volume / mean
+        return ratio, ratio >= self.threshold
+
+
+class IndicatorSet:
+    """The standard indicator bundle for one symbol, updated per candle."""
+
+    __slots__ = ("ema_fast", "ema_slow", "rsi", "macd", "vwap", "atr", "bb", "vol")
+
+    def __init__(self):
+        self.ema_fast = EMA(9)
+        self.ema_slow = EMA(21)
+        self.rsi = RSI(14)
+        self.macd = MACD(12, 26, 9)
+        self.vwap = VWAP()
+        self.atr = ATR(14)
+        self.bb = Bollinger(20, 2.0)
+        self.vol = VolumeSpike(20, 3.0)
+
+    @classmethod
+    def from_history(cls, high, low, close, volume) -> "IndicatorSet":
+        s = cls.__new__(cls)
+        s.ema_fast = EMA.from_history(close, 9)
+        s.ema_slow = EMA.from_history(close, 21)
+        s.rsi = RSI.from_history(close, 14)
+        s.macd = MACD.from_history(close, 12, 26, 9)
+        s.vwap = VWAP.from_history(high, low, close, volume)
+        s.atr = ATR.from_history(high, low, close, 14)
+        s.bb = Bollinger.from_history(close, 20, 2.0)
+        s.vol = VolumeSpike.from_history(volume, 20, 3.0)
+        return s
+
+    def update(self, high: float, low: float, close: float, volume: float) -> tuple:
+        """(ema_fast, ema_slow, rsi, macd, vwap, atr, bollinger, volume_spike)."""
+        return (
+            self.ema_fast.update(close),
+            self.ema_slow.update(close),
+            self.rsi.update(close),
+            self.macd.update(close),
+            self.vwap.update(high, low, close, volume),
+            self.atr.update(high, low, close),
+            self.bb.update(close),
+            self.vol.update(volume),
+        )
@@ -0,0 +1,142 @@
+# bots/runtime/journal.py
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger("bots.runtime")
+
+SIGNAL_DB = os.getenv("SIGNAL_DB", "./signals.db")
+JOURNAL_BATCH = int(os.getenv("JOURNAL_BATCH", "500"))
+# How long the writer waits for more rows before committing a batch.
+JOURNAL_FLUSH_MS = int(os.getenv("JOURNAL_FLUSH_MS", "200"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  ts INTEGER NOT NULL,
+  bot TEXT NOT NULL,
+  symbol TEXT NOT NULL,
+  side TEXT NOT NULL,
+  price REAL,
+  detail TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_signals_bot_symbol_ts ON signals (bot, symbol, ts);
+CREATE INDEX IF NOT EXISTS ix_signals_ts ON signals (ts);
+"""
+
+_STOP = object()
+
+
+def connect(path: str = SIGNAL_DB) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    # WAL lets the API read while several bot processes append.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class SignalJournal:
+    """Append-only signal log with group commit.
+
+    record() only enqueues. A writer thread takes the first waiting row,
+    gathers whatever else arrives within JOURNAL_FLUSH_MS (up to
+    JOURNAL_BATCH rows) and writes them in one transaction, so a burst of
+    signals costs one fsync instead of one per row and never blocks the
+    event loop.
+    """
+
+    def __init__(self, path: str = SIGNAL_DB, batch: int = JOURNAL_BATCH,
+                 flush_ms: int = JOURNAL_FLUSH_MS):
+        self.path = path
+        self.batch = batch
+        self.flush_s = flush_ms / 1000
+        self.written = 0
+        self.commits = 0
+        self._q: queue.SimpleQueue = queue.SimpleQueue()
+        self._done = threading.Condition()
+        self._queued = 0
+        self._handled = 0
+        self._thread: threading.Thread | None = None
+
+    def record(self, bot: str, symbol: str, side: str, price: float | None = None,
+               ts: int | None = None, detail: dict | None = None):
+        """ts is epoch milliseconds (the candle's), defaulting to now."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="signal-journal", daemon=True)
+            self._thread.start()
+        with self._done:
+            self._queued += 1
+        self._q.put((
+            int(time.time() * 1000) if ts is None else int(ts), bot, symbol, side,
+            None if price is None else float(price),
+            json.dumps(detail, separators=(",", ":")) if detail else None,
+        ))
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until everything recorded so far is committed."""
+        with self._done:
+            target = self._queued
+            return self._done.wait_for(lambda: self._handled >= target, timeout)
+
+    def close(self):
+        if self._thread is not None:
+            self._q.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        conn = connect(self.path)
+        try:
+            while True:
+                item = self._q.get()
+                if item is _STOP:
+                    return
+                rows = [item]
+                deadline = time.monotonic() + self.flush_s
+                stop = False
+                while len(rows) < self.batch:
+                    try:
+                        item = self._q.get(timeout=max(deadline - time.monotonic(), 0))
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stop = True
+                        break
+                    rows.append(item)
+                self._write(conn, rows)
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def _write(self, conn: sqlite3.Connection, rows: list[tuple]):
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(
+                    "INSERT INTO signals (ts, bot, symbol, side, price, detail) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+            self.written += len(rows)
+            self.commits += 1
+        except sqlite3.Error:
+            logger.exception("signal journal dropped %d rows", len(rows))
+        with self._done:
+            self._handled += len(rows)
+            self._done.notify_all()
+
+
+_journal: SignalJournal | None = None
+
+
+def journal() -> SignalJournal:
+    """Process-wide journal, created on first use."""
+    global _journal
+    if _journal is None:
+        _journal = SignalJournal()
+    return _journal
@@ -0,0 +1,178 @@
+# bots/runtime/ohlcv.py
+import os
+import re
+import sys
+import threading
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+OHLCV_CAPACITY = int(os.getenv("OHLCV_CAPACITY", "2048"))
+OHLCV_SHM_PREFIX = os.getenv("OHLCV_SHM_PREFIX", "psb_ohlcv")
+
+COLUMNS = ("ts", "open", "high", "low", "close", "volume")
+# Header words: seqlock counter, candles ever appended, capacity, spare.
+_HEADER_WORDS = 4
+
+
+def block_name(symbol: str, interval: str, prefix: str = OHLCV_SHM_PREFIX) -> str:
+    return re.sub(r"[^A-Za-z0-9_]", "_", f"{prefix}_{symbol}_{interval}")
+
+
+_attach_lock = threading.Lock()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Open an existing block without registering it with the resource
+    tracker, which would otherwise unlink it when this reader exits (or,
+    in a child sharing the writer's tracker, drop the writer's entry)."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    with _attach_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _block_size(capacity: int) -> int:
+    # Each column holds 2 * capacity slots: every candle is written twice,
+    # at i and i + capacity, so the newest n rows are always one contiguous
+    # slice and readers never have to stitch a wrapped ring together.
+    return 8 * (_HEADER_WORDS + len(COLUMNS) * 2 * capacity)
+
+
+class Series:
+    """Ring buffer of candles for one (symbol, interval) in shared memory.
+
+    Only the ingestion process writes. view() hands out zero-copy NumPy
+    slices (the newest row may be mid-update); read() copies under a
+    seqlock and always returns a consistent snapshot.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int | None = None):
+        self.shm = shm
+        buf = shm.buf
+        self.header = np.ndarray((_HEADER_WORDS,), dtype=np.int64, buffer=buf)
+        if capacity is not None:
+            self.header[:] = (0, 0, capacity, 0)
+        self.capacity = int(self.header[2])
+        span = 2 * self.capacity
+        offset = 8 * _HEADER_WORDS
+        self.ts = np.ndarray((span,), dtype=np.int64, buffer=buf, offset=offset)
+        cols = {"ts": self.ts}
+        for i, name in enumerate(COLUMNS[1:], start=1):
+            cols[name] = np.ndarray((span,), dtype=np.float64, buffer=buf, offset=offset + 8 * span * i)
+        self.columns = cols
+        self.open, self.high, self.low = cols["open"], cols["high"], cols["low"]
+        self.close, self.volume = cols["close"], cols["volume"]
+
+    @property
+    def count(self) -> int:
+        return int(self.header[1])
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def last_ts(self) -> int | None:
+        n = self.count
+        return int(self.ts[(n - 1) % self.capacity]) if n else None
+
+    def _write(self, slot: int, ts: int, o: float, h: float, l: float, c: float, v: float,
+               grow: bool = False):
+        cap = self.capacity
+        self.header[0] += 1
+        for i in (slot, slot + cap):
+            self.ts[i] = ts
+            self.open[i] = o
+            self.high[i] = h
+            self.low[i] = l
+            self.close[i] = c
+            self.volume[i] = v
+        # The count moves the readers' window, so it is published inside
+        # the seqlock together with the rows it covers.
+        if grow:
+            self.header[1] += 1
+        self.header[0] += 1
+
+    def append(self, ts: int, o: float, h: float, l: float, c: float, v: float):
+        self._write(self.count % self.capacity, ts, o, h, l, c, v, grow=True)
+
+    def upsert(self, ts: int, o: float, h: float, l: float, c: float, v: float):
+        """Replace the newest candle if it has the same ts, else append."""
+        if self.last_ts() == ts:
+            self._write((self.count - 1) % self.capacity, ts, o, h, l, c, v)
+        else:
+            self.append(ts, o, h, l, c, v)
+
+    def _bounds(self, n: int | None) -> tuple[int, int]:
+        have = len(self)
+        n = have if n is None else min(n, have)
+        end = self.count % self.capacity + self.capacity
+        return end - n, end
+
+    def view(self, n: int | None = None) -> dict[str, np.ndarray]:
+        """Newest n candles, oldest first, as zero-copy column views."""
+        lo, hi = self._bounds(n)
+        return {name: col[lo:hi] for name, col in self.columns.items()}
+
+    def read(self, n: int | None = None, retries: int = 100) -> dict[str, np.ndarray]:
+        """Like view() but copied and consistent with respect to the writer."""
+        for _ in range(retries):
+            before = int(self.header[0])
+            if before & 1:
+                continue
+            lo, hi = self._bounds(n)
+            out = {name: col[lo:hi].copy() for name, col in self.columns.items()}
+            if int(self.header[0]) == before:
+                return out
+        raise RuntimeError("ohlcv writer kept the series busy")
+
+
+class OHLCVStore:
+    """Shared candle store: one writer process, any number of readers.
+
+    OHLCVStore(writer=True) creates blocks on first use; readers attach to
+    existing ones by name and raise KeyError for series not yet published.
+    """
+
+    def __init__(self, writer: bool = False, capacity: int = OHLCV_CAPACITY,
+                 prefix: str = OHLCV_SHM_PREFIX):
+        self.writer = writer
+        self.capacity = capacity
+        self.prefix = prefix
+        self._series: dict[tuple[str, str], Series] = {}
+
+    def series(self, symbol: str, interval: str) -> Series:
+        key = (symbol, interval)
+        s = self._series.get(key)
+        if s is not None:
+            return s
+        name = block_name(symbol, interval, self.prefix)
+        if self.writer:
+            try:
+                shm = shared_memory.SharedMemory(name=name, create=True, size=_block_size(self.capacity))
+                s = Series(shm, self.capacity)
+            except FileExistsError:
+                # Left over from a previous writer; keep its history.
+                shm = shared_memory.SharedMemory(name=name)
+                s = Series(shm)
+        else:
+            try:
+                shm = _attach(name)
+            except FileNotFoundError:
+                raise KeyError(key)
+            s = Series(shm)
+        self._series[key] = s
+        return s
+
+    def close(self, unlink: bool = False):
+        for s in self._series.values():
+            s.header = s.ts = s.open = s.high = s.low = s.close = s.volume = None
+            s.columns = {}
+            s.shm.close()
+            if unlink and self.writer:
+                s.shm.unlink()
+        self._series.clear()
@@ -0,0 +1,108 @@
+# bots/runtime/replay.py
+"""
+Local stand-in for an exchange stream: replays recorded frames over a
+WebSocket at a fixed rate. Used by the feed tests and for load testing.
+
+  python -m bots.runtime.replay frames.jsonl --rate 50000 --port 9100
+
+frames.jsonl holds one raw frame per line. Clients must send a SUBSCRIBE
+message first, as they would to the exchange.
+"""
+import argparse
+import asyncio
+import time
+
+import orjson
+from websockets.asyncio.server import serve
+
+
+class ReplayServer:
+    """Sends `frames` to each subscriber at `rate` frames per second.
+
+    The position is shared across connections, so a client that reconnects
+    picks up where the last connection stopped. `drop_after` closes every
+    connection after that many frames; `skip_on_drop` frames are then
+    discarded to simulate what a client misses while disconnected.
+    """
+
+    def __init__(self, frames: list, rate: float = 1000.0, host: str = "127.0.0.1",
+                 port: int = 0, drop_after: int | None = None, skip_on_drop: int = 0):
+        self.frames = frames
+        self.rate = rate
+        self.host = host
+        self.port = port
+        self.drop_after = drop_after
+        self.skip_on_drop = skip_on_drop
+        self.position = 0
+        self.connections = 0
+        self.subscriptions: list[list[str]] = []
+        self.done = asyncio.Event()
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await serve(self._handler, self.host, self.port, compression=None)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _handler(self, ws):
+        self.connections += 1
+        msg = orjson.loads(await ws.recv())
+        self.subscriptions.append(msg.get("params") or [])
+        await ws.send(orjson.dumps({"result": None, "id": msg.get("id")}))
+
+        sent = 0
+        began = time.perf_counter()
+        while self.position < len(self.frames):
+            if self.drop_after is not None and sent >= self.drop_after:
+                self.position += self.skip_on_drop
+                await ws.close()
+                return
+            # Send whatever is due in one burst, then yield for ~1ms; per-frame
+            # sleeps cannot keep up with tens of thousands of frames a second.
+            due = int((time.perf_counter() - began) * self.rate) + 1 - sent
+            if self.drop_after is not None:
+                due = min(due, self.drop_after - sent)
+            for _ in range(min(due, len(self.frames) - self.position)):
+                await ws.send(self.frames[self.position])
+                self.position += 1
+                sent += 1
+            await asyncio.sleep(0.001)
+        self.done.set()
+        await ws.wait_closed()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("frames", help="file with one raw frame per line")
+    ap.add_argument("--rate", type=float, default=1000.0)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=9100)
+    args = ap.parse_args()
+    with open(args.frames) as f:
+        frames = [line.rstrip("\n") for line in f if line.strip()]
+
+    async def run():
+        async with ReplayServer(frames, args.rate, args.host, args.port) as server:
+            print(f"replaying {len(frames)} frames at {args.rate:g}/s on {server.url}", flush=True)
+            await server.done.wait()
+            await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
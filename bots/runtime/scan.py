@@ -0,0 +1,196 @@
+# bots/runtime/scan.py
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+from .engine import Strategy, Tick
+from .ohlcv import OHLCV_SHM_PREFIX, OHLCVStore
+
+logger = logging.getLogger("bots.runtime")
+
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", "0")) or os.cpu_count() or 1
+# Candles handed to the predicate per symbol.
+SCAN_LOOKBACK = int(os.getenv("SCAN_LOOKBACK", "200"))
+# Partitions per worker; more than one evens out slow symbols.
+SCAN_CHUNKS_PER_WORKER = int(os.getenv("SCAN_CHUNKS_PER_WORKER", "2"))
+SCAN_LATENCY_WINDOW = int(os.getenv("SCAN_LATENCY_WINDOW", "1000"))
+
+# predicate(symbol, candles) -> result or None; candles is OHLCVStore.read().
+Predicate = Callable[[str, dict], Any]
+
+
+def partition(symbols: list[str], parts: int) -> list[list[str]]:
+    """Split into at most `parts` contiguous, near-equal chunks, order kept."""
+    parts = max(1, min(parts, len(symbols)))
+    size, extra = divmod(len(symbols), parts)
+    out, lo = [], 0
+    for i in range(parts):
+        hi = lo + size + (i < extra)
+        out.append(symbols[lo:hi])
+        lo = hi
+    return [c for c in out if c]
+
+
+_store: OHLCVStore | None = None
+
+
+def _init_worker(prefix: str):
+    global _store
+    _store = OHLCVStore(prefix=prefix)
+
+
+def _scan_chunk(predicate: Predicate, symbols: list[str], interval: str, lookback: int):
+    """Runs in a pool worker. Candles come straight from shared memory, so
+    only symbol names and results cross the process boundary."""
+    hits, missing, errors = [], 0, []
+    began = time.perf_counter()
+    for symbol in symbols:
+        try:
+            candles = _store.series(symbol, interval).read(lookback)
+        except KeyError:
+            missing += 1
+            continue
+        try:
+            result = predicate(symbol, candles)
+        except Exception:
+            errors.append((symbol, traceback.format_exc(limit=3)))
+            continue
+        if result is not None:
+            hits.append((symbol, result))
+    return hits, missing, errors, time.perf_counter() - began
+
+
+class ScanStats:
+    __slots__ = ("scans", "symbols", "hits", "missing", "errors", "last", "_samples")
+
+    def __init__(self, window: int = SCAN_LATENCY_WINDOW):
+        self.scans = 0
+        self.symbols = 0
+        self.hits = 0
+        self.missing = 0
+        self.errors = 0
+        self.last = 0.0
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.scans += 1
+        self.last = seconds
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def as_dict(self) -> dict:
+        return {
+            "scans": self.scans,
+            "symbols": self.symbols,
+            "hits": self.hits,
+            "missing": self.missing,
+            "errors": self.errors,
+            "last_ms": round(self.last * 1000, 3),
+            "p50_ms": round(self.percentile(0.50) * 1000, 3),
+            "p99_ms": round(self.percentile(0.99) * 1000, 3),
+            "max_ms": round(max(self._samples, default=0.0) * 1000, 3),
+        }
+
+
+class Scanner:
+    """Evaluates a predicate over a symbol universe on a process pool.
+
+    The universe is split into contiguous partitions and results are merged
+    in partition order, so hits always come back in universe order no
+    matter which worker finishes first. The predicate must be a module-level
+    function (it is pickled by reference).
+    """
+
+    def __init__(self, predicate: Predicate, symbols: list[str], interval: str = "1m",
+                 workers: int = SCAN_WORKERS, lookback: int = SCAN_LOOKBACK,
+                 prefix: str = OHLCV_SHM_PREFIX):
+        self.predicate = predicate
+        self.interval = interval
+        self.workers = workers
+        self.lookback = lookback
+        self.prefix = prefix
+        self.stats = ScanStats()
+        self._pool: ProcessPoolExecutor | None = None
+        self.set_symbols(symbols)
+
+    def set_symbols(self, symbols: list[str]):
+        self.symbols = list(dict.fromkeys(symbols))
+        self.chunks = partition(self.symbols, self.workers * SCAN_CHUNKS_PER_WORKER)
+        self.stats.symbols = len(self.symbols)
+
+    def start(self):
+        if self._pool is None:
+            # spawn, not fork: the parent runs an event loop and threads.
+            self._pool = ProcessPoolExecutor(
+                self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.prefix,),
+            )
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    async def scan(self) -> list[tuple[str, Any]]:
+        self.start()
+        loop = asyncio.get_running_loop()
+        began = time.perf_counter()
+        parts = await asyncio.gather(*(
+            loop.run_in_executor(self._pool, _scan_chunk, self.predicate, chunk,
+                                 self.interval, self.lookback)
+            for chunk in self.chunks
+        ))
+        hits = []
+        for chunk_hits, missing, errors, _ in parts:
+            hits.extend(chunk_hits)
+            self.stats.missing += missing
+            self.stats.errors += len(errors)
+            for symbol, tb in errors:
+                logger.error("scan predicate failed for %s\n%s", symbol, tb)
+        self.stats.hits += len(hits)
+        self.stats.record(time.perf_counter() - began)
+        return hits
+
+
+class ScanStrategy(Strategy):
+    """Strategy that scans a symbol universe every tick.
+
+    Subclasses set `symbols`, `candle_interval` and `predicate` (a
+    module-level function wrapped in staticmethod) and implement on_hits.
+    """
+
+    symbols: list[str] = []
+    candle_interval = "1m"
+    predicate: Predicate
+    workers = SCAN_WORKERS
+    # Log scan latency percentiles every this many ticks; 0 disables.
+    report_every = 60
+
+    async def on_start(self):
+        self.scanner = Scanner(type(self).predicate, self.symbols, self.candle_interval, self.workers)
+        await asyncio.get_running_loop().run_in_executor(None, self.scanner.start)
+
+    async def on_tick(self, tick: Tick):
+        hits = await self.scanner.scan()
+        await self.on_hits(tick, hits)
+        if self.report_every and self.scanner.stats.scans % self.report_every == 0:
+            logger.info("%s scan %s", self.name, self.scanner.stats.as_dict())
+
+    async def on_hits(self, tick: Tick, hits: list[tuple[str, Any]]):
+        raise NotImplementedError
+
+    async def on_stop(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.scanner.close)
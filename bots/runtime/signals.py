@@ -0,0 +1,198 @@
+# bots/runtime/signals.py
+import asyncio
+import os
+
+import numpy as np
+
+from . import telegram
+from .journal import journal
+from .dedup import Deduper, Rule
+from .engine import Strategy, Tick
+from .ohlcv import OHLCVStore
+
+BOT_SYMBOLS = [s.strip().upper() for s in os.getenv("BOT_SYMBOLS", "BTCUSDT,ETHUSDT").split(",") if s.strip()]
+BOT_CANDLE_INTERVAL = os.getenv("BOT_CANDLE_INTERVAL", "1m")
+BOT_LOOKBACK = int(os.getenv("BOT_LOOKBACK", "300"))
+# Minimum seconds between two alerts of the same side for one symbol.
+SIGNAL_COOLDOWN = float(os.getenv("SIGNAL_COOLDOWN", "300"))
+
+
+def crossings(cond: np.ndarray) -> np.ndarray:
+    """True where `cond` switches from False to True."""
+    out = cond.copy()
+    out[1:] &= ~cond[:-1]
+    return out
+
+
+def _coerce(default, value):
+    """`value` as the default's type; ValueError rather than truncating
+    30.5 into an int param."""
+    out = type(default)(value)
+    if isinstance(default, int) and out != float(value):
+        raise ValueError(f"expected an integer, got {value!r}")
+    return out
+
+
+class SignalStrategy(Strategy):
+    """Strategy that turns candles into +1 (long) / -1 (short) / 0 signals.
+
+    The same methods drive the live bot and the backtester:
+
+    - stateless strategies implement signals(candles), a vectorized pass
+      over whole columns;
+    - stateful ones set `stateful = True` and implement new_state() and
+      step(state, ts, o, h, l, c, v), called once per closed candle.
+
+    `params` holds the tunable defaults; SignalStrategy(**overrides) is how
+    the backtester applies a parameter grid.
+    """
+
+    params: dict = {}
+    stateful = False
+    symbols = BOT_SYMBOLS
+    candle_interval = BOT_CANDLE_INTERVAL
+    lookback = BOT_LOOKBACK
+    cooldown = SIGNAL_COOLDOWN
+    emitted = 0
+
+    def __init__(self, **params):
+        unknown = set(params) - set(type(self).params)
+        if unknown:
+            raise ValueError(f"unknown params for {self.name}: {sorted(unknown)}")
+        self.params = {**type(self).params, **params}
+
+    def signals(self, candles: dict[str, np.ndarray]) -> np.ndarray:
+        raise NotImplementedError
+
+    def new_state(self):
+        raise NotImplementedError
+
+    def step(self, state, ts: int, o: float, h: float, l: float, c: float, v: float) -> int:
+        raise NotImplementedError
+
+    async def on_start(self):
+        self.store = OHLCVStore()
+        self.profiles = [Profile(None, self.symbols, self)]
+        self.dedup = Deduper(default=Rule(cooldown=self.cooldown), capacity=4 * len(self.symbols))
+
+    def apply_config(self, snapshot):
+        """Run one profile per configured user, each with its own params,
+        symbols and Telegram chat. Without any user config the bot runs the
+        env defaults as before. Invalid params reject the whole snapshot."""
+        if snapshot is None or not snapshot.users:
+            profiles = [Profile(None, self.symbols, self)]
+        else:
+            defaults = type(self).params
+            old = {p.user: p for p in self.profiles}
+            profiles = []
+            for uid, cfg in snapshot.users.items():
+                # Coerce to the default's type; a bad value raises ValueError.
+                params = {k: _coerce(d, cfg[k]) for k, d in defaults.items() if k in cfg}
+                prev = old.get(uid)
+                if prev is not None and prev.strategy.params == {**defaults, **params}:
+                    # Same params: keep warmed-up state and what was seen.
+                    strategy, seen, states = prev.strategy, prev.seen, prev.states
+                else:
+                    strategy, seen, states = type(self)(**params), {}, {}
+                profile = Profile(uid, list(cfg.get("symbols") or self.symbols), strategy,
+                                  cfg.get("telegram_chat_id"))
+                profile.seen, profile.states = seen, states
+                profiles.append(profile)
+        self.profiles = profiles
+        self.config = snapshot
+
+    async def on_tick(self, tick: Tick):
+        print(f"[{self.name}] tick {tick.n + 1}", flush=True)
+        if tick.n and tick.n % 1000 == 0:
+            self.dedup.evict()
+        # Users share symbols; read each series once per tick.
+        reads: dict[str, dict | None] = {}
+        for profile in self.profiles:
+            for symbol in profile.symbols:
+                if symbol not in reads:
+                    reads[symbol] = self._closed(symbol)
+                closed = reads[symbol]
+                if closed is None:
+                    continue
+                ts = closed["ts"]
+                if profile.seen.get(symbol) == ts[-1]:
+                    continue
+                sig = self._live_signal(profile, symbol, closed)
+                profile.seen[symbol] = int(ts[-1])
+                self._emit(profile, symbol, sig, closed)
+
+    def _closed(self, symbol: str) -> dict[str, np.ndarray] | None:
+        try:
+            candles = self.store.series(symbol, self.candle_interval).read(self.lookback + 1)
+        except KeyError:
+            return None
+        # The newest candle is still forming; only act on closed ones.
+        closed = {k: v[:-1] for k, v in candles.items()}
+        return closed if len(closed["ts"]) else None
+
+    def _emit(self, profile: "Profile", symbol: str, sig: int, closed: dict[str, np.ndarray]):
+        key = self.name if profile.user is None else f"{self.name}:{profile.user}"
+        # Both sides are observed every candle so a side re-arms once it
+        # stops firing; repeats inside the cooldown are dropped.
+        long_ok = self.dedup.allow(key, symbol, "LONG", sig > 0)
+        short_ok = self.dedup.allow(key, symbol, "SHORT", sig < 0)
+        if not (long_ok or short_ok):
+            return
+        side = "LONG" if long_ok else "SHORT"
+        self.emitted += 1
+        price = float(closed["close"][-1])
+        text = f"[{self.name}] {symbol} {side} @ {price:g}"
+        print(text if profile.user is None else f"{text} (user {profile.user})", flush=True)
+        detail = None if profile.user is None else {"user": profile.user}
+        journal().record(self.name, symbol, side, price, ts=int(closed["ts"][-1]), detail=detail)
+        self.deliver(text, profile.chat_ids())
+
+    def deliver(self, text: str, chat_ids=None):
+        """Queue a signal for the given Telegram chats (default: every
+        configured one)."""
+        if telegram.TELEGRAM_BOT_TOKEN:
+            for chat_id in telegram.TELEGRAM_CHAT_IDS if chat_ids is None else chat_ids:
+                telegram.outbox().send(chat_id, text)
+
+    async def on_stop(self):
+        # The Telegram outbox is process-wide and may still serve other
+        # strategies; run() flushes it once the whole engine is done.
+        await asyncio.to_thread(journal().flush)
+
+    def _live_signal(self, profile: "Profile", symbol: str, closed: dict[str, np.ndarray]) -> int:
+        strategy = profile.strategy
+        if not strategy.stateful:
+            return int(strategy.signals(closed)[-1])
+        state = profile.states.get(symbol)
+        last = profile.seen.get(symbol)
+        if state is None:
+            # Warm up on the history the store holds; only the newest counts.
+            state = profile.states[symbol] = strategy.new_state()
+            last = None
+        sig = 0
+        cols = [closed[k].tolist() for k in ("ts", "open", "high", "low", "close", "volume")]
+        for row in zip(*cols):
+            if last is None or row[0] > last:
+                sig = strategy.step(state, *row)
+        return sig
+
+
+class Profile:
+    """What one user runs inside a bot: the strategy instance carrying
+    their params, their symbols and chat, and per-symbol progress."""
+
+    __slots__ = ("user", "symbols", "strategy", "chat_id", "seen", "states")
+
+    def __init__(self, user: str | None, symbols, strategy: SignalStrategy, chat_id: str | None = None):
+        self.user = user
+        self.symbols = symbols
+        self.strategy = strategy
+        self.chat_id = chat_id
+        self.seen: dict[str, int] = {}
+        self.states: dict[str, object] = {}
+
+    def chat_ids(self) -> list[str] | None:
+        """None means the env-configured chats (the default profile only)."""
+        if self.chat_id:
+            return [self.chat_id]
+        return None if self.user is None else []
@@ -0,0 +1,251 @@
+# bots/runtime/telegram.py
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+
+import httpx
+
+logger = logging.getLogger("bots.runtime")
+
+TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+TELEGRAM_CHAT_IDS = [c.strip() for c in os.getenv("TELEGRAM_CHAT_IDS", "").split(",") if c.strip()]
+# Telegram's documented limits: ~30 messages/s overall, ~1/s per chat and
+# 20/min per group chat.
+TG_GLOBAL_RATE = float(os.getenv("TG_GLOBAL_RATE", "30"))
+TG_CHAT_RATE = float(os.getenv("TG_CHAT_RATE", "1"))
+TG_GROUP_RATE = float(os.getenv("TG_GROUP_RATE", str(20 / 60)))
+TG_MAX_RETRIES = int(os.getenv("TG_MAX_RETRIES", "5"))
+TG_MAX_IN_FLIGHT = int(os.getenv("TG_MAX_IN_FLIGHT", "8"))
+TG_MAX_MESSAGE = 4096
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one token is available (0 if it is now)."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+
+    def take(self, now: float):
+        self._refill(now)
+        self.tokens -= 1.0
+
+    def restart(self, now: float):
+        """Refill from `now` on; time before it does not count."""
+        self.updated = now
+
+
+class _Chat:
+    __slots__ = ("bucket", "pending", "blocked_until", "busy")
+
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self.pending: list[tuple[int, int, str]] = []  # heap of (priority, seq, text)
+        self.blocked_until = 0.0
+        self.busy = False
+
+
+class TelegramOutbox:
+    """Outbound sendMessage queue that stays inside Telegram's rate limits.
+
+    send() only enqueues. The run() task picks the most urgent chat whose
+    bucket has a token (and the global bucket too), and folds everything
+    pending for that chat into one message, most urgent first, up to
+    Telegram's 4096-character limit. A 429 puts the text back and blocks the
+    chat for `retry_after`; network and 5xx errors back off exponentially.
+    Each chat has at most one request in flight, so its messages stay ordered.
+    """
+
+    def __init__(self, token: str = TELEGRAM_BOT_TOKEN, api_url: str = TELEGRAM_API_URL,
+                 global_rate: float = TG_GLOBAL_RATE, chat_rate: float = TG_CHAT_RATE,
+                 group_rate: float = TG_GROUP_RATE, max_retries: int = TG_MAX_RETRIES,
+                 client: httpx.AsyncClient | None = None):
+        self.url = f"{api_url}/bot{token}/sendMessage"
+        self.global_bucket = TokenBucket(global_rate, burst=global_rate)
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self.client = client
+        self.chats: dict[str, _Chat] = {}
+        self.stats = {"queued": 0, "sent": 0, "messages": 0, "coalesced": 0,
+                      "rate_limited": 0, "retries": 0, "dropped": 0}
+        self._seq = itertools.count()
+        self._retries: dict[tuple[str, int], int] = {}
+        self._wake = asyncio.Event()
+        self._running = True
+        self._tasks: set[asyncio.Task] = set()
+
+    def send(self, chat_id: str | int, text: str, priority: int = PRIORITY_NORMAL):
+        chat_id = str(chat_id)
+        chat = self.chats.get(chat_id)
+        if chat is None:
+            # Negative ids are groups and channels, which get the tighter limit.
+            rate = self.group_rate if chat_id.startswith("-") else self.chat_rate
+            chat = self.chats[chat_id] = _Chat(TokenBucket(rate))
+        heapq.heappush(chat.pending, (priority, next(self._seq), text[:TG_MAX_MESSAGE]))
+        self.stats["queued"] += 1
+        self._wake.set()
+
+    def pending(self) -> int:
+        return sum(len(c.pending) for c in self.chats.values())
+
+    async def stop(self, timeout: float = 10.0):
+        """Deliver what is queued (for up to `timeout` seconds), then stop."""
+        deadline = time.monotonic() + timeout
+        while (self.pending() or self._tasks) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        self._running = False
+        self._wake.set()
+
+    async def run(self):
+        own_client = self.client is None
+        if own_client:
+            self.client = httpx.AsyncClient(timeout=10.0)
+        try:
+            while self._running:
+                delay = self._dispatch(time.monotonic())
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in list(self._tasks):
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            if own_client:
+                await self.client.aclose()
+                self.client = None
+
+    def _dispatch(self, now: float) -> float:
+        """Start every send the buckets allow; return how long to sleep."""
+        while len(self._tasks) < TG_MAX_IN_FLIGHT:
+            wait = self.global_bucket.wait_time(now)
+            if wait:
+                return wait
+            best, best_key, soonest = None, None, 1.0
+            for chat_id, chat in self.chats.items():
+                if not chat.pending or chat.busy:
+                    continue
+                ready_in = max(chat.blocked_until - now, chat.bucket.wait_time(now))
+                if ready_in > 0:
+                    soonest = min(soonest, ready_in)
+                    continue
+                key = chat.pending[0][:2]
+                if best_key is None or key < best_key:
+                    best, best_key = chat_id, key
+            if best is None:
+                return soonest
+            chat = self.chats[best]
+            self.global_bucket.take(now)
+            chat.bucket.take(now)
+            chat.busy = True
+            batch = self._take_batch(chat)
+            task = asyncio.ensure_future(self._deliver(best, chat, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return 1.0
+
+    def _take_batch(self, chat: _Chat) -> list[tuple[int, int, str]]:
+        batch = [heapq.heappop(chat.pending)]
+        size = len(batch[0][2])
+        while chat.pending and size + 2 + len(chat.pending[0][2]) <= TG_MAX_MESSAGE:
+            item = heapq.heappop(chat.pending)
+            size += 2 + len(item[2])
+            batch.append(item)
+        return batch
+
+    async def _deliver(self, chat_id: str, chat: _Chat, batch: list[tuple[int, int, str]]):
+        text = "\n\n".join(t for _, _, t in batch)
+        retry_in = None
+        try:
+            r = await self.client.post(self.url, json={"chat_id": chat_id, "text": text})
+            if r.status_code == 429:
+                self.stats["rate_limited"] += 1
+                retry_in = self._retry_after(r)
+            elif r.status_code >= 500:
+                retry_in = self._backoff(chat_id, batch)
+            elif r.status_code >= 400:
+                self.stats["dropped"] += len(batch)
+                logger.error("telegram rejected message to %s: %s %s", chat_id, r.status_code, r.text[:200])
+            else:
+                self._retries.pop((chat_id, batch[0][1]), None)
+                self.stats["sent"] += len(batch)
+                self.stats["messages"] += 1
+                self.stats["coalesced"] += len(batch) - 1
+        except httpx.HTTPError as e:
+            logger.warning("telegram send to %s failed: %r", chat_id, e)
+            retry_in = self._backoff(chat_id, batch)
+        finally:
+            if retry_in is not None:
+                self.stats["retries"] += 1
+                chat.blocked_until = time.monotonic() + retry_in
+                for item in batch:
+                    heapq.heappush(chat.pending, item)
+            # Space a chat's requests from when the last one finished, not when
+            # it was sent, so network jitter cannot squeeze two into Telegram's
+            # per-chat window.
+            chat.bucket.restart(time.monotonic())
+            chat.busy = False
+            self._wake.set()
+
+    @staticmethod
+    def _retry_after(r: httpx.Response) -> float:
+        """Seconds Telegram asked us to wait; proxies may send a non-JSON 429."""
+        try:
+            return float(r.json()["parameters"]["retry_after"])
+        except (ValueError, TypeError, KeyError):
+            pass
+        try:
+            return float(r.headers.get("Retry-After", 1))
+        except ValueError:
+            return 1.0
+
+    def _backoff(self, chat_id: str, batch: list[tuple[int, int, str]]) -> float | None:
+        key = (chat_id, batch[0][1])
+        attempt = self._retries.get(key, 0) + 1
+        if attempt > self.max_retries:
+            self._retries.pop(key, None)
+            self.stats["dropped"] += len(batch)
+            logger.error("telegram gave up on %d alert(s) to %s", len(batch), chat_id)
+            return None
+        self._retries[key] = attempt
+        return min(30.0, 0.5 * 2 ** (attempt - 1))
+
+
+_outbox: TelegramOutbox | None = None
+
+
+def outbox() -> TelegramOutbox:
+    """Process-wide outbox, started on the running loop on first use."""
+    global _outbox
+    if _outbox is None:
+        _outbox = TelegramOutbox()
+        asyncio.ensure_future(_outbox.run())
+    return _outbox
+
+
+async def shutdown():
+    """Flush and stop the process-wide outbox, if it was ever started."""
+    if _outbox is not None:
+        await _outbox.stop()
@@ -0,0 +1,129 @@
+# bots/runtime/telegram_standin.py
+"""
+Local stand-in for the Telegram Bot API's sendMessage, for tests and load
+runs. It enforces per-chat and global rate limits the way Telegram does,
+answering 429 with parameters.retry_after, and records what it delivered.
+
+  python -m bots.runtime.telegram_standin --port 8181 --chat-rate 1 --global-rate 30
+
+Point the bots at it with TELEGRAM_API_URL=http://127.0.0.1:8181.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from .telegram import TokenBucket
+
+
+class TelegramStandIn:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, chat_rate: float = 1.0,
+                 global_rate: float = 30.0, retry_after: float = 1.0):
+        self.host = host
+        self.port = port
+        self.chat_rate = chat_rate
+        self.global_bucket = TokenBucket(global_rate, burst=global_rate)
+        self.retry_after = retry_after
+        self.buckets: dict[str, TokenBucket] = {}
+        self.delivered: dict[str, list[tuple[float, str]]] = {}
+        self.rejected = 0
+        # Requests for a chat that arrived before its retry_after ran out.
+        self.early_retries = 0
+        self._blocked: dict[str, float] = {}
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def handle(self, method: str, body: dict) -> tuple[int, dict]:
+        if method != "sendMessage":
+            return 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+        chat_id = str(body.get("chat_id", ""))
+        text = body.get("text") or ""
+        if not chat_id or not text:
+            return 400, {"ok": False, "error_code": 400, "description": "Bad Request: message text is empty"}
+        if len(text) > 4096:
+            return 400, {"ok": False, "error_code": 400, "description": "Bad Request: message is too long"}
+        now = time.monotonic()
+        if now < self._blocked.get(chat_id, 0.0):
+            self.early_retries += 1
+        bucket = self.buckets.setdefault(chat_id, TokenBucket(self.chat_rate))
+        if bucket.wait_time(now) or self.global_bucket.wait_time(now):
+            self.rejected += 1
+            self._blocked[chat_id] = now + self.retry_after
+            return 429, {
+                "ok": False, "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.retry_after:g}",
+                "parameters": {"retry_after": self.retry_after},
+            }
+        bucket.take(now)
+        self.global_bucket.take(now)
+        self.delivered.setdefault(chat_id, []).append((now, text))
+        msg_id = sum(len(v) for v in self.delivered.values())
+        return 200, {"ok": True, "result": {"message_id": msg_id, "chat": {"id": chat_id}, "text": text}}
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                _, path, _ = request_line.decode().split(" ", 2)
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode().partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value)
+                raw = await reader.readexactly(length) if length else b"{}"
+                status, payload = self.handle(path.rsplit("/", 1)[-1], json.loads(raw or b"{}"))
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8181)
+    ap.add_argument("--chat-rate", type=float, default=1.0)
+    ap.add_argument("--global-rate", type=float, default=30.0)
+    ap.add_argument("--retry-after", type=float, default=1.0)
+    args = ap.parse_args()
+
+    async def run():
+        async with TelegramStandIn(args.host, args.port, args.chat_rate, args.global_rate,
+                                   args.retry_after) as server:
+            print(f"telegram stand-in on {server.url}", flush=True)
+            await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
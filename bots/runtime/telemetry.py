@@ -0,0 +1,116 @@
+# bots/runtime/telemetry.py
+import json
+import os
+import sys
+import time
+
+# Seconds between reports; each report covers just that interval.
+TELEMETRY_INTERVAL = float(os.getenv("TELEMETRY_INTERVAL", "10"))
+# Lines starting with this on stdout are telemetry, not log output.
+TELEMETRY_PREFIX = "@telemetry "
+
+_SUB_BITS = 7
+_SUB = 1 << _SUB_BITS      # 128 exact values below 128 us
+_HALF = _SUB >> 1          # then 64 buckets per power of two (~1.5% wide)
+_MAX_SHIFT = 30            # values are capped at ~2^37 us (38 h)
+_BUCKETS = _SUB + _MAX_SHIFT * _HALF
+
+
+class Histogram:
+    """Log-linear latency histogram in the style of HdrHistogram.
+
+    Values are microseconds. Below 128 us every value has its own bucket;
+    above that each power of two is split into 64 buckets, so any recorded
+    value is known to within ~1.5% while the whole range (1 us to hours)
+    fits in a fixed 2048-slot table. record() is a bit_length and an add.
+    """
+
+    __slots__ = ("counts", "count", "max")
+
+    def __init__(self):
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.max = 0
+
+    @staticmethod
+    def index(us: int) -> int:
+        if us < _SUB:
+            return max(us, 0)
+        shift = min(us.bit_length() - _SUB_BITS, _MAX_SHIFT)
+        return min(_SUB + (shift - 1) * _HALF + (us >> shift) - _HALF, _BUCKETS - 1)
+
+    @staticmethod
+    def value(index: int) -> int:
+        """Middle of a bucket's range, in microseconds."""
+        if index < _SUB:
+            return index
+        shift, sub = divmod(index - _SUB, _HALF)
+        shift += 1
+        return ((_HALF + sub) << shift) + (1 << (shift - 1))
+
+    def record(self, seconds: float):
+        us = int(seconds * 1e6)
+        self.counts[self.index(us)] += 1
+        self.count += 1
+        if us > self.max:
+            self.max = us
+
+    def percentile(self, q: float) -> int:
+        """Value (us) at or below which `q` percent of samples fall."""
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * q // 100))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self.value(i), self.max)
+        return self.max
+
+    def sparse(self) -> list[list[int]]:
+        """[[bucket value us, count], ...] for the non-empty buckets."""
+        return [[self.value(i), n] for i, n in enumerate(self.counts) if n]
+
+    def reset(self):
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.max = 0
+
+
+class Reporter:
+    """Turns running totals into per-interval reports.
+
+    Counters go out as deltas since the previous report and the tick
+    histogram is reset after each one, so the receiver can sum and merge
+    any window of reports.
+    """
+
+    COUNTERS = ("ticks", "errors", "skipped", "overruns", "signals")
+
+    def __init__(self):
+        self._last: dict[str, tuple] = {}
+
+    def report(self, strategies: dict, stats: dict, interval: float) -> dict:
+        out = {}
+        for key, s in stats.items():
+            totals = (s.ticks, s.errors, s.skipped, s.overruns, getattr(strategies.get(key), "emitted", 0))
+            last = self._last.get(key, (0,) * len(totals))
+            self._last[key] = totals
+            entry = {name: now - before for name, now, before in zip(self.COUNTERS, totals, last)}
+            entry.update(
+                lag_ms=round(s.lag * 1000, 3),
+                tick_max_us=s.tick_us.max,
+                tick_us=s.tick_us.sparse(),
+            )
+            s.tick_us.reset()
+            out[key] = entry
+        for key in set(self._last) - set(stats):
+            del self._last[key]
+        return {"ts": time.time(), "interval": interval, "strategies": out}
+
+
+def emit(payload: dict, stream=None):
+    """Write one report line for the supervisor to pick off stdout."""
+    stream = stream or sys.stdout
+    stream.write(TELEMETRY_PREFIX + json.dumps(payload, separators=(",", ":")) + "\n")
+    stream.flush()
@@ -0,0 +1,54 @@
+# test_backtest.py
+import numpy as np
+
+from bots.runtime.backtest import backtest, load_candles, run_signals, score
+from bots.scalper.main import Scalper
+from bots.trend_rider.main import TrendRider
+
+
+def _write_csv(path, n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.3, n))
+    rows = np.column_stack([
+        np.arange(n) * 60_000, close, close + 0.2, close - 0.2, close,
+        rng.gamma(2.0, 50.0, n) * np.where(rng.random(n) < 0.02, 6.0, 1.0),
+    ])
+    np.savetxt(path, rows, delimiter=",", header="ts,open,high,low,close,volume",
+               comments="", fmt=["%d"] + ["%.6f"] * 5)
+
+
+def test_score_counts_hits_in_signal_direction():
+    close = np.array([10.0, 11.0, 10.0, 9.0, 12.0])
+    signals = np.array([1, -1, 1, 0, -1], dtype=np.int8)
+    s = score(signals, close, horizon=1)
+    # +1 @10->11 hit, -1 @11->10 hit, +1 @10->9 miss, last one unscored.
+    assert (s["signals"], s["longs"], s["shorts"], s["scored"], s["hits"]) == (4, 2, 2, 3, 2)
+
+
+def test_grid_over_pool_matches_single_runs(tmp_path):
+    for i, sym in enumerate(["BTCUSDT", "ETHUSDT", "SOLUSDT"]):
+        _write_csv(tmp_path / f"{sym}.csv", 3000, seed=i)
+    files = sorted(tmp_path.glob("*.csv"))
+    report = backtest("trend_rider", files, {"fast": [5, 9], "slow": [21]}, horizon=10, workers=2)
+
+    assert report["mode"] == "vectorized" and report["candles"] == 9000
+    assert [c["params"] for c in report["combos"]] == [{"fast": 5, "slow": 21}, {"fast": 9, "slow": 21}]
+    for combo in report["combos"]:
+        assert list(combo["symbols"]) == ["BTCUSDT", "ETHUSDT", "SOLUSDT"]
+        expected = 0
+        for f in files:
+            candles = load_candles(f)
+            sig = run_signals(TrendRider(**combo["params"]), candles)
+            expected += score(sig, candles["close"], 10)["signals"]
+        assert combo["total"]["signals"] == expected > 0
+        assert 0.0 <= combo["total"]["hit_rate"] <= 1.0
+
+
+def test_stateful_strategy_runs_on_the_event_loop(tmp_path):
+    _write_csv(tmp_path / "BTCUSDT.csv", 2000, seed=3)
+    candles = load_candles(tmp_path / "BTCUSDT.csv")
+    sig = run_signals(Scalper(cooldown=5), candles)
+    fired = np.flatnonzero(sig)
+    assert len(fired) > 0
+    # Cooldown: no two signals closer than 6 candles apart.
+    assert np.all(np.diff(fired) > 5)
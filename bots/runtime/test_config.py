@@ -0,0 +1,103 @@
+# test_config.py
+import asyncio
+import io
+import json
+
+import pytest
+
+from bots.reversal.main import Reversal
+from bots.runtime import Engine, Strategy, config
+from bots.runtime.signals import Profile, SignalStrategy
+
+
+class Follower(Strategy):
+    name = "test_follower"
+    interval = 0.02
+
+    def __init__(self):
+        self.ticks = []
+
+    def apply_config(self, snapshot):
+        if snapshot.users.get("bad"):
+            raise ValueError("rejected")
+        self.config = snapshot
+
+    async def on_tick(self, tick):
+        # The snapshot must not change under a running tick.
+        before = self.config
+        await asyncio.sleep(0)
+        assert self.config is before
+        self.ticks.append(self.config.version if self.config else None)
+
+
+def _push(version, users):
+    line = json.dumps({"type": "config", "bot": "test_follower", "version": version, "users": users})
+    config.read_stream(io.StringIO(line + "\n"))
+
+
+def test_snapshot_is_frozen_and_stale_versions_are_ignored():
+    config._latest.pop("test_follower", None)
+    _push(2, {"7": {"symbols": ["BTCUSDT"], "fast": 5}})
+    _push(1, {"8": {}})
+    snap = config.latest("test_follower")
+    assert snap.version == 2 and list(snap.users) == ["7"]
+    assert snap.users["7"]["symbols"] == ("BTCUSDT",)
+    with pytest.raises(TypeError):
+        snap.users["7"]["fast"] = 6
+    assert config.read_stream(io.StringIO("not json\n{\"type\": \"other\"}\n")) == 0
+
+
+def test_engine_applies_new_snapshots_between_ticks():
+    config._latest.pop("test_follower", None)
+    engine = Engine()
+    s = engine.add(Follower())
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.05, _push, 1, {"1": {}})
+        loop.call_later(0.11, _push, 2, {"bad": {"x": 1}})
+        loop.call_later(0.2, engine.stop)
+        await engine.run()
+
+    asyncio.run(main())
+    assert s.ticks[0] is None and s.ticks[-1] == 1
+    assert engine.stats["test_follower"].errors == 1
+
+
+class Cross(SignalStrategy):
+    name = "test_cross"
+    params = {"fast": 9, "slow": 21}
+
+
+def test_signal_strategy_runs_one_profile_per_user():
+    s = Cross()
+    s.profiles = [Profile(None, s.symbols, s)]
+    snap = config.ConfigSnapshot("test_cross", 3, {
+        1: {"symbols": ["SOLUSDT"], "fast": 5, "telegram_chat_id": "42"},
+        2: {"symbols": ["BTCUSDT"]},
+    })
+    s.apply_config(snap)
+    by_user = {p.user: p for p in s.profiles}
+    assert by_user["1"].strategy.params == {"fast": 5, "slow": 21}
+    assert by_user["1"].chat_ids() == ["42"] and by_user["2"].chat_ids() == []
+    by_user["2"].seen["BTCUSDT"] = 123
+
+    # Unchanged params keep their progress; bad params reject the snapshot.
+    s.apply_config(config.ConfigSnapshot("test_cross", 4, {2: {"symbols": ["BTCUSDT", "ETHUSDT"]}}))
+    assert [p.user for p in s.profiles] == ["2"] and s.profiles[0].seen == {"BTCUSDT": 123}
+    with pytest.raises(ValueError):
+        s.apply_config(config.ConfigSnapshot("test_cross", 5, {2: {"fast": "x"}}))
+    with pytest.raises(ValueError):
+        s.apply_config(config.ConfigSnapshot("test_cross", 5, {2: {"fast": 5.5}}))
+    assert s.config.version == 4
+
+    s.apply_config(config.ConfigSnapshot("test_cross", 6, {}))
+    assert [p.user for p in s.profiles] == [None] and s.profiles[0].chat_ids() is None
+
+
+def test_fractional_thresholds_are_not_truncated():
+    s = Reversal()
+    s.profiles = [Profile(None, s.symbols, s)]
+    s.apply_config(config.ConfigSnapshot("reversal", 1, {1: {"oversold": 30.5, "overbought": "69.5"}}))
+    params = s.profiles[0].strategy.params
+    assert params["oversold"] == 30.5 and params["overbought"] == 69.5
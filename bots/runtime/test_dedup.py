@@ -0,0 +1,34 @@
+# test_dedup.py
+from bots.runtime.dedup import Deduper, Rule
+
+
+def test_boolean_signal_fires_once_per_episode_and_respects_cooldown():
+    d = Deduper({"LONG": Rule(cooldown=60)})
+    fired = [d.allow("scalper", "BTCUSDT", "LONG", active, now=t)
+             for t, active in [(0, True), (1, True), (2, False), (3, True), (70, False), (71, True)]]
+    # Re-armed at t=2 but still cooling down at t=3; free again at t=71.
+    assert fired == [True, False, False, False, False, True]
+    assert d.allow("scalper", "ETHUSDT", "LONG", True, now=3)
+
+
+def test_hysteresis_band_blocks_refires_on_noise():
+    d = Deduper({"oversold": Rule(enter=30, exit=35)})
+    rsi = [29, 31, 29.5, 33, 28, 36, 29]
+    fired = [d.allow("reversal", "SOLUSDT", "oversold", v, now=i) for i, v in enumerate(rsi)]
+    assert fired == [True, False, False, False, False, False, True]
+
+
+def test_eviction_and_growth_keep_live_state():
+    d = Deduper({"LONG": Rule(cooldown=1000)}, capacity=16, ttl=100)
+    for i in range(5000):
+        assert d.allow("scan", f"S{i}", "LONG", now=i % 50)
+    assert len(d) == 5000 and d.mask + 1 >= 5000 / 0.7
+    # Every key is remembered across rehashes: all still cooling down.
+    assert not any(d.allow("scan", f"S{i}", "LONG", now=60) for i in range(5000))
+
+    for i in range(100):
+        d.allow("scan", f"S{i}", "LONG", False, now=500)
+    assert d.evict(now=500) == 4900 and len(d) == 100
+    assert d.allow("scan", "S4000", "LONG", now=501)  # forgotten, so fresh
+    d.forget("scan", "S0", "LONG")
+    assert d.allow("scan", "S0", "LONG", now=502)
@@ -0,0 +1,52 @@
+# test_engine.py
+import asyncio
+import time
+
+from bots.runtime import Engine, Strategy
+
+
+class Recorder(Strategy):
+    def __init__(self, name, interval, work=0.0, slow_tick=None):
+        self.name = name
+        self.interval = interval
+        self.work = work
+        self.slow_tick = slow_tick
+        self.seen = []
+
+    async def on_tick(self, tick):
+        self.seen.append(tick.n)
+        if tick.n == self.slow_tick:
+            time.sleep(self.work)
+
+
+def _run_for(engine, seconds):
+    async def main():
+        asyncio.get_running_loop().call_later(seconds, engine.stop)
+        await engine.run()
+
+    asyncio.run(main())
+
+
+def test_ticks_follow_deadlines_without_drift():
+    engine = Engine()
+    s = engine.add(Recorder("steady", 0.02))
+    _run_for(engine, 0.21)
+    # 0.00 .. 0.20 inclusive is 11 deadlines; allow one either side for CI jitter.
+    assert 10 <= len(s.seen) <= 12
+    assert s.seen == list(range(len(s.seen)))
+
+
+def test_overrun_skips_missed_slots():
+    engine = Engine()
+    s = engine.add(Recorder("slow", 0.02, work=0.05, slow_tick=2))
+    _run_for(engine, 0.2)
+    stats = engine.stats["slow"]
+    assert stats.overruns == 1
+    assert stats.skipped >= 2
+    assert s.seen[:3] == [0, 1, 2]
+    assert s.seen[3] == 3 + stats.skipped
+
+
+if __name__ == "__main__":
+    test_ticks_follow_deadlines_without_drift()
+    test_overrun_skips_missed_slots()
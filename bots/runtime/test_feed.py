@@ -0,0 +1,149 @@
+# test_feed.py
+import asyncio
+import os
+
+import orjson
+
+from bots.runtime import feed
+from bots.runtime.feed import Candle, FeedClient, OHLCVSink, Trade, parse
+from bots.runtime.ohlcv import OHLCVStore
+from bots.runtime.replay import ReplayServer
+
+MIN = 60_000
+
+
+def kline(ts, close, closed=True, symbol="BTCUSDT"):
+    return orjson.dumps({"e": "kline", "s": symbol, "k": {
+        "t": ts, "i": "1m", "o": "1", "h": str(close + 1), "l": "0.5",
+        "c": str(close), "v": "10", "x": closed}})
+
+
+def trade(i, price, symbol="ETHUSDT"):
+    return orjson.dumps({"e": "trade", "s": symbol, "t": i, "p": str(price), "q": "0.5", "T": i})
+
+
+async def _drain(server, client, events, timeout=30):
+    task = asyncio.ensure_future(client.run())
+
+    async def settled():
+        await server.done.wait()
+        while client.stats.events < events:
+            await asyncio.sleep(0.01)
+
+    try:
+        await asyncio.wait_for(settled(), timeout)
+    finally:
+        client.stop()
+        await task
+
+
+def test_parse_plain_and_combined_frames():
+    c = parse(kline(MIN, 42.5))
+    assert isinstance(c, Candle) and (c.symbol, c.interval, c.ts, c.close, c.closed) == ("BTCUSDT", "1m", MIN, 42.5, True)
+    t = parse(orjson.dumps({"stream": "ethusdt@trade", "data": orjson.loads(trade(7, 3.25))}))
+    assert isinstance(t, Trade) and (t.trade_id, t.price, t.qty) == (7, 3.25, 0.5)
+    assert parse(b'{"result":null,"id":1}') is None
+
+
+def test_reconnect_resubscribes_and_backfills_the_gap(monkeypatch):
+    monkeypatch.setattr(feed, "FEED_BACKOFF_BASE", 0.01)
+    prefix = f"test_feed_{os.getpid()}"
+    store = OHLCVStore(writer=True, capacity=64, prefix=prefix)
+    frames = [kline(i * MIN, 100 + i) for i in range(50)]
+    history = {i * MIN: [i * MIN, "1", str(101 + i), "0.5", str(100 + i), "10"] for i in range(30)}
+
+    async def backfill(symbol, interval, start):
+        assert (symbol, interval) == ("BTCUSDT", "1m")
+        return [row for ts, row in sorted(history.items()) if ts >= start]
+
+    async def main():
+        async with ReplayServer(frames, rate=5000, drop_after=20, skip_on_drop=10) as server:
+            client = FeedClient(["btcusdt@kline_1m"], OHLCVSink(store), url=server.url, backfill=backfill)
+            await _drain(server, client, events=40 + 11)
+            return server, client
+
+    try:
+        server, client = asyncio.run(main())
+        assert server.connections == 2
+        assert server.subscriptions == [["btcusdt@kline_1m"]] * 2
+        assert client.stats.backfilled == 11  # candles 19..29
+        view = store.series("BTCUSDT", "1m").read()
+        assert view["ts"].tolist() == [i * MIN for i in range(50)]
+        assert view["close"].tolist() == [100.0 + i for i in range(50)]
+    finally:
+        store.close(unlink=True)
+
+
+def test_malformed_backfill_reconnects_instead_of_killing_the_feed(monkeypatch):
+    monkeypatch.setattr(feed, "FEED_BACKOFF_BASE", 0.01)
+    prefix = f"test_feed_bad_{os.getpid()}"
+    store = OHLCVStore(writer=True, capacity=64, prefix=prefix)
+    frames = [kline(i * MIN, 100 + i) for i in range(50)]
+    calls = []
+
+    async def backfill(symbol, interval, start):
+        calls.append(start)
+        if len(calls) == 1:
+            return [[start, "1"]]  # truncated kline row
+        return [[i * MIN, "1", str(101 + i), "0.5", str(100 + i), "10"] for i in range(50)]
+
+    async def main():
+        async with ReplayServer(frames, rate=5000) as server:
+            client = FeedClient(["btcusdt@kline_1m"], OHLCVSink(store), url=server.url, backfill=backfill)
+            client.last_candle[("BTCUSDT", "1m")] = 0
+            task = asyncio.ensure_future(client.run())
+            try:
+                await asyncio.wait_for(server.done.wait(), 30)
+            finally:
+                client.stop()
+                await task
+            return server, client
+
+    try:
+        server, client = asyncio.run(main())
+        assert client.stats.backfill_errors == 1 and calls == [0, 0]
+        assert server.connections == 2
+        view = store.series("BTCUSDT", "1m").read()
+        assert view["ts"].tolist() == [i * MIN for i in range(50)]
+    finally:
+        store.close(unlink=True)
+
+
+def test_trades_at_50k_per_second_fold_into_candles():
+    prefix = f"test_feed_trades_{os.getpid()}"
+    store = OHLCVStore(writer=True, capacity=64, prefix=prefix)
+    n = 20_000
+    frames = [trade(i, 100 + (i % 7)) for i in range(n)]
+
+    async def main():
+        async with ReplayServer(frames, rate=50_000) as server:
+            client = FeedClient(["ethusdt@trade"], OHLCVSink(store, ("1s",)), url=server.url)
+            await _drain(server, client, events=n)
+            return client
+
+    try:
+        client = asyncio.run(main())
+        assert client.stats.trade_gaps == 0 and client.stats.parse_errors == 0
+        assert client.stats.batches < n / 10
+        candles = store.series("ETHUSDT", "1s").read()
+        # Trade i has timestamp i ms, so 1s buckets hold 1000 trades each.
+        assert candles["ts"].tolist() == [i * 1000 for i in range(n // 1000)]
+        assert candles["volume"].sum() == n * 0.5
+        assert candles["high"].max() == 106 and candles["low"].min() == 100
+    finally:
+        store.close(unlink=True)
+
+
+def test_trades_do_not_fold_into_kline_fed_series():
+    prefix = f"test_feed_mixed_{os.getpid()}"
+    store = OHLCVStore(writer=True, capacity=8, prefix=prefix)
+    try:
+        sink = OHLCVSink(store, ("1m", "1s"))
+        sink([parse(kline(0, 100, closed=False, symbol="ETHUSDT")), parse(trade(1, 101))])
+        sink([parse(trade(2, 102))])
+        m = store.series("ETHUSDT", "1m").read()
+        assert m["volume"].tolist() == [10.0] and m["close"].tolist() == [100.0]
+        s = store.series("ETHUSDT", "1s").read()
+        assert s["volume"].tolist() == [1.0] and s["close"].tolist() == [102.0]
+    finally:
+        store.close(unlink=True)
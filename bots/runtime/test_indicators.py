@@ -0,0 +1,71 @@
+# test_indicators.py
+import numpy as np
+
+from bots.runtime import indicators as ind
+
+
+def _candles(n=600, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    high = close + rng.random(n)
+    low = close - rng.random(n)
+    volume = rng.random(n) * 100 + 1
+    return high, low, close, volume
+
+
+def _same(batch, incremental):
+    batch = np.asarray(batch, dtype=float)
+    incremental = np.asarray(incremental, dtype=float)
+    assert (np.isnan(batch) == np.isnan(incremental)).all()
+    np.testing.assert_allclose(batch, incremental, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_incremental_matches_batch():
+    h, l, c, v = _candles()
+    ema, rsi, atr, vwap = ind.EMA(21), ind.RSI(14), ind.ATR(14), ind.VWAP()
+    _same(ind.ema(c, 21), [ema.update(x) for x in c])
+    _same(ind.rsi(c, 14), [rsi.update(x) for x in c])
+    _same(ind.atr(h, l, c, 14), [atr.update(*x) for x in zip(h, l, c)])
+    _same(ind.vwap(h, l, c, v), [vwap.update(*x) for x in zip(h, l, c, v)])
+
+    macd, bb = ind.MACD(), ind.Bollinger()
+    for batch, inc in ((ind.macd(c), [macd.update(x) for x in c]),
+                       (ind.bollinger(c), [bb.update(x) for x in c])):
+        for col, values in zip(batch, zip(*inc)):
+            _same(col, values)
+
+    spike = ind.VolumeSpike(20, 1.5)
+    ratio, flags = ind.volume_spike(v, 20, 1.5)
+    inc = [spike.update(x) for x in v]
+    _same(ratio, [r for r, _ in inc])
+    assert flags.tolist() == [f for _, f in inc]
+
+
+def _naive_ewm(x, alpha):
+    out = np.empty(len(x))
+    out[0] = x[0]
+    for t in range(1, len(x)):
+        out[t] = out[t - 1] + alpha * (x[t] - out[t - 1])
+    return out
+
+
+def test_ewm_stays_finite_for_large_inputs():
+    rng = np.random.default_rng(3)
+    for x in (np.full(5000, 2e9), 1e12 + rng.normal(0, 1e10, 5000), rng.normal(0, 1e-12, 5000)):
+        for period in (9, 50, 200):
+            alpha = 2.0 / (period + 1)
+            got = ind._ewm(x, alpha)
+            assert np.isfinite(got).all()
+            np.testing.assert_allclose(got, _naive_ewm(x, alpha), rtol=1e-9, atol=0)
+
+
+def test_from_history_continues_like_a_live_feed():
+    h, l, c, v = _candles()
+    warmed = ind.IndicatorSet.from_history(h[:-1], l[:-1], c[:-1], v[:-1])
+    live = ind.IndicatorSet()
+    for candle in zip(h[:-1], l[:-1], c[:-1], v[:-1]):
+        live.update(*candle)
+    a = warmed.update(h[-1], l[-1], c[-1], v[-1])
+    b = live.update(h[-1], l[-1], c[-1], v[-1])
+    _same(np.hstack([np.ravel(x) for x in a]).astype(float),
+          np.hstack([np.ravel(x) for x in b]).astype(float))
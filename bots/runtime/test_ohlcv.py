@@ -0,0 +1,72 @@
+# test_ohlcv.py
+import os
+
+from bots.runtime.ohlcv import OHLCVStore
+
+
+def test_ring_wraps_and_readers_share_the_block():
+    prefix = f"test_ohlcv_{os.getpid()}"
+    writer = OHLCVStore(writer=True, capacity=4, prefix=prefix)
+    try:
+        s = writer.series("BTCUSDT", "1m")
+        for i in range(6):
+            s.append(i, i, i + 1, i - 1, i + 0.5, 10 * i)
+        s.upsert(5, 5, 9, 4, 6, 99)
+
+        reader = OHLCVStore(prefix=prefix)
+        r = reader.series("BTCUSDT", "1m")
+        view = r.view()
+        assert view["ts"].tolist() == [2, 3, 4, 5]
+        assert view["volume"][-1] == 99
+        assert r.read(2)["close"].tolist() == [4.5, 6.0]
+
+        s.append(6, 6, 7, 5, 6.5, 60)
+        # Views are live windows onto shared memory, not copies.
+        assert r.view(1)["ts"].tolist() == [6]
+        reader.close()
+    finally:
+        writer.close(unlink=True)
+
+
+class _ReadOnRelease:
+    """Header stand-in that takes a reader snapshot each time the writer
+    closes the seqlock, i.e. at the first moment a reader may succeed."""
+
+    def __init__(self, header, reader):
+        self.header = header
+        self.reader = reader
+        self.seen = []
+
+    def __getitem__(self, i):
+        return self.header[i]
+
+    def __setitem__(self, i, v):
+        self.header[i] = v
+        if i == 0 and not v & 1:
+            self.seen.append((self.reader.count, self.reader.read(4)["ts"].tolist()))
+
+
+def test_count_and_rows_publish_together():
+    prefix = f"test_ohlcv_seq_{os.getpid()}"
+    writer = OHLCVStore(writer=True, capacity=4, prefix=prefix)
+    try:
+        s = writer.series("BTCUSDT", "1m")
+        reader = OHLCVStore(prefix=prefix)
+        r = reader.series("BTCUSDT", "1m")
+        spy = s.header = _ReadOnRelease(s.header, r)
+        for i in range(7):
+            s.append(i, i, i, i, i, i)
+        s.upsert(6, 6, 6, 6, 6, 1)
+        s.upsert(7, 7, 7, 7, 7, 7)
+        for count, ts in spy.seen:
+            assert ts == list(range(max(count - 4, 0), count))
+        assert spy.seen[-1] == (8, [4, 5, 6, 7])
+        s.header = spy.header
+        reader.close()
+    finally:
+        writer.close(unlink=True)
+
+
+if __name__ == "__main__":
+    test_ring_wraps_and_readers_share_the_block()
+    test_count_and_rows_publish_together()
@@ -0,0 +1,48 @@
+# test_scan.py
+import asyncio
+import os
+
+from bots.runtime.ohlcv import OHLCVStore
+from bots.runtime.scan import Scanner, partition
+
+
+def rising(symbol, candles):
+    close = candles["close"]
+    if len(close) < 2:
+        return None
+    if symbol == "BAD":
+        raise ValueError("boom")
+    return float(close[-1] - close[0]) if close[-1] > close[0] else None
+
+
+def test_partition_is_contiguous_and_balanced():
+    chunks = partition([str(i) for i in range(10)], 4)
+    assert [len(c) for c in chunks] == [3, 3, 2, 2]
+    assert sum(chunks, []) == [str(i) for i in range(10)]
+    assert partition(["a"], 8) == [["a"]]
+
+
+def test_scan_merges_hits_in_universe_order():
+    prefix = f"test_scan_{os.getpid()}"
+    writer = OHLCVStore(writer=True, capacity=16, prefix=prefix)
+    symbols = [f"S{i:02d}" for i in range(20)]
+    try:
+        for i, sym in enumerate(symbols + ["BAD"]):
+            s = writer.series(sym, "1m")
+            step = 1 if i % 3 else -1
+            for t in range(5):
+                s.append(t, 0, 0, 0, 100 + step * t * (i + 1), 1)
+
+        scanner = Scanner(rising, ["NOPE"] + symbols + ["BAD"], workers=2, prefix=prefix)
+        try:
+            hits = asyncio.run(scanner.scan())
+        finally:
+            scanner.close()
+
+        expected = [sym for i, sym in enumerate(symbols) if i % 3]
+        assert [sym for sym, _ in hits] == expected
+        assert hits[0] == ("S01", 8.0)
+        stats = scanner.stats.as_dict()
+        assert stats["missing"] == 1 and stats["errors"] == 1 and stats["scans"] == 1
+    finally:
+        writer.close(unlink=True)
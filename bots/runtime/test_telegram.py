@@ -0,0 +1,88 @@
+# test_telegram.py
+import asyncio
+
+import httpx
+
+from bots.runtime.telegram import PRIORITY_HIGH, PRIORITY_LOW, TelegramOutbox
+from bots.runtime.telegram_standin import TelegramStandIn
+
+
+def _texts(server, chat):
+    return [t for _, msg in server.delivered.get(chat, []) for t in msg.split("\n\n")]
+
+
+async def _feed(outbox, chats, count, gap):
+    for i in range(count):
+        for chat in chats:
+            outbox.send(chat, f"{chat} signal {i}")
+        await asyncio.sleep(gap)
+
+
+def test_coalesces_per_chat_in_priority_order_without_429s():
+    async def main():
+        async with TelegramStandIn(chat_rate=10, global_rate=20) as server:
+            outbox = TelegramOutbox(api_url=server.url, token="T", chat_rate=8, global_rate=16)
+            runner = asyncio.ensure_future(outbox.run())
+            outbox.send("1", "low", PRIORITY_LOW)
+            outbox.send("1", "normal")
+            outbox.send("1", "urgent", PRIORITY_HIGH)
+            await _feed(outbox, ["1", "2", "3"], 40, 0.01)
+            await outbox.stop()
+            await runner
+            return server, outbox
+
+    server, outbox = asyncio.run(main())
+    assert server.rejected == 0 and outbox.stats["rate_limited"] == 0
+    first = server.delivered["1"][0][1].split("\n\n")
+    # Most urgent first; the low-priority alert goes after every normal one.
+    assert first[:2] == ["urgent", "normal"] and first[-1] == "low"
+    for chat in ("1", "2", "3"):
+        expected = [f"{chat} signal {i}" for i in range(40)]
+        assert [t for t in _texts(server, chat) if "signal" in t] == expected
+        # ~0.4s of alerts at 8 msg/s per chat: far fewer messages than alerts.
+        assert len(server.delivered[chat]) < 10
+    assert outbox.stats["sent"] == 123 and outbox.stats["coalesced"] > 100
+
+
+def test_honours_retry_after_when_the_server_is_stricter():
+    async def main():
+        async with TelegramStandIn(chat_rate=4, global_rate=100, retry_after=0.3) as server:
+            outbox = TelegramOutbox(api_url=server.url, token="T", chat_rate=50, global_rate=100)
+            runner = asyncio.ensure_future(outbox.run())
+            await _feed(outbox, ["7", "-100"], 30, 0.02)
+            await outbox.stop()
+            await runner
+            return server, outbox
+
+    server, outbox = asyncio.run(main())
+    assert outbox.stats["rate_limited"] > 0 and server.rejected == outbox.stats["rate_limited"]
+    assert server.early_retries == 0
+    assert outbox.stats["dropped"] == 0 and outbox.pending() == 0
+    for chat in ("7", "-100"):
+        assert _texts(server, chat) == [f"{chat} signal {i}" for i in range(30)]
+
+
+def test_non_json_429_keeps_the_batch_and_uses_the_header():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            # A proxy in front of the API answering with an HTML page.
+            return httpx.Response(429, text="<html>slow down</html>", headers={"Retry-After": "0.2"})
+        return httpx.Response(200, json={"ok": True})
+
+    async def main():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        outbox = TelegramOutbox(api_url="http://tg", token="T", client=client)
+        runner = asyncio.ensure_future(outbox.run())
+        outbox.send("5", "first")
+        outbox.send("5", "second")
+        await outbox.stop()
+        await runner
+        await client.aclose()
+        return outbox
+
+    outbox = asyncio.run(main())
+    assert len(calls) == 2 and outbox.stats["rate_limited"] == 1
+    assert outbox.stats["sent"] == 2 and outbox.stats["dropped"] == 0
@@ -0,0 +1,60 @@
+# test_telemetry.py
+import asyncio
+import io
+import json
+import random
+
+from bots.runtime import Engine, Strategy
+from bots.runtime.telemetry import TELEMETRY_PREFIX, Histogram, Reporter, emit
+
+
+def test_histogram_is_accurate_to_a_bucket():
+    rng = random.Random(3)
+    values = sorted(rng.lognormvariate(-7, 1.5) for _ in range(20_000))
+    h = Histogram()
+    for v in values:
+        h.record(v)
+    assert len(h.counts) == 2048 and h.count == len(values)
+    for q in (50, 90, 99, 99.9):
+        exact = values[int(len(values) * q / 100) - 1] * 1e6
+        assert abs(h.percentile(q) - exact) <= max(exact * 0.02, 1)
+    assert h.percentile(100) == h.max
+    h.record(3 * 24 * 3600)  # beyond the range: lands in the top bucket
+    assert h.counts[-1] == 1
+
+
+class Busy(Strategy):
+    name = "busy"
+    interval = 0.01
+    emitted = 0
+
+    async def on_tick(self, tick):
+        self.emitted += tick.n % 2
+        if tick.n == 3:
+            raise RuntimeError("boom")
+
+
+def test_engine_reports_interval_deltas():
+    out = io.StringIO()
+    engine = Engine()
+    engine.add(Busy())
+    reporter = Reporter()
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        def last():
+            emit(reporter.report(engine.strategies, engine.stats, 0.1), out)
+            engine.stop()
+
+        loop.call_later(0.1, lambda: emit(reporter.report(engine.strategies, engine.stats, 0.1), out))
+        loop.call_later(0.2, last)
+        await engine.run()
+
+    asyncio.run(main())
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 2 and all(line.startswith(TELEMETRY_PREFIX) for line in lines)
+    first, second = (json.loads(line[len(TELEMETRY_PREFIX):])["strategies"]["busy"] for line in lines)
+    assert first["errors"] == 1 and second["errors"] == 0
+    assert first["ticks"] + second["ticks"] == engine.stats["busy"].ticks
+    assert sum(n for _, n in second["tick_us"]) == second["ticks"]
+    assert first["signals"] + second["signals"] == engine.strategies["busy"].emitted
@@ -1,6 +1,49 @@
-import time
-i=0
-while True:
-    i+=1
-    print(f"[scalper] tick {i}")
-    time.sleep(2)
+from bots.runtime import run
+from bots.runtime.indicators import VWAP, VolumeSpike
+from bots.runtime.signals import SignalStrategy
+
+DAY_MS = 86_400_000
+
+
+class ScalperState:
+    __slots__ = ("vwap", "spike", "day", "cooldown")
+
+    def __init__(self, period: int, threshold: float):
+        self.vwap = VWAP()
+        self.spike = VolumeSpike(period, threshold)
+        self.day = None
+        self.cooldown = 0
+
+
+class Scalper(SignalStrategy):
+    """Trade volume spikes in the direction of price vs. session VWAP, then
+    stand aside for `cooldown` candles."""
+
+    name = "scalper"
+    interval = 2.0
+    stateful = True
+    params = {"spike": 3.0, "period": 20, "cooldown": 10}
+
+    def new_state(self):
+        return ScalperState(self.params["period"], self.params["spike"])
+
+    def step(self, state, ts, o, h, l, c, v):
+        day = ts // DAY_MS
+        if day != state.day:
+            state.day = day
+            state.vwap.reset()
+        vwap = state.vwap.update(h, l, c, v)
+        _, spike = state.spike.update(v)
+        if state.cooldown:
+            state.cooldown -= 1
+            return 0
+        if not spike or c == vwap:
+            return 0
+        state.cooldown = self.params["cooldown"]
+        return 1 if c > vwap else -1
+
+
+STRATEGY = Scalper
+
+if __name__ == "__main__":
+    run([Scalper()])
@@ -1,6 +1,24 @@
-import time
-i=0
-while True:
-    i+=1
-    print(f"[trend_rider] tick {i}")
-    time.sleep(2)
+from bots.runtime import run
+from bots.runtime.indicators import ema
+from bots.runtime.signals import SignalStrategy, crossings
+
+
+class TrendRider(SignalStrategy):
+    """Long when the fast EMA crosses above the slow one, short on the way down."""
+
+    name = "trend_rider"
+    interval = 2.0
+    params = {"fast": 9, "slow": 21}
+
+    def signals(self, candles):
+        close = candles["close"]
+        fast = ema(close, self.params["fast"])
+        slow = ema(close, self.params["slow"])
+        above, below = fast > slow, fast < slow
+        return crossings(above).astype("i1") - crossings(below).astype("i1")
+
+
+STRATEGY = TrendRider
+
+if __name__ == "__main__":
+    run([TrendRider()])
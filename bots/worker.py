@@ -0,0 +1,145 @@
+# bots/worker.py
+"""
+Host many per-user bot instances in one process.
+
+  python -m bots.worker
+
+The API's worker pool (backend/workers.py) drives it over stdin, one JSON
+object per line:
+
+  {"type": "start", "bot": "scalper", "user": "7", "version": 3, "config": {...}}
+  {"type": "config", "bot": "scalper", "user": "7", "version": 4, "config": {...}}
+  {"type": "stop", "bot": "scalper", "user": "7"}
+
+Each instance runs under the key "<bot>:<user>" with only that user's
+config. Output an instance prints or logs is tagged "@instance <key> " so
+the API can give each user their own log channel. The process exits when
+stdin closes (the API went away) or on SIGINT/SIGTERM.
+"""
+import asyncio
+import contextvars
+import importlib
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+
+from bots.runtime import Engine, config, telegram
+from bots.runtime.telemetry import TELEMETRY_INTERVAL
+
+logger = logging.getLogger("bots.worker")
+
+# Read by the API's worker pool (backend/workers.py).
+INSTANCE_PREFIX = "@instance "
+
+_classes: dict[str, type] = {}
+# Instance key of the running task; tasks inherit it from engine.add().
+_instance: contextvars.ContextVar[str | None] = contextvars.ContextVar("instance", default=None)
+
+
+class _TaggedStdout:
+    """stdout that tags every line an instance starts with its key."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._line_start = True
+
+    def write(self, text: str) -> int:
+        key = _instance.get()
+        if key is not None and self._line_start and text:
+            self.stream.write(f"{INSTANCE_PREFIX}{key} ")
+        if text:
+            self._line_start = text.endswith("\n")
+        return self.stream.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class _TaggedFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        key = _instance.get()
+        text = super().format(record)
+        return text if key is None else f"{INSTANCE_PREFIX}{key} {text}"
+
+
+def strategy_class(bot: str) -> type:
+    if bot not in _classes:
+        _classes[bot] = importlib.import_module(f"bots.{bot}.main").STRATEGY
+    return _classes[bot]
+
+
+def _read(loop: asyncio.AbstractEventLoop, commands: asyncio.Queue, stream):
+    for line in stream:
+        try:
+            msg = json.loads(line)
+        except ValueError:
+            logger.warning("ignoring bad command: %.200s", line.strip())
+            continue
+        loop.call_soon_threadsafe(commands.put_nowait, msg)
+    loop.call_soon_threadsafe(commands.put_nowait, None)
+
+
+async def serve(engine: Engine, commands: asyncio.Queue):
+    """Apply commands one at a time, so a stop always finishes before a
+    later start of the same instance."""
+    while True:
+        msg = await commands.get()
+        if msg is None:
+            engine.stop()
+            return
+        try:
+            await handle(engine, msg)
+        except Exception:
+            logger.exception("command failed: %.200s", json.dumps(msg))
+
+
+async def handle(engine: Engine, msg: dict):
+    kind, bot, user = msg.get("type"), msg["bot"], str(msg["user"])
+    key = f"{bot}:{user}"
+    if kind in ("start", "config"):
+        config.publish(config.ConfigSnapshot(key, msg.get("version", 0), {user: msg.get("config") or {}}))
+    if kind == "start" and key not in engine.strategies:
+        token = _instance.set(key)
+        try:
+            engine.add(strategy_class(bot)(), key)
+        finally:
+            _instance.reset(token)
+        logger.info("started %s (%d running)", key, len(engine.strategies))
+    elif kind == "stop" and key in engine.strategies:
+        await engine.remove(key)
+        config.discard(key)
+        logger.info("stopped %s (%d running)", key, len(engine.strategies))
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    for handler in logging.getLogger().handlers:
+        handler.setFormatter(_TaggedFormatter("%(asctime)s %(name)s %(levelname)s %(message)s"))
+    sys.stdout = _TaggedStdout(sys.stdout)
+    engine = Engine(TELEMETRY_INTERVAL if os.getenv("BOT_TELEMETRY") else None)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, engine.stop)
+            except NotImplementedError:
+                pass
+        # Shared by every instance; start it here so its task (and what it
+        # logs) carries no instance's tag.
+        telegram.outbox()
+        commands: asyncio.Queue = asyncio.Queue()
+        threading.Thread(target=_read, args=(loop, commands, sys.stdin), name="commands", daemon=True).start()
+        server = asyncio.ensure_future(serve(engine, commands))
+        await engine.run()
+        server.cancel()
+        await telegram.shutdown()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
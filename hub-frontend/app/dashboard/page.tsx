@@ -33,7 +33,20 @@ type Me = {
   entitlements?: SignalKey[] | null;
 };
 
-type BotStatus = { bot: string; status: string };
+type BotTelemetry = {
+  tick_p50_ms: number | null;
+  tick_p99_ms: number | null;
+  lag_ms: number;
+  signals_per_min: number;
+  errors: number;
+};
+
+type BotStatus = { name: string; status: string; telemetry?: BotTelemetry | null };
+
+type DashboardMessage =
+  | { type: "status"; bots?: BotStatus[]; bot?: BotStatus }
+  | { type: "logs"; bot: string; lines: { seq: number | null; line: string }[] }
+  | { type: "error"; detail: string; bot?: string };
 
 const BtcMiniChart = dynamic(() => import("@/components/BtcMiniChart"), {
   ssr: false,
@@ -76,17 +89,18 @@ const BTC_INTERVAL_LABELS: Record<BtcInterval, string> = {
 };
 const ME_CACHE_KEY = "dashboard.me.v1";
 const IDLE_TIMEOUT_MS = 30 * 60 * 1000;
+const LOG_BACKFILL_LINES = 200;
 
 /* ---------- Utils ---------- */
-function logsWsUrl(channel: string) {
+function dashboardWsUrl() {
   const base = new URL(
     process.env.NEXT_PUBLIC_API_BASE ||
       process.env.NEXT_PUBLIC_API_URL ||
       "http://localhost:8000"
   );
   base.protocol = base.protocol === "https:" ? "wss:" : "ws:";
-  base.pathname = "/ws/logs";
-  base.search = `?bot=${encodeURIComponent(channel)}`; // server can treat this as a channel key
+  base.pathname = "/ws/dashboard"; // one socket: auth, log subscriptions, status pushes
+  base.search = "";
   return base.toString();
 }
 
@@ -146,12 +160,13 @@ export default function Dashboard() {
 
   const cachedRef = useRef(false);
   const wsSessionRef = useRef(0);
-  const wsOpenCountRef = useRef(0);
-  const wsExpectedRef = useRef(0);
+  const tokenRef = useRef<string | null>(null);
+  tokenRef.current = session?.access_token ?? null;
   const wsMetaRef = useRef({
-    sockets: new Map<SignalKey, WebSocket>(),
-    timers: new Map<SignalKey, number>(),
-    tries: new Map<SignalKey, number>(),
+    socket: null as WebSocket | null,
+    timer: null as number | null,
+    tries: 0,
+    lastSeq: new Map<string, number>(),
   });
 
   async function authedApi(path: string, init: RequestInit = {}) {
@@ -177,73 +192,102 @@ export default function Dashboard() {
       setLoading(false);
       return;
     }
-
-    // /bot/status may 403 for inactive accounts - that's fine
-    try {
-      const s = await authedApi("/bot/status");
-      setStatus((s?.bots || []) as BotStatus[]);
-    } catch {
-      setStatus([]);
-    }
+    // Bot status arrives over the dashboard socket; no polling needed.
   }
 
   function resetConnections() {
-    wsMetaRef.current.sockets.forEach((sock) => {
+    wsSessionRef.current += 1; // stale sockets and timers see a new session and stand down
+    const meta = wsMetaRef.current;
+    if (meta.socket) {
       try {
-        sock.close();
+        meta.socket.close();
       } catch {}
-    });
-    wsMetaRef.current.sockets.clear();
-    wsMetaRef.current.timers.forEach((timer) => window.clearTimeout(timer));
-    wsMetaRef.current.timers.clear();
-    wsMetaRef.current.tries.clear();
-    wsOpenCountRef.current = 0;
-    wsExpectedRef.current = 0;
+    }
+    meta.socket = null;
+    if (meta.timer) window.clearTimeout(meta.timer);
+    meta.timer = null;
+    meta.tries = 0;
+    meta.lastSeq.clear();
   }
 
-  function scheduleReconnect(channel: SignalKey, session: number, prefix: string | null) {
+  function scheduleReconnect(channel: LogChannel, session: number) {
     setWsState("reconnecting");
-    const tries = (wsMetaRef.current.tries.get(channel) ?? 0) + 1;
-    wsMetaRef.current.tries.set(channel, tries);
-    const delay = Math.min(30_000, 1000 * 2 ** (tries - 1)); // 1s, 2s, 4s ... cap 30s
-
-    const existing = wsMetaRef.current.timers.get(channel);
-    if (existing) window.clearTimeout(existing);
+    const meta = wsMetaRef.current;
+    meta.tries += 1;
+    const delay = Math.min(30_000, 1000 * 2 ** (meta.tries - 1)); // 1s, 2s, 4s ... cap 30s
 
-    const timer = window.setTimeout(() => {
-      wsMetaRef.current.timers.delete(channel);
+    if (meta.timer) window.clearTimeout(meta.timer);
+    meta.timer = window.setTimeout(() => {
+      meta.timer = null;
       if (wsSessionRef.current !== session) return;
-      connectChannel(channel, session, prefix);
+      openSocket(channel, session);
     }, delay);
+  }
+
+  function handleMessage(channel: LogChannel, msg: DashboardMessage) {
+    if (msg.type === "status") {
+      if (msg.bots) setStatus(msg.bots);
+      const changed = msg.bot;
+      if (changed) {
+        setStatus((prev) => [...prev.filter((b) => b.name !== changed.name), changed]);
+      }
+      return;
+    }
+    if (msg.type === "error") {
+      // A lagging stream was dropped server-side; pick it up again from the last seq.
+      if (msg.detail === "lagging" && msg.bot) subscribe(channel, [msg.bot]);
+      return;
+    }
+    const prefix = channel === "all" ? SIGNAL_LABELS[msg.bot as SignalKey] ?? msg.bot : null;
+    const lines = msg.lines.map((entry) => (prefix ? `${prefix}: ${entry.line}` : entry.line));
+    const last = msg.lines[msg.lines.length - 1];
+    if (last && typeof last.seq === "number") wsMetaRef.current.lastSeq.set(msg.bot, last.seq);
+    setLogs((prev) => {
+      const next = [...prev, ...lines];
+      return next.length > 500 ? next.slice(next.length - 500) : next;
+    });
+  }
 
-    wsMetaRef.current.timers.set(channel, timer);
+  function subscribe(channel: LogChannel, bots?: string[]) {
+    const sock = wsMetaRef.current.socket;
+    if (!sock || sock.readyState !== WebSocket.OPEN) return;
+    const wanted: string[] = bots ?? (channel === "all" ? SIGNAL_ORDER : [channel]);
+    // Reconnects resume after the last line we saw; first connect pulls recent history.
+    const since = Object.fromEntries(
+      wanted
+        .filter((bot) => wsMetaRef.current.lastSeq.has(bot))
+        .map((bot) => [bot, wsMetaRef.current.lastSeq.get(bot)])
+    );
+    sock.send(JSON.stringify({ type: "subscribe", bots: wanted, since, backfill: LOG_BACKFILL_LINES }));
   }
 
-  function connectChannel(channel: SignalKey, session: number, prefix: string | null) {
-    const sock = new WebSocket(logsWsUrl(channel));
-    wsMetaRef.current.sockets.set(channel, sock);
+  function openSocket(channel: LogChannel, session: number) {
+    const sock = new WebSocket(dashboardWsUrl());
+    wsMetaRef.current.socket = sock;
 
     sock.onopen = () => {
       if (wsSessionRef.current !== session) return;
-      wsOpenCountRef.current += 1;
-      wsMetaRef.current.tries.set(channel, 0);
-      setWsState(wsOpenCountRef.current >= wsExpectedRef.current ? "open" : "connecting");
+      wsMetaRef.current.tries = 0;
+      sock.send(JSON.stringify({ type: "auth", token: tokenRef.current ?? "" }));
+      subscribe(channel);
+      setWsState("open");
     };
 
     sock.onmessage = (ev) => {
       if (wsSessionRef.current !== session) return;
-      const line = prefix ? `${prefix}: ${ev.data}` : ev.data;
-      setLogs((prev) => {
-        const next = [...prev, line];
-        if (next.length > 500) next.shift();
-        return next;
-      });
+      try {
+        handleMessage(channel, JSON.parse(String(ev.data)) as DashboardMessage);
+      } catch {}
     };
 
-    sock.onclose = () => {
+    sock.onclose = (ev) => {
       if (wsSessionRef.current !== session) return;
-      wsOpenCountRef.current = Math.max(0, wsOpenCountRef.current - 1);
-      scheduleReconnect(channel, session, prefix);
+      // 4401/4403: bad token or inactive plan - retrying will not help.
+      if (ev.code === 4401 || ev.code === 4403) {
+        setWsState("closed");
+        return;
+      }
+      scheduleReconnect(channel, session);
     };
     sock.onerror = () => {
       try {
@@ -253,20 +297,11 @@ export default function Dashboard() {
   }
 
   function connectLogs(channel: LogChannel) {
-    wsSessionRef.current += 1;
-    const session = wsSessionRef.current;
     resetConnections();
+    const session = wsSessionRef.current;
     setLogs([]);
     setWsState("connecting");
-
-    const channels = channel === "all" ? SIGNAL_ORDER : [channel];
-    wsExpectedRef.current = channels.length;
-    wsOpenCountRef.current = 0;
-
-    channels.forEach((entry) => {
-      const prefix = channel === "all" ? SIGNAL_LABELS[entry] : null;
-      connectChannel(entry, session, prefix);
-    });
+    openSocket(channel, session);
   }
 
   async function start(bot: BotKey) {
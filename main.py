@@ -1,8 +1,10 @@
 import os
 import json
+import logging
 from datetime import datetime, timedelta, timezone
 
 from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel, EmailStr
 from jose import jwt, JWTError
@@ -12,19 +14,23 @@ from fastapi.responses import HTMLResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 
-import stripe
 from sqlalchemy import (create_engine, String, Boolean, DateTime, Text,
                         ForeignKey, UniqueConstraint)
 from sqlalchemy.orm import (DeclarativeBase, mapped_column, Mapped, sessionmaker,
                             relationship)
 
+from backend.applog import setup_logging
+from backend.metrics import instrument_app, instrument_pool
+
 # ---------- Config ----------
 load_dotenv()
+setup_logging()
+logger = logging.getLogger("billing")
 JWT_SECRET = os.getenv("JWT_SECRET", "change_me")
 ALGO = "HS256"
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./saas.db")
 
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
+STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
 STRIPE_PRICE_ID = os.getenv("STRIPE_PRICE_ID")
 STRIPE_SUCCESS_URL = os.getenv(
@@ -32,6 +38,19 @@ STRIPE_SUCCESS_URL = os.getenv(
 STRIPE_CANCEL_URL = os.getenv(
     "STRIPE_CANCEL_URL", "http://localhost:8000/billing/cancel")
 
+_stripe = None
+
+
+def stripe_sdk():
+    """The stripe module, imported on first use: it is the slowest import
+    here and only the billing endpoints need it."""
+    global _stripe
+    if _stripe is None:
+        import stripe
+        stripe.api_key = STRIPE_SECRET_KEY
+        _stripe = stripe
+    return _stripe
+
 # ---------- DB ----------
 
 
@@ -142,6 +161,8 @@ class CheckoutBody(BaseModel):
 
 # ---------- App ----------
 app = FastAPI(title="SaaS Hub (Stripe-only)")
+instrument_app(app, "billing")
+instrument_pool(engine, "billing")
 
 # ---- Auth Routes ----
 
@@ -193,10 +214,10 @@ def me(user: User = Depends(get_current_user)):
 
 @app.post("/billing/create-checkout-session")
 def create_checkout(body: CheckoutBody, user: User = Depends(get_current_user)):
-    if not stripe.api_key or not (STRIPE_PRICE_ID or body.price_id):
+    if not STRIPE_SECRET_KEY or not (STRIPE_PRICE_ID or body.price_id):
         raise HTTPException(status_code=500, detail="Stripe not configured")
 
-    session = stripe.checkout.Session.create(
+    session = stripe_sdk().checkout.Session.create(
         mode="subscription",
         # REMOVE this line:
         # customer_creation="if_required",
@@ -223,6 +244,8 @@ async def stripe_webhook(request: Request):
         raise HTTPException(
             status_code=500, detail="Missing STRIPE_WEBHOOK_SECRET")
 
+    # The first call imports stripe; keep that off the event loop.
+    stripe = await run_in_threadpool(stripe_sdk)
     try:
         event = stripe.Webhook.construct_event(
             payload=payload, sig_header=sig_header, secret=STRIPE_WEBHOOK_SECRET
@@ -233,7 +256,7 @@ async def stripe_webhook(request: Request):
 
     event_type = event.get("type")
     obj = event["data"]["object"]
-    print("STRIPE EVENT TYPE:", event_type)
+    logger.info("stripe event %s", event_type, extra={"event_id": event.get("id")})
 
     # 1) Handle subscription lifecycle (created/updated/deleted, etc.)
     if event_type and event_type.startswith("customer.subscription."):
@@ -268,11 +291,9 @@ async def stripe_webhook(request: Request):
                             flag.plan = plan_nickname
                         flag.updated_at = datetime.now(timezone.utc)
                     db.commit()
-                    print(
-                        f"✅ Activated user via checkout.session.completed: {customer_email}")
+                    logger.info("activated user via checkout.session.completed: %s", customer_email)
                 else:
-                    print(
-                        f"⚠️ checkout.session.completed for unknown email: {customer_email}")
+                    logger.warning("checkout.session.completed for unknown email: %s", customer_email)
             finally:
                 db.close()
 
@@ -378,7 +399,7 @@ def stop_bot(user: User = Depends(require_paid_user)):
 
 @app.post("/billing/create-portal-session")
 def create_portal(user: User = Depends(get_current_user)):
-    session = stripe.billing_portal.Session.create(
+    session = stripe_sdk().billing_portal.Session.create(
         customer_creation="if_required",  # optional for test
         return_url="http://localhost:3000/dashboard",
         customer_email=user.email,